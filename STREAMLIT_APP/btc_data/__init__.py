@@ -0,0 +1,105 @@
+"""
+Couche d'accès aux données Bitcoin partagée par les pages Streamlit.
+
+Le CSV Kaggle minute par minute n'est parsé qu'une seule fois par version du
+fichier ; toutes les pages relisent ensuite le cache colonne typé, mis à
+jour de façon incrémentale quand de nouvelles lignes arrivent.
+"""
+from .cubes import (
+    CUBES,
+    WEEKDAY_LABELS,
+    calendar_cycle,
+    calendar_months,
+    combine_cube,
+    weekday_hour_table,
+)
+from .dataset import (
+    available_years,
+    cache_version,
+    export_dataset,
+    load_cube,
+    load_drawdown_episodes,
+    load_extremes,
+    load_histogram,
+    load_minutes,
+    load_quality,
+    load_rolling,
+    load_rollup,
+    load_sketches,
+    open_minutes,
+)
+from .decimate import POINT_BUDGET, decimate
+from .drawdown import drawdown_pct, top_episodes
+from .export import EXPORT_FORMATS, EXPORT_RESOLUTIONS
+from .extremes import HORIZONS, TOP_MOVES, top_moves
+from .histograms import HIST_CENTERS, HIST_EDGES, kde_from_counts
+from .memory import resident_memory
+from .quality import describe_table
+from .ingest import append_new_rows, build_cache, ensure_cache
+from .rolling import WINDOWS, rolling_column
+from .rollups import LEVELS
+from .shared import shared_dataset
+from .sketches import RANK_ERROR, SKETCH_VARIABLES, describe_sketches, sketch_quantile
+from .store import (
+    CACHE_DIR,
+    CSV_PATH,
+    OHLCV,
+    dataset_version,
+    read_manifest,
+)
+from .timeindex import range_slice, select_years, year_slices
+
+__all__ = [
+    "CACHE_DIR",
+    "CSV_PATH",
+    "CUBES",
+    "EXPORT_FORMATS",
+    "EXPORT_RESOLUTIONS",
+    "HIST_CENTERS",
+    "HIST_EDGES",
+    "HORIZONS",
+    "LEVELS",
+    "OHLCV",
+    "POINT_BUDGET",
+    "RANK_ERROR",
+    "SKETCH_VARIABLES",
+    "TOP_MOVES",
+    "WEEKDAY_LABELS",
+    "WINDOWS",
+    "append_new_rows",
+    "available_years",
+    "build_cache",
+    "cache_version",
+    "calendar_cycle",
+    "calendar_months",
+    "combine_cube",
+    "dataset_version",
+    "decimate",
+    "describe_sketches",
+    "describe_table",
+    "drawdown_pct",
+    "ensure_cache",
+    "export_dataset",
+    "kde_from_counts",
+    "load_cube",
+    "load_drawdown_episodes",
+    "load_extremes",
+    "load_histogram",
+    "load_minutes",
+    "load_quality",
+    "load_rolling",
+    "load_rollup",
+    "load_sketches",
+    "open_minutes",
+    "range_slice",
+    "read_manifest",
+    "resident_memory",
+    "rolling_column",
+    "select_years",
+    "shared_dataset",
+    "sketch_quantile",
+    "top_episodes",
+    "top_moves",
+    "weekday_hour_table",
+    "year_slices",
+]
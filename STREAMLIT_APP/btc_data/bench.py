@@ -0,0 +1,457 @@
+"""
+Mesures de performance du dataset et des pages.
+
+Usage (depuis le dossier STREAMLIT_APP) :
+
+    python -m btc_data.bench              # chargement
+    python -m btc_data.bench --resample   # agrégats journalier / hebdo / mensuel
+    python -m btc_data.bench --suite --output avant.json      # toutes les pages
+    python -m btc_data.bench --compare avant.json apres.json  # régressions
+
+Sans option, compare l'ancien chargement de chaque page (read_csv +
+to_datetime + sort_values) au chargement via le cache colonne, à froid puis
+à chaud ; avec ``--resample``, compare les ``resample().agg()`` que chaque
+page faisait sur les minutes à la pyramide d'agrégats, séquentielle puis en
+parallèle par années.
+
+``--suite`` exécute hors Streamlit le calcul derrière chaque page
+(``PIPELINES``) à plusieurs tailles de données (les N premières lignes du
+CSV, ou avec ``--synthetic`` des données générées, sans limite de taille)
+et relève temps, pic de mémoire (RSS) et débit. Chaque mesure tourne dans
+un processus neuf, pour que le pic de mémoire soit le sien.
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from wordcloud import WordCloud
+
+from .corpus import corpus_tfidf
+from .cubes import calendar_cycle, calendar_months, weekday_hour_table
+from .dataset import (
+    load_cube,
+    load_drawdown_episodes,
+    load_extremes,
+    load_histogram,
+    load_minutes,
+    load_quality,
+    load_rolling,
+    load_rollup,
+    load_sketches,
+)
+from .decimate import decimate
+from .drawdown import drawdown_pct, top_episodes
+from .extremes import HORIZONS, top_moves
+from .histograms import HIST_CENTERS, kde_from_counts
+from .ingest import build_cache
+from .memory import peak_memory, reset_peak_memory, resident_memory
+from .quality import describe_table
+from .rolling import rolling_column
+from .rollups import OHLCV_AGG, build_rollups, default_workers
+from .sketches import SKETCH_VARIABLES, describe_sketches
+from .store import CSV_PATH, OHLCV, ensure_sorted, parse_csv
+from .synthetic import REFERENCE_ROWS, write_synthetic_csv
+from .text import SAMPLE_TEXT, clean_text, french_stopwords
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def legacy_load(csv_path=CSV_PATH):
+    """Chargement tel qu'il était recopié dans chaque page."""
+    df = pd.read_csv(csv_path)
+    df["Timestamp"] = pd.to_datetime(df["Timestamp"], unit="s")
+    return df.sort_values("Timestamp")
+
+
+def bench_load(csv_path=CSV_PATH):
+    cache_dir = tempfile.mkdtemp(prefix="btc_cache_")
+    try:
+        legacy, df = _timed(lambda: legacy_load(csv_path))
+        rows = len(df)
+        del df
+        cold, _ = _timed(lambda: build_cache(csv_path, cache_dir))
+        warm, _ = _timed(lambda: load_minutes(csv_path=csv_path, cache_dir=cache_dir))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    return {
+        "rows": rows,
+        "avant (read_csv par page)": legacy,
+        "avant, 5 pages à froid": 5 * legacy,
+        "après, construction du cache": cold,
+        "après, lecture du cache": warm,
+        "après, 5 pages à froid": cold + 4 * warm,
+    }
+
+
+def legacy_resample(df):
+    """Journalier, hebdo et mensuel tels que recalculés dans chaque page."""
+    agg = {col: how for col, how in OHLCV_AGG.items() if col != "Volume_USD"}
+    return {rule: df.resample(rule, on="Timestamp").agg(agg).dropna() for rule in ["D", "W", "ME"]}
+
+
+def bench_resample(csv_path=CSV_PATH, workers=None):
+    df, _ = ensure_sorted(parse_csv(csv_path))
+    cores = os.cpu_count() or 1
+    counts = workers or sorted({n for n in (2, 4, 8, 16, cores) if n <= cores} - {1})
+
+    results = {"rows": len(df), "cores": cores}
+    results["avant : resample D + W + ME"], _ = _timed(lambda: legacy_resample(df))
+    serial, _ = _timed(lambda: build_rollups(df, workers=1))
+    results["pyramide, 1 processus"] = serial
+    for n in counts:
+        results[f"pyramide, {n} processus"], _ = _timed(lambda: build_rollups(df, workers=n))
+    return results
+
+
+# -----------------------------------------------
+# 🧪 Calcul derrière chaque page
+# -----------------------------------------------
+# Chaque pipeline reprend les appels de la page correspondante, sans
+# l'affichage. Il reçoit le contexte de la mesure et retourne le nombre
+# d'unités traitées (lignes minute, ou mots pour le text mining).
+
+def _ingest(ctx):
+    build_cache(ctx["csv_path"], ctx["cache_dir"])
+    return ctx["rows"]
+
+
+def _page1_exploration(ctx):
+    quality = load_quality(**ctx["source"])
+    describe_table(quality)
+    load_minutes(columns=["Timestamp", *OHLCV], **ctx["source"]).head(50)
+    return ctx["rows"]
+
+
+def _page2_load_data(ctx):
+    for level, columns in [("1D", OHLCV), ("1W", ["Close"]), ("1M", ["Close"])]:
+        bars = load_rollup(level, columns=columns, **ctx["source"])
+        bars["Return_pct"] = bars["Close"].pct_change() * 100
+        bars["Year"] = bars.index.year
+    return ctx["rows"]
+
+
+def _page2_describe(ctx):
+    # describe / skew / kurt et KDE de chaque variable minute, puis des
+    # rendements journaliers (calculés sur la série elle-même)
+    for variable in SKETCH_VARIABLES:
+        describe_sketches(load_sketches(variable, **ctx["source"]))
+        kde_from_counts(HIST_CENTERS, load_histogram(variable, **ctx["source"]))
+    returns = load_rollup("1D", columns=["Close"], **ctx["source"])["Close"].pct_change() * 100
+    returns.describe(), returns.skew(), returns.kurt()
+    return ctx["rows"]
+
+
+def _page3_load_data(ctx):
+    for level in ["1h", "1D", "1W", "1M"]:
+        bars = load_rollup(level, columns=OHLCV, **ctx["source"]).reset_index()
+        bars["Volume_USD"] = bars["Volume"] * bars["Close"]
+        decimate(bars, "Timestamp", "Close")
+    return ctx["rows"]
+
+
+def _page3_weekday_hour(ctx):
+    cube = load_cube("weekday_hour", **ctx["source"])
+    for field in ["Volume", "Volatility"]:
+        weekday_hour_table(cube, field)
+    return ctx["rows"]
+
+
+def _page4_cycles(ctx):
+    cube = load_cube("calendar", **ctx["source"])
+    for by, period in [("Hour", "1h"), ("Weekday", "1D"), ("Month", "1M")]:
+        calendar_cycle(cube, by, period)
+    calendar_months(cube)["Volume"].unstack("Month")
+    return ctx["rows"]
+
+
+def _page5_drawdown(ctx):
+    daily = load_rollup("1D", columns=OHLCV, **ctx["source"])
+    daily["Return"] = daily["Close"].pct_change()
+    minutes = load_minutes(columns=["Timestamp", "Close", "Peak"], **ctx["source"])
+    curve = pd.DataFrame({
+        "Timestamp": minutes["Timestamp"],
+        "Drawdown_pct": drawdown_pct(minutes["Close"], minutes["Peak"]),
+    })
+    decimate(curve, "Timestamp", "Drawdown_pct")
+    top_episodes(load_drawdown_episodes(**ctx["source"]), 10)
+    rolling = load_rolling(columns=[rolling_column("Return", "std", "30D")], **ctx["source"])
+    decimate(rolling.reset_index(), "Timestamp", rolling.columns[0])
+    return ctx["rows"]
+
+
+def _page8_extremes(ctx):
+    extremes = load_extremes(**ctx["source"])
+    for horizon in HORIZONS:
+        top_moves(extremes[extremes["Horizon"] == horizon], 10)
+    return ctx["rows"]
+
+
+def _resample_legacy(ctx):
+    legacy_resample(load_minutes(columns=["Timestamp", *OHLCV], **ctx["source"]))
+    return ctx["rows"]
+
+
+def _resample_pyramid(ctx):
+    build_rollups(load_minutes(columns=["Timestamp", *OHLCV], **ctx["source"]))
+    return ctx["rows"]
+
+
+def _text(ctx):
+    # Texte d'exemple répété une fois par tranche de 1 000 lignes minute
+    repeat = max(1, ctx["rows"] // 1_000)
+    return "\n".join([SAMPLE_TEXT] * repeat), french_stopwords()
+
+
+def _text_clean(ctx):
+    text, stopwords = _text(ctx)
+    return len(clean_text(text, stopwords))
+
+
+def _text_tfidf(ctx):
+    # Corpus zippé en mémoire : un paragraphe de l'article d'exemple par
+    # tranche de 100 lignes minute, répartis dans 10 dossiers (groupes)
+    paragraphs = [p for p in SAMPLE_TEXT.split("\n\n") if p.strip()]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for i in range(max(1, ctx["rows"] // 100)):
+            archive.writestr(f"groupe{i % 10}/article{i}.txt", paragraphs[i % len(paragraphs)])
+    matrix, _, _ = corpus_tfidf(buffer.getvalue(), french_stopwords(), workers=default_workers())
+    return matrix.shape[0]
+
+
+def _text_wordcloud(ctx):
+    text, stopwords = _text(ctx)
+    words = clean_text(text, stopwords)
+    WordCloud(width=800, height=400, background_color="white",
+              colormap="Oranges").generate(" ".join(words)).to_array()
+    return len(words)
+
+
+# Nom -> (fonction, unité du débit). ``ingest`` en premier : il construit
+# le cache lu par les suivants.
+PIPELINES = {
+    "ingest": (_ingest, "lignes"),
+    "page1_exploration": (_page1_exploration, "lignes"),
+    "page2_load_data": (_page2_load_data, "lignes"),
+    "page2_describe": (_page2_describe, "lignes"),
+    "page3_load_data": (_page3_load_data, "lignes"),
+    "page3_weekday_hour": (_page3_weekday_hour, "lignes"),
+    "page4_cycles": (_page4_cycles, "lignes"),
+    "page5_drawdown": (_page5_drawdown, "lignes"),
+    "page8_extremes": (_page8_extremes, "lignes"),
+    "resample_legacy": (_resample_legacy, "lignes"),
+    "resample_pyramid": (_resample_pyramid, "lignes"),
+    "text_clean": (_text_clean, "mots"),
+    "text_tfidf": (_text_tfidf, "documents"),
+    "text_wordcloud": (_text_wordcloud, "mots"),
+}
+
+# Écart relatif au-delà duquel --compare signale une régression, et écarts
+# absolus en dessous desquels une hausse est du bruit de mesure
+REGRESSION_THRESHOLD = 0.2
+NOISE_SECONDS = 0.01
+NOISE_RSS_MB = 16
+
+
+def _measure(name, ctx, repeat):
+    """Exécuté dans un processus neuf : meilleur temps sur ``repeat`` essais."""
+    fn, unit = PIPELINES[name]
+    reset_peak_memory()
+    base = resident_memory()[0]
+    times = []
+    for _ in range(repeat):
+        seconds, units = _timed(lambda: fn(ctx))
+        times.append(seconds)
+    best = min(times)
+    return {
+        "pipeline": name,
+        "rows": ctx["rows"],
+        "seconds": best,
+        "throughput": units / best if best else None,
+        "unit": f"{unit}/s",
+        "base_rss_mb": base / 1024 ** 2,
+        "peak_rss_mb": peak_memory() / 1024 ** 2,
+        # Hausse due au pipeline seul (base : après les imports)
+        "extra_rss_mb": (peak_memory() - base) / 1024 ** 2,
+    }
+
+
+def _write_head(csv_path, target, rows):
+    """Copie l'en-tête et les ``rows`` premières lignes du CSV."""
+    with open(csv_path, "rb") as src, open(target, "wb") as dst:
+        dst.writelines(itertools.islice(src, rows + 1))
+
+
+def _count_rows(csv_path):
+    with open(csv_path, "rb") as f:
+        return sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 24), b"")) - 1
+
+
+def scale_rows(scale, reference):
+    """Nombre de lignes d'une taille : ``"0.5x"`` (multiple de ``reference``) ou ``"200000"``."""
+    scale = str(scale)
+    if scale.endswith("x"):
+        return int(float(scale[:-1]) * reference)
+    return int(scale)
+
+
+def bench_suite(csv_path=CSV_PATH, scales=("0.25x", "0.5x", "1x"), pipelines=None, repeat=3,
+                synthetic_seed=None):
+    """Mesure chaque pipeline à chaque taille ; retourne le rapport (dict JSON).
+
+    ``scales`` : voir :func:`scale_rows` ; la référence est la taille du CSV,
+    ou celle du dataset Kaggle si ``synthetic_seed`` est donné (données
+    générées avec cette graine au lieu des premières lignes du CSV).
+    """
+    synthetic = synthetic_seed is not None
+    total = REFERENCE_ROWS if synthetic else _count_rows(csv_path)
+    names = list(PIPELINES) if pipelines is None else ["ingest", *(p for p in pipelines if p != "ingest")]
+    spawn = get_context("spawn")
+    results = []
+    workdir = Path(tempfile.mkdtemp(prefix="btc_bench_"))
+    try:
+        for scale in scales:
+            rows = scale_rows(scale, total)
+            scaled_csv = workdir / f"btc_{rows}.csv"
+            if synthetic:
+                write_synthetic_csv(scaled_csv, rows, synthetic_seed)
+            else:
+                rows = min(rows, total)
+                _write_head(csv_path, scaled_csv, rows)
+            cache_dir = workdir / f"cache_{rows}"
+            source = {"csv_path": scaled_csv, "cache_dir": cache_dir}
+            ctx = {"rows": rows, "source": source, **source}
+            for name in names:
+                # Un processus neuf par mesure : pic RSS propre à la mesure
+                with ProcessPoolExecutor(1, mp_context=spawn) as pool:
+                    result = pool.submit(_measure, name, ctx, repeat).result()
+                results.append(result)
+                print(_format_result(result), flush=True)
+            scaled_csv.unlink()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "csv": "synthetic" if synthetic else str(csv_path),
+            "csv_rows": total,
+            "synthetic_seed": synthetic_seed,
+            "repeat": repeat,
+            "cores": os.cpu_count(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def _format_result(r):
+    throughput = f"{r['throughput']:>12,.0f} {r['unit']}" if r["throughput"] else ""
+    return (f"{r['pipeline']:<20} {r['rows']:>10,} lignes {r['seconds']:8.3f} s "
+            f"+{r['extra_rss_mb']:6.0f} Mo  {throughput}").replace(",", " ")
+
+
+def compare_reports(before, after, threshold=REGRESSION_THRESHOLD):
+    """Lignes de comparaison (pipeline, taille) ; ``regression`` si le temps ou
+    la hausse de RSS augmentent de plus de ``threshold`` (au-delà du bruit)."""
+    old = {(r["pipeline"], r["rows"]): r for r in before["results"]}
+    rows = []
+    for r in after["results"]:
+        ref = old.get((r["pipeline"], r["rows"]))
+        if ref is None:
+            continue
+        slower = r["seconds"] - ref["seconds"]
+        heavier = r["extra_rss_mb"] - ref["extra_rss_mb"]
+        rows.append({
+            "pipeline": r["pipeline"],
+            "rows": r["rows"],
+            "seconds_before": ref["seconds"],
+            "seconds_after": r["seconds"],
+            "extra_rss_before": ref["extra_rss_mb"],
+            "extra_rss_after": r["extra_rss_mb"],
+            "regression": (
+                (slower > NOISE_SECONDS and slower > threshold * ref["seconds"])
+                or (heavier > NOISE_RSS_MB and heavier > threshold * ref["extra_rss_mb"])
+            ),
+        })
+    return rows
+
+
+def _print_comparison(rows):
+    for r in rows:
+        flag = "  ⚠️ régression" if r["regression"] else ""
+        rows_label = f"{r['rows']:,}".replace(",", " ")
+        print(f"{r['pipeline']:<20} {rows_label:>10} lignes "
+              f"{r['seconds_before']:8.3f} s -> {r['seconds_after']:8.3f} s, "
+              f"+{r['extra_rss_before']:.0f} Mo -> +{r['extra_rss_after']:.0f} Mo{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesures de performance du cache.")
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--resample", action="store_true",
+                        help="mesure l'agrégation au lieu du chargement")
+    parser.add_argument("--workers", type=int, nargs="*",
+                        help="nombres de processus à tester (défaut : 2, 4… cœurs)")
+    parser.add_argument("--suite", action="store_true",
+                        help="mesure le calcul de toutes les pages")
+    parser.add_argument("--scales", nargs="*", default=["0.25x", "0.5x", "1x"],
+                        help="tailles : multiples du CSV (0.5x, 10x) ou nombres de lignes")
+    parser.add_argument("--synthetic", type=int, nargs="?", const=0, metavar="GRAINE",
+                        help="données synthétiques (btc_data.synthetic) au lieu du CSV")
+    parser.add_argument("--pipelines", nargs="*", choices=list(PIPELINES),
+                        help="pipelines à mesurer (défaut : tous)")
+    parser.add_argument("--repeat", type=int, default=3, help="essais par mesure (meilleur gardé)")
+    parser.add_argument("--output", type=Path, help="fichier JSON des résultats")
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("AVANT", "APRES"),
+                        help="compare deux fichiers JSON de --suite")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="hausse relative signalée comme régression (défaut : 0.2)")
+    args = parser.parse_args()
+
+    if args.compare:
+        before, after = (json.loads(path.read_text()) for path in args.compare)
+        rows = compare_reports(before, after, args.threshold)
+        _print_comparison(rows)
+        sys.exit(1 if any(r["regression"] for r in rows) else 0)
+
+    if args.suite:
+        report = bench_suite(args.csv, args.scales, args.pipelines, args.repeat,
+                             args.synthetic)
+        if args.output:
+            args.output.write_text(json.dumps(report, indent=2))
+        return
+
+    if args.resample:
+        results = bench_resample(args.csv, args.workers)
+        print(f"Cœurs : {results.pop('cores')}")
+    else:
+        results = bench_load(args.csv)
+    print(f"Lignes : {results.pop('rows'):,}".replace(",", " "))
+    for label, seconds in results.items():
+        print(f"{label:<32} {seconds:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Figures Matplotlib partagées par les pages et le rapport hors ligne.
+
+Distributions de la page *Statistiques descriptives* (histogramme, densité,
+boxplot) et WordCloud de la page *Text Mining* : les pages les affichent
+avec ``st.pyplot``, :mod:`btc_data.report` les enregistre en PNG. Les
+figures ne dépendent que de leurs arguments, pas de Streamlit.
+
+Module non importé par ``btc_data`` : Matplotlib, seaborn et wordcloud ne
+sont chargés que par ceux qui dessinent.
+"""
+import matplotlib.pyplot as plt
+import numpy as np
+import seaborn as sns
+from wordcloud import WordCloud
+
+from .histograms import HIST_CENTERS, kde_from_counts
+from .sketches import sketch_quantile
+
+GRAPH_TYPES = ["Histogramme", "Densité (KDE)", "Boxplot"]
+
+# Variables de la page Statistiques descriptives : minute, puis rendements
+# des barres journalières, hebdomadaires et mensuelles (en %)
+DISTRIBUTION_VARIABLES = [
+    "Open",
+    "High",
+    "Low",
+    "Close",
+    "Volume",
+    "Volatility",
+    "RollingVol",
+    "Return_daily_pct",
+    "Return_weekly_pct",
+    "Return_monthly_pct",
+]
+
+# Variables winsorisées au 99e centile avant affichage
+WINSORIZED = ["Volume", "Volatility", "RollingVol"]
+
+
+# -----------------------------------------------
+# 🧠 Préparation des données
+# -----------------------------------------------
+def prepare_for_plot(series, variable_name, sketches=None):
+    """Série prête à tracer et indicateur d'échelle log (Volume > 100)."""
+    series = series.dropna()
+    log_used = False
+
+    # Winsorisation (seuil lu dans les résumés quand ils existent)
+    if variable_name in WINSORIZED:
+        if sketches is None:
+            p99 = series.quantile(0.99)
+        else:
+            p99 = sketch_quantile(sketches, 0.99)
+        series = series[series <= p99]
+
+    # Log automatique pour le volume
+    if variable_name == "Volume" and series.max() > 100:
+        series = np.log1p(series)
+        log_used = True
+
+    return series, log_used
+
+
+def prepare_binned(counts, variable_name, sketches):
+    """Mêmes transformations que ``prepare_for_plot``, sur les effectifs par classe.
+
+    Retourne ``(centres, effectifs, log_used)`` des classes non vides.
+    """
+    centers = HIST_CENTERS
+    log_used = False
+
+    if variable_name in WINSORIZED:
+        p99 = sketch_quantile(sketches, 0.99)
+        counts = np.where(centers <= p99, counts, 0)
+
+    if variable_name == "Volume" and counts.any() and centers[counts > 0].max() > 100:
+        centers = np.log1p(centers)
+        log_used = True
+
+    keep = counts > 0
+    return centers[keep], counts[keep], log_used
+
+
+# -----------------------------------------------
+# 📊 Distributions
+# -----------------------------------------------
+def _return_axis(ax, variable, ylabel=None):
+    # Ligne zéro et libellés des rendements
+    if "Return" in variable:
+        ax.axvline(0, color="red", linestyle="--", linewidth=2)
+        ax.set_xlabel("Return (%)")
+        return "Nombre de périodes"
+    ax.set_xlabel(variable)
+    return ylabel
+
+
+def distribution_figure(graph_type, variable, data=None, binned=None):
+    """Figure de la distribution de ``variable``.
+
+    ``data`` : série préparée (``prepare_for_plot``) ; ``binned`` :
+    ``(centres, effectifs)`` préparés (``prepare_binned``), à la place de
+    ``data`` pour l'histogramme et la densité des variables minute.
+    """
+    if graph_type == "Histogramme":
+        fig, ax = plt.subplots(figsize=(10, 4))
+        if binned is None:
+            ax.hist(data, bins=40, color="skyblue", edgecolor="black")
+        else:
+            # Histogramme pondéré par les effectifs pré-calculés
+            centers, counts = binned
+            ax.hist(centers, bins=40, weights=counts, color="skyblue", edgecolor="black")
+        ax.set_ylabel(_return_axis(ax, variable, "Fréquence"))
+        ax.set_title(f"Distribution de {variable}")
+
+    elif graph_type == "Densité (KDE)":
+        fig, ax = plt.subplots(figsize=(10, 4))
+        if binned is None:
+            sns.kdeplot(data, fill=True, color="purple", ax=ax)
+        else:
+            # KDE par convolution FFT des effectifs (temps indépendant du nombre de minutes)
+            x, density = kde_from_counts(*binned)
+            ax.plot(x, density, color="purple")
+            ax.fill_between(x, density, color="purple", alpha=0.25)
+            ax.set_ylabel("Density")
+        _return_axis(ax, variable)
+        ax.set_title(f"Densité de {variable}")
+
+    else:
+        fig, ax = plt.subplots(figsize=(10, 3))
+        sns.boxplot(x=data, color="orange", ax=ax)
+        _return_axis(ax, variable)
+        ax.set_title(f"Boxplot de {variable}")
+
+    return fig
+
+
+# -----------------------------------------------
+# ☁️ WordCloud
+# -----------------------------------------------
+def wordcloud_figure(cleaned_text):
+    """WordCloud du texte nettoyé (mots séparés par des espaces)."""
+    wc = WordCloud(
+        width=800,
+        height=400,
+        background_color="white",
+        colormap="Oranges"
+    ).generate(cleaned_text)
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.imshow(wc, interpolation="bilinear")
+    ax.axis("off")
+    return fig
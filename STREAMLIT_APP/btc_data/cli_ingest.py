@@ -0,0 +1,44 @@
+"""
+Mise à jour du cache en ligne de commande.
+
+Module séparé de :mod:`btc_data.ingest`, déjà importé par le paquet :
+``python -m`` ne doit pas réexécuter un module présent dans ``sys.modules``.
+
+Usage (depuis le dossier STREAMLIT_APP) :
+
+    python -m btc_data.cli_ingest            # incrémental si possible
+    python -m btc_data.cli_ingest --full     # reconstruction complète
+"""
+import argparse
+import time
+from pathlib import Path
+
+from .ingest import CHUNK_ROWS, ensure_cache
+from .store import CACHE_DIR, CSV_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestion du dataset Bitcoin minute.")
+    parser.add_argument("--csv", default=CSV_PATH, type=Path)
+    parser.add_argument("--cache", default=CACHE_DIR, type=Path)
+    parser.add_argument("--full", action="store_true", help="reconstruction complète")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS,
+                        help="lignes CSV lues par morceau lors d'une reconstruction")
+    parser.add_argument("--in-memory", action="store_true",
+                        help="charge tout le CSV d'un coup (pyramide elle aussi en parallèle)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processus pour les calculs par année (défaut : un par cœur)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = ensure_cache(
+        args.csv, args.cache, full=args.full, workers=args.workers,
+        chunk_rows=None if args.in_memory else args.chunk_rows,
+    )
+    print(f"Lignes : {manifest['rows']:,}".replace(",", " "))
+    print(f"Dernier Timestamp : {manifest['last']}")
+    print(f"Durée : {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
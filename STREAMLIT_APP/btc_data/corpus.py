@@ -0,0 +1,243 @@
+"""
+Mode corpus de la page Text Mining : TF-IDF creux de milliers d'articles.
+
+Le corpus est un dossier ou une archive (zip, tar, tar.gz) de fichiers
+texte ; le dossier parent de chaque fichier sert de groupe (source, mois,
+thème…). Les documents sont lus au fil de l'eau et traités par paquets de
+``CHUNK_DOCS`` : chaque paquet est nettoyé avec les règles de
+:func:`btc_data.text.clean_text` et compté dans un processus séparé, qui
+renvoie une matrice creuse documents × termes et son vocabulaire. Ses
+colonnes sont aussitôt renumérotées dans le vocabulaire commun du corpus,
+puis les matrices sont empilées : aucun dictionnaire par document n'est
+construit et les textes ne sont jamais tous en mémoire à la fois.
+
+La pondération TF-IDF (scikit-learn, normalisation L2) est appliquée à la
+matrice de comptes fusionnée, en float32 : un corpus de 100 000 articles
+tient en quelques centaines de Mo.
+"""
+import io
+import multiprocessing
+import tarfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfTransformer
+
+from .text import clean_text
+
+# Extensions lues comme documents (les autres fichiers sont ignorés)
+TEXT_SUFFIXES = (".txt", ".md")
+
+# Documents par tâche de nettoyage / comptage
+CHUNK_DOCS = 500
+
+# Groupe des fichiers à la racine du dossier ou de l'archive
+ROOT_GROUP = "(racine)"
+
+
+# -----------------------------------------------
+# 📂 Lecture du corpus
+# -----------------------------------------------
+def _document(name, data):
+    parent = Path(name).parent.as_posix()
+    group = ROOT_GROUP if parent == "." else parent
+    return name, group, data.decode("utf-8", errors="replace")
+
+
+def _is_text(name):
+    return name.lower().endswith(TEXT_SUFFIXES) and not Path(name).name.startswith(".")
+
+
+def iter_documents(source):
+    """``(nom, groupe, texte)`` de chaque fichier texte de ``source``.
+
+    ``source`` : chemin d'un dossier (parcouru récursivement) ou d'une
+    archive, ou octets / fichier ouvert d'une archive zip ou tar.
+    """
+    if isinstance(source, (str, Path)) and Path(source).is_dir():
+        root = Path(source)
+        for path in sorted(root.rglob("*")):
+            if path.is_file() and _is_text(path.name):
+                yield _document(path.relative_to(root).as_posix(), path.read_bytes())
+        return
+
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and _is_text(info.filename):
+                    yield _document(info.filename, archive.read(info))
+        return
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+        archive = tarfile.open(fileobj=source, mode="r:*")
+    else:
+        archive = tarfile.open(source, mode="r:*")
+    with archive:
+        for member in archive:
+            if member.isfile() and _is_text(member.name):
+                yield _document(member.name, archive.extractfile(member).read())
+
+
+# -----------------------------------------------
+# 🧮 Comptage parallèle
+# -----------------------------------------------
+def _count_chunk(texts, stopwords):
+    """Comptes creux (documents × termes) d'un paquet et son vocabulaire trié."""
+    tokens = [clean_text(text, stopwords) for text in texts]
+    lengths = np.fromiter((len(words) for words in tokens), dtype=np.int64, count=len(tokens))
+    flat = np.array([w for words in tokens for w in words], dtype=str)
+    terms, columns = np.unique(flat, return_inverse=True)
+    rows = np.repeat(np.arange(len(texts)), lengths)
+    counts = sparse.csr_matrix(
+        (np.ones(len(flat), dtype=np.float32), (rows, columns.ravel())),
+        shape=(len(texts), len(terms)),
+    )
+    counts.sum_duplicates()
+    return counts, terms
+
+
+def _count_chunks(chunks, stopwords, workers):
+    # Au plus 2 paquets en attente par processus : lecture, nettoyage et
+    # comptage se recouvrent sans charger tout le corpus
+    if workers <= 1:
+        for texts in chunks:
+            yield _count_chunk(texts, stopwords)
+        return
+
+    # « spawn » et non « fork » : appelé depuis le serveur Streamlit, dont
+    # les threads peuvent tenir des verrous au moment d'un fork
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        pending = deque()
+        for texts in chunks:
+            pending.append(pool.submit(_count_chunk, texts, stopwords))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _merge_counts(parts, vocabulary, min_df):
+    # Termes triés (ordre alphabétique des colonnes, comme scikit-learn),
+    # termes trop rares retirés, puis paquets concaténés et libérés un à un
+    terms = np.array(list(vocabulary), dtype=object)
+    order = np.argsort(terms)
+    doc_freq = np.zeros(len(terms), dtype=np.int64)
+    for counts in parts:
+        doc_freq += np.bincount(counts.indices, minlength=len(terms))
+    keep = doc_freq >= min_df
+    column = np.empty(len(terms), dtype=np.int32)
+    column[order] = np.cumsum(keep[order]) - 1
+
+    data, indices, indptr, words = [], [], [np.zeros(1, dtype=np.int64)], []
+    offset = 0
+    for i in range(len(parts)):
+        counts, parts[i] = parts[i], None
+        words.append(np.asarray(counts.sum(axis=1)).ravel())
+        kept = keep[counts.indices]
+        data.append(counts.data[kept])
+        indices.append(column[counts.indices[kept]])
+        row_ends = np.concatenate([[0], np.cumsum(kept)])[counts.indptr[1:]]
+        indptr.append(row_ends + offset)
+        offset += len(data[-1])
+
+    indptr = np.concatenate(indptr)
+    counts = sparse.csr_matrix(
+        (np.concatenate(data), np.concatenate(indices), indptr),
+        shape=(len(indptr) - 1, int(keep.sum())),
+    )
+    counts.sort_indices()
+    return counts, terms[order][keep[order]], np.concatenate(words).astype(np.int64)
+
+
+def corpus_tfidf(source, stopwords, workers=1, min_df=1, chunk_docs=CHUNK_DOCS):
+    """TF-IDF creux du corpus ``source`` (cf. :func:`iter_documents`).
+
+    Retourne ``(matrice, termes, documents)`` : matrice CSR float32
+    documents × termes, tableau des termes (colonnes, ordre alphabétique)
+    et DataFrame Document / Groupe / Mots (mots retenus après nettoyage).
+    Les termes présents dans moins de ``min_df`` documents sont écartés ;
+    ``workers`` > 1 : nettoyage et comptage sur autant de processus.
+    """
+    names, groups = [], []
+
+    def chunks():
+        texts = []
+        for name, group, text in iter_documents(source):
+            names.append(name)
+            groups.append(group)
+            texts.append(text)
+            if len(texts) == chunk_docs:
+                yield texts
+                texts = []
+        if texts:
+            yield texts
+
+    # Colonnes de chaque paquet renumérotées dans le vocabulaire commun dès
+    # son arrivée : seul le vocabulaire est gardé, pas celui de chaque paquet
+    vocabulary, parts = {}, []
+    for counts, chunk_terms in _count_chunks(chunks(), frozenset(stopwords), workers):
+        ids = np.fromiter(
+            (vocabulary.setdefault(term, len(vocabulary)) for term in chunk_terms.tolist()),
+            dtype=np.int32,
+            count=len(chunk_terms),
+        )
+        counts.indices = ids[counts.indices]
+        parts.append(counts)
+    if not parts:
+        raise ValueError(
+            f"Aucun document texte ({', '.join(TEXT_SUFFIXES)}) dans le corpus"
+        )
+    counts, terms, words = _merge_counts(parts, vocabulary, min_df)
+    documents = pd.DataFrame({"Document": names, "Groupe": groups, "Mots": words})
+
+    # Pondération en place : les comptes (float32) deviennent les poids
+    matrix = TfidfTransformer().fit(counts).transform(counts, copy=False)
+    return matrix.astype(np.float32, copy=False).tocsr(), terms, documents
+
+
+# -----------------------------------------------
+# 🔝 Termes dominants
+# -----------------------------------------------
+def group_tfidf(matrix, groups):
+    """TF-IDF moyen par groupe : matrice creuse groupes × termes et noms des groupes."""
+    codes, names = pd.factorize(pd.Series(groups), sort=True)
+    sizes = np.bincount(codes, minlength=len(names))
+    indicator = sparse.csr_matrix(
+        ((1.0 / sizes[codes]).astype(np.float32), (codes, np.arange(len(codes)))),
+        shape=(len(names), len(codes)),
+    )
+    return (indicator @ matrix).tocsr(), np.asarray(names)
+
+
+def top_terms(matrix, terms, rows, k=10):
+    """``k`` termes de plus fort poids de chaque ligne ``rows`` de la matrice
+    creuse, en format long : Ligne, Rang, Terme, Score."""
+    frames = []
+    for row in rows:
+        start, stop = matrix.indptr[row], matrix.indptr[row + 1]
+        scores = matrix.data[start:stop]
+        # Plus forts poids d'abord, égalités par ordre alphabétique
+        order = np.lexsort((matrix.indices[start:stop], -scores))[:k]
+        frames.append(pd.DataFrame({
+            "Ligne": row,
+            "Rang": np.arange(1, len(order) + 1),
+            "Terme": terms[matrix.indices[start:stop][order]],
+            "Score": scores[order],
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["Ligne", "Rang", "Terme", "Score"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def matrix_bytes(matrix):
+    """Mémoire occupée par une matrice CSR (valeurs, indices, pointeurs)."""
+    return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
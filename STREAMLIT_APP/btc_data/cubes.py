@@ -0,0 +1,145 @@
+"""
+Cubes d'activité pré-agrégés sur les données minute.
+
+Le cube ``weekday_hour`` a une ligne par (année, jour de semaine, heure) :
+somme, nombre, min et max du volume et de la volatilité minute. Ces
+statistiques se combinent entre années (sommes de sommes, min de min…) :
+la heatmap 7 × 24 d'une sélection d'années se calcule en agrégeant
+quelques centaines de lignes au lieu de relire les millions de minutes.
+
+Le cube ``calendar`` a une ligne par (année, mois, jour de semaine, heure)
+et résume les barres horaires et journalières de la cellule : sommes de
+Volume et Volume_USD, nombre de barres et somme de leurs écarts High - Low,
+plus haut et plus bas. Chaque jour est compté dans la cellule de sa
+première heure. Les cycles horaire, hebdomadaire et mensuel et la heatmap
+année × mois en sont des réductions (:func:`calendar_cycle`,
+:func:`calendar_months`).
+"""
+import pandas as pd
+
+# Cube -> clés de regroupement (Year toujours en premier : partitionnement)
+CUBES = {
+    "weekday_hour": ["Year", "Weekday", "Hour"],
+    "calendar": ["Year", "Month", "Weekday", "Hour"],
+}
+
+CUBE_FIELDS = ["Volume", "Volatility"]
+CUBE_STATS = ["sum", "count", "min", "max"]
+
+# Combinaison de chaque statistique entre plusieurs cellules du cube
+_COMBINE = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+
+# Période -> (nombre de barres, somme de leurs écarts High - Low) du cube calendar
+_CALENDAR_BARS = {
+    "1h": ("Hours", "Hour_range_sum"),
+    "1D": ("Days", "Day_range_sum"),
+}
+
+WEEKDAY_LABELS = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
+
+
+def _keys(timestamps, keys):
+    calendar = {
+        "Year": timestamps.dt.year,
+        "Month": timestamps.dt.month,
+        "Weekday": timestamps.dt.weekday,
+        "Hour": timestamps.dt.hour,
+    }
+    return [calendar[key].rename(key) for key in keys]
+
+
+def _calendar_cube(minutes):
+    # Barres horaires de la période (comme la pyramide : heures vides
+    # retirées), puis jour de chaque barre ; float64 pour les sommes
+    volume = minutes["Volume"].astype("float64")
+    hours = pd.DataFrame({
+        "Volume": volume,
+        "Volume_USD": volume * minutes["Close"].astype("float64"),
+        "High": minutes["High"].astype("float64"),
+        "Low": minutes["Low"].astype("float64"),
+    }).set_axis(minutes["Timestamp"]).resample("h").agg(
+        {"Volume": "sum", "Volume_USD": "sum", "High": "max", "Low": "min"}
+    ).dropna()
+
+    day = hours.index.floor("D")
+    days = hours.groupby(day).agg({"High": "max", "Low": "min"})
+    first_hour = ~day.duplicated()
+    hours["Hour_range"] = hours["High"] - hours["Low"]
+    hours["Day_start"] = first_hour.astype("int64")
+    hours["Day_range"] = 0.0
+    hours.loc[first_hour, "Day_range"] = (days["High"] - days["Low"]).to_numpy()
+
+    cube = hours.groupby(_keys(hours.index.to_series(), CUBES["calendar"])).agg(
+        Volume_sum=("Volume", "sum"),
+        Volume_USD_sum=("Volume_USD", "sum"),
+        Hours=("Volume", "count"),
+        Hour_range_sum=("Hour_range", "sum"),
+        Days=("Day_start", "sum"),
+        Day_range_sum=("Day_range", "sum"),
+        High_max=("High", "max"),
+        Low_min=("Low", "min"),
+    )
+    return cube.reset_index()
+
+
+def build_cube(name, minutes):
+    """Calcule le cube ``name`` à partir de lignes minute (Timestamp, High, Low, Close, Volume)."""
+    if name == "calendar":
+        return _calendar_cube(minutes)
+    # float64 pour les sommes : des centaines de milliers de minutes par cellule
+    values = pd.DataFrame({
+        "Volume": minutes["Volume"].astype("float64"),
+        "Volatility": minutes["High"].astype("float64") - minutes["Low"].astype("float64"),
+    })
+    cube = values.groupby(_keys(minutes["Timestamp"], CUBES[name])).agg(CUBE_STATS)
+    cube.columns = [f"{field}_{stat}" for field, stat in cube.columns]
+    return cube.reset_index()
+
+
+def combine_cube(cube, by, field, stat="mean"):
+    """Agrège les cellules du cube selon les clés ``by``.
+
+    ``stat`` parmi sum, count, min, max ou mean (somme / nombre).
+    """
+    if stat == "mean":
+        sums = combine_cube(cube, by, field, "sum")
+        return sums / combine_cube(cube, by, field, "count")
+    return cube.groupby(by)[f"{field}_{stat}"].agg(_COMBINE[stat])
+
+
+def weekday_hour_table(cube, field, stat="mean"):
+    """Tableau 7 × 24 (jours en lignes, heures en colonnes) pour la heatmap."""
+    table = combine_cube(cube, ["Weekday", "Hour"], field, stat).unstack("Hour")
+    table = table.reindex(index=range(7), columns=range(24))
+    table.index = WEEKDAY_LABELS
+    return table
+
+
+def calendar_months(cube):
+    """Barres mensuelles (index Year, Month) du cube ``calendar`` : Volume,
+    Volume_USD et Volatility (plus haut - plus bas du mois)."""
+    months = cube.groupby(["Year", "Month"]).agg(
+        Volume=("Volume_sum", "sum"),
+        Volume_USD=("Volume_USD_sum", "sum"),
+        High=("High_max", "max"),
+        Low=("Low_min", "min"),
+    )
+    return pd.DataFrame({
+        "Volume": months["Volume"],
+        "Volume_USD": months["Volume_USD"],
+        "Volatility": months["High"] - months["Low"],
+    })
+
+
+def calendar_cycle(cube, by, period):
+    """Volume, Volume_USD et Volatility moyens d'une barre ``period``
+    (1h, 1D ou 1M) du cube ``calendar``, regroupés selon les clés ``by``."""
+    if period == "1M":
+        return calendar_months(cube).groupby(by).mean()
+    bars, ranges = _CALENDAR_BARS[period]
+    sums = cube.groupby(by)[["Volume_sum", "Volume_USD_sum", bars, ranges]].sum()
+    return pd.DataFrame({
+        "Volume": sums["Volume_sum"] / sums[bars],
+        "Volume_USD": sums["Volume_USD_sum"] / sums[bars],
+        "Volatility": sums[ranges] / sums[bars],
+    })
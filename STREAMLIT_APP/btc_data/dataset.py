@@ -0,0 +1,175 @@
+"""
+Point d'entrée des pages : lecture du cache, mis à jour au besoin.
+"""
+from .cubes import CUBES
+from .export import export_file
+from .extremes import HORIZONS
+from .histograms import merge_counts
+from .ingest import ensure_cache
+from .rolling import ROLLING_LEVEL
+from .rollups import LEVELS
+from .sketches import SKETCH_VARIABLES, sketch_rows
+from .store import (
+    CACHE_DIR,
+    CSV_PATH,
+    minute_frame,
+    minute_partitions,
+    open_minute_arrays,
+    read_cube,
+    read_episodes,
+    read_extremes,
+    read_histograms,
+    read_quality,
+    read_rollup_file,
+    read_sketches,
+)
+
+
+def cache_version(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Version du dataset en cache, après mise à jour éventuelle.
+
+    À passer en argument des fonctions ``st.cache_data`` des pages : leurs
+    entrées sont ainsi invalidées dès qu'une ingestion a eu lieu.
+    """
+    return ensure_cache(csv_path, cache_dir)["version"]
+
+
+def available_years(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Années présentes dans les données minute (une partition chacune)."""
+    ensure_cache(csv_path, cache_dir)
+    return sorted(minute_partitions(cache_dir))
+
+
+def open_minutes(columns=None, years=None, csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Colonnes minute brutes en mémoire partagée (``np.memmap``, lecture seule).
+
+    Timestamp y est en minutes depuis 1970 (int32), les autres en float32.
+    Plusieurs pages ou sessions qui ouvrent ces tableaux partagent les mêmes
+    pages mémoire du système : aucune copie par appel. ``years`` ne lit que
+    les partitions des années demandées.
+    """
+    ensure_cache(csv_path, cache_dir)
+    return open_minute_arrays(cache_dir, columns, years)
+
+
+def load_minutes(columns=None, years=None, csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Retourne le dataset minute trié par Timestamp, adossé aux memmaps.
+
+    Colonnes : Timestamp, Open, High, Low, Close, Volume, Return, RollingVol,
+    Peak (plus haut historique du Close, pour le drawdown).
+    Seul Timestamp est matérialisé (datetime64) ; ne pas mettre le résultat
+    dans ``st.cache_data``, qui en ferait une copie par session.
+    """
+    return minute_frame(open_minutes(columns, years, csv_path, cache_dir))
+
+
+def load_rollup(level, columns=None, years=None, csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Retourne un niveau de la pyramide OHLCV (index Timestamp).
+
+    ``level`` parmi : 5min, 15min, 1h, 1D, 1W, 1M. Le niveau 1D contient
+    aussi Peak, le plus haut historique du Close. ``years`` ne lit que les
+    partitions de ces années (année de l'étiquette de la barre).
+    """
+    if level not in LEVELS:
+        raise ValueError(f"Niveau inconnu : {level!r} (attendu : {', '.join(LEVELS)})")
+    ensure_cache(csv_path, cache_dir)
+    return read_rollup_file(level, cache_dir, columns=columns, years=years)
+
+
+def load_rolling(columns=None, years=None, csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Statistiques glissantes horaires, calculées une fois à l'ingestion.
+
+    Une ligne par heure (index Timestamp = début de l'heure), colonnes
+    ``<champ>_<stat>_<fenêtre>`` : champ Close ou Return, stat mean, std,
+    min ou max, fenêtre 60min, 24h, 7D ou 30D (ex. ``Return_std_30D``).
+    """
+    ensure_cache(csv_path, cache_dir)
+    return read_rollup_file(ROLLING_LEVEL, cache_dir, columns=columns, years=years)
+
+
+def load_cube(name, years=None, csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Retourne un cube d'activité pré-agrégé (une ligne par cellule).
+
+    ``name`` parmi les clés de ``CUBES`` (ex. ``weekday_hour``). Colonnes :
+    les clés du cube puis ``<champ>_<stat>`` pour Volume et Volatility
+    (sum, count, min, max) ; pour ``calendar``, les résumés des barres
+    horaires et journalières (cf. ``btc_data.cubes``). ``years`` ne garde
+    que ces années.
+    """
+    if name not in CUBES:
+        raise ValueError(f"Cube inconnu : {name!r} (attendu : {', '.join(CUBES)})")
+    ensure_cache(csv_path, cache_dir)
+    return read_cube(name, cache_dir, years=years)
+
+
+def _check_variable(variable):
+    if variable not in SKETCH_VARIABLES:
+        raise ValueError(
+            f"Variable inconnue : {variable!r} (attendu : {', '.join(SKETCH_VARIABLES)})"
+        )
+
+
+def load_sketches(variable, years=None, csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Résumés statistiques annuels d'une variable minute (un par année).
+
+    À combiner avec ``describe_sketches`` / ``sketch_quantile`` : la fusion
+    ne coûte qu'une opération par année sélectionnée.
+    """
+    _check_variable(variable)
+    ensure_cache(csv_path, cache_dir)
+    return sketch_rows(read_sketches(cache_dir, variable=variable, years=years))
+
+
+def load_histogram(variable, years=None, csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Effectifs d'une variable minute dans les classes ``HIST_EDGES``.
+
+    Somme des histogrammes annuels pré-calculés des années ``years``.
+    """
+    _check_variable(variable)
+    ensure_cache(csv_path, cache_dir)
+    return merge_counts(read_histograms(cache_dir, variable=variable, years=years)["counts"])
+
+
+def load_drawdown_episodes(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Épisodes de drawdown calculés à la minute, dans l'ordre chronologique.
+
+    Colonnes : Peak_time, Trough_time, Recovery_time (NaT si en cours), Peak,
+    Trough, Depth_pct, Duration.
+    """
+    ensure_cache(csv_path, cache_dir)
+    return read_episodes(cache_dir)
+
+
+def load_extremes(horizon=None, years=None, csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Index des mouvements extrêmes : ``TOP_MOVES`` hausses et baisses par
+    (horizon, année), triées par année.
+
+    Colonnes : Horizon, Year, Direction (up / down), Rank, Start, Timestamp,
+    From, To, Return. Fusionner plusieurs années avec ``top_moves``.
+    """
+    if horizon is not None and horizon not in HORIZONS:
+        raise ValueError(f"Horizon inconnu : {horizon!r} (attendu : {', '.join(HORIZONS)})")
+    ensure_cache(csv_path, cache_dir)
+    return read_extremes(cache_dir, horizon, years)
+
+
+def load_quality(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Rapport de qualité calculé à l'ingestion (dictionnaire).
+
+    Clés principales : rows, columns (types), nulls, duplicate_timestamps,
+    duplicate_rows, was_sorted, gaps, missing_minutes, largest_gaps et
+    describe (statistiques des colonnes OHLCV, cf. ``describe_table``).
+    """
+    ensure_cache(csv_path, cache_dir)
+    return read_quality(cache_dir)
+
+
+def export_dataset(resolution, start, end, fmt="csv", csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Fichier d'export des jours ``start`` à ``end`` inclus (chemin sur disque).
+
+    ``resolution`` : ``1min`` ou un niveau de la pyramide ; ``fmt`` parmi
+    csv, csv.gz, parquet. Le fichier est écrit par morceaux au premier
+    appel, puis réutilisé tant que le dataset ne change pas.
+    """
+    version = ensure_cache(csv_path, cache_dir)["version"]
+    return export_file(resolution, start, end, fmt, version, cache_dir)
@@ -0,0 +1,94 @@
+"""
+Réduction du nombre de points envoyés aux graphiques Plotly.
+
+Un graphique de quelques centaines de pixels de large n'a pas besoin de
+plus de quelques milliers de points : au-delà, le navigateur reçoit et
+dessine des données invisibles. Chaque courbe est plafonnée à
+``POINT_BUDGET`` points :
+
+- ``minmax`` (par défaut) : les points sont répartis en tranches
+  régulières dont on garde le minimum et le maximum. Sommets, creux et
+  chandelles de krach restent visibles à la résolution de l'écran ;
+- ``lttb`` (Largest-Triangle-Three-Buckets) : un point par tranche, celui
+  qui préserve le mieux la forme de la courbe.
+
+Le premier et le dernier point sont toujours conservés.
+"""
+import numpy as np
+
+POINT_BUDGET = 2000
+
+DECIMATION_METHODS = ("minmax", "lttb")
+
+
+def _as_numbers(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.view("int64").astype("float64")
+    return values.astype("float64")
+
+
+def minmax_indices(y, budget=POINT_BUDGET):
+    """Positions du min et du max de chaque tranche (ordre chronologique)."""
+    y = _as_numbers(y)
+    n = len(y)
+    if n <= budget:
+        return np.arange(n)
+
+    buckets = max(budget // 2 - 1, 1)
+    bounds = np.linspace(0, n, buckets + 1).astype("int64")
+    bucket_of = np.repeat(np.arange(buckets), np.diff(bounds))
+    picked = [0, n - 1]
+    # fmin / fmax ignorent les NaN ; une tranche entièrement NaN n'apporte rien
+    for extreme in (np.fmin.reduceat(y, bounds[:-1]), np.fmax.reduceat(y, bounds[:-1])):
+        hits = np.flatnonzero(y == extreme[bucket_of])
+        _, first = np.unique(bucket_of[hits], return_index=True)
+        picked.append(hits[first])
+    return np.unique(np.concatenate([np.atleast_1d(p) for p in picked]))
+
+
+def lttb_indices(x, y, budget=POINT_BUDGET):
+    """Positions retenues par Largest-Triangle-Three-Buckets."""
+    x, y = _as_numbers(x), _as_numbers(y)
+    n = len(y)
+    if n <= budget or budget < 3:
+        return np.arange(n)
+
+    # Tranches sur les points intérieurs ; premier et dernier points fixes
+    bounds = np.linspace(1, n - 1, budget - 1).astype("int64")
+    picked = np.empty(budget, dtype="int64")
+    picked[0], picked[-1] = 0, n - 1
+    previous = 0
+    for i in range(budget - 2):
+        start, stop = bounds[i], bounds[i + 1]
+        # Sommet suivant : moyenne de la tranche d'après (ou dernier point)
+        if i + 2 < len(bounds):
+            next_x = np.nanmean(x[stop:bounds[i + 2]])
+            next_y = np.nanmean(y[stop:bounds[i + 2]])
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.nanargmax(area)) if not np.isnan(area).all() else start
+        picked[i + 1] = previous
+    return picked
+
+
+def decimate(df, x, y, budget=POINT_BUDGET, method="minmax"):
+    """Sous-ensemble de lignes de ``df`` à tracer pour la courbe ``y`` en fonction de ``x``.
+
+    Retourne ``df`` tel quel s'il tient déjà dans le budget.
+    """
+    if len(df) <= budget:
+        return df
+    if method == "minmax":
+        rows = minmax_indices(df[y], budget)
+    elif method == "lttb":
+        rows = lttb_indices(df[x], df[y], budget)
+    else:
+        raise ValueError(
+            f"Méthode inconnue : {method!r} (attendu : {', '.join(DECIMATION_METHODS)})"
+        )
+    return df.iloc[rows]
@@ -0,0 +1,60 @@
+"""
+Variables dérivées stockées dans le cache.
+
+Elles sont calculées à l'ingestion et, lors d'un ajout incrémental,
+uniquement sur les nouvelles lignes : il suffit de connaître les
+``CONTEXT_ROWS`` dernières lignes déjà stockées (Return, RollingVol, Peak
+minute) et le dernier plus haut journalier (Peak des barres 1D).
+"""
+import numpy as np
+import pandas as pd
+
+from .drawdown import running_peak
+
+# Fenêtre de RollingVol, en nombre de lignes minute (comme rolling(window=60))
+ROLLING_WINDOW = 60
+CONTEXT_ROWS = ROLLING_WINDOW - 1
+
+
+def add_minute_derived(df, context=None):
+    """Ajoute Return, RollingVol et Peak aux lignes minute ``df``.
+
+    ``context`` : dernières lignes déjà stockées qui précèdent ``df``.
+    """
+    close = df["Close"]
+    if context is not None and len(context):
+        close = pd.concat([context["Close"], close], ignore_index=True)
+
+    previous_peak = None
+    if context is not None and len(context) and "Peak" in context.columns:
+        previous_peak = context["Peak"].iloc[-1]
+
+    n = len(df)
+    returns = close.pct_change().to_numpy()
+    rolling_vol = close.rolling(window=ROLLING_WINDOW).std().to_numpy()
+    df["Return"] = returns[len(returns) - n:]
+    df["RollingVol"] = rolling_vol[len(rolling_vol) - n:]
+    df["Peak"] = running_peak(df["Close"], previous_peak)
+    return df
+
+
+def add_peak(daily):
+    """Complète Peak (plus haut historique du Close) là où il manque encore.
+
+    Les barres déjà pourvues sont conservées : après un ajout, seules les
+    barres recalculées (en fin de série) sont mises à jour.
+    """
+    if "Peak" not in daily.columns:
+        daily["Peak"] = np.nan
+
+    todo = daily["Peak"].isna().to_numpy()
+    if not todo.any():
+        return daily
+
+    first = int(todo.argmax())
+    previous = daily["Peak"].iloc[first - 1] if first else -np.inf
+    close = daily["Close"].to_numpy()[first:]
+    peak = daily["Peak"].to_numpy().copy()
+    peak[first:] = np.maximum.accumulate(np.maximum(close, previous))
+    daily["Peak"] = peak
+    return daily
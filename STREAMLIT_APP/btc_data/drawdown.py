@@ -0,0 +1,127 @@
+"""
+Drawdown à la minute et épisodes de drawdown.
+
+Le plus haut historique du Close (``Peak``) est stocké avec les colonnes
+minute : la courbe de drawdown d'une plage quelconque se déduit alors
+directement de Close et Peak, sans recalculer de maximum cumulé.
+
+Un épisode commence au dernier plus haut avant une baisse et se termine au
+premier Close qui le dépasse ou l'égale (reprise) ; le dernier épisode peut
+être en cours. Tout est vectorisé en un seul passage sur la série.
+"""
+import numpy as np
+import pandas as pd
+
+EPISODE_COLUMNS = [
+    "Peak_time", "Trough_time", "Recovery_time",
+    "Peak", "Trough", "Depth_pct", "Duration",
+]
+
+
+def running_peak(close, previous=None):
+    """Maximum cumulé de ``close`` (float32, comme stocké), prolongeant ``previous``."""
+    close = np.asarray(close, dtype="float32")
+    if previous is not None and not np.isnan(previous):
+        close = np.maximum(close, np.float32(previous))
+    # fmax ignore les NaN de tête ; np.maximum les propagerait à toute la série
+    return np.fmax.accumulate(close)
+
+
+def drawdown_pct(close, peak):
+    """Drawdown (%) : écart du Close à son plus haut historique."""
+    close = np.asarray(close, dtype="float64")
+    peak = np.asarray(peak, dtype="float64")
+    return (close - peak) / peak * 100
+
+
+def find_episodes(timestamps, close, peak):
+    """Table des épisodes (un par baisse sous un plus haut), dans l'ordre.
+
+    ``timestamps`` datetime64, ``close`` et ``peak`` tels que stockés.
+    Recovery_time est NaT pour un épisode en cours ; sa durée court alors
+    jusqu'à la dernière minute connue.
+    """
+    timestamps = np.asarray(timestamps, dtype="datetime64[s]")
+    close = np.asarray(close, dtype="float32")
+    peak = np.asarray(peak, dtype="float32")
+    n = len(close)
+    if not n:
+        return pd.DataFrame(columns=EPISODE_COLUMNS)
+
+    # Chaque minute au plus haut ouvre un groupe : le plus haut puis la baisse
+    at_peak = close >= peak
+    at_peak[0] = True
+    starts = np.flatnonzero(at_peak)
+    stops = np.r_[starts[1:], n]
+    dd = np.where(np.isnan(close), 0.0, drawdown_pct(close, peak))
+
+    depth = np.minimum.reduceat(dd, starts)
+    keep = depth < 0
+    group_of = np.repeat(np.arange(len(starts)), stops - starts)
+    hits = np.flatnonzero(dd == depth[group_of])
+    _, first = np.unique(group_of[hits], return_index=True)
+    trough = hits[first]
+
+    starts, stops, trough, depth = starts[keep], stops[keep], trough[keep], depth[keep]
+    recovered = stops < n
+    recovery_time = np.where(
+        recovered, timestamps[np.minimum(stops, n - 1)], np.datetime64("NaT")
+    )
+    end_time = np.where(recovered, recovery_time, timestamps[-1])
+
+    return pd.DataFrame({
+        "Peak_time": timestamps[starts],
+        "Trough_time": timestamps[trough],
+        "Recovery_time": recovery_time,
+        "Peak": peak[starts].astype("float64"),
+        "Trough": close[trough].astype("float64"),
+        "Depth_pct": depth,
+        "Duration": end_time - timestamps[starts],
+    })
+
+
+def _open_episode(close, peak):
+    """Positions du plus haut et du creux de l'épisode en cours en fin de série."""
+    at_peak = close >= peak
+    at_peak[0] = True
+    start = int(np.flatnonzero(at_peak)[-1])
+    dd = np.where(np.isnan(close[start:]), 0.0, drawdown_pct(close[start:], peak[start:]))
+    trough = start + int(np.argmin(dd))
+    return [start, trough] if dd[trough - start] < 0 else [start]
+
+
+def find_episodes_chunked(chunks):
+    """Même table que ``find_episodes``, calculée morceau par morceau.
+
+    ``chunks`` : itérable de ``(timestamps, close, peak)`` consécutifs. D'un
+    morceau à l'autre, seuls le plus haut et le creux de l'épisode en cours
+    sont gardés : la mémoire ne dépend pas de la longueur de la série.
+    """
+    done, last = [], None
+    carry = None
+    for timestamps, close, peak in chunks:
+        timestamps = np.asarray(timestamps, dtype="datetime64[s]")
+        close = np.asarray(close, dtype="float32")
+        peak = np.asarray(peak, dtype="float32")
+        if not len(close):
+            continue
+        if carry is not None:
+            timestamps, close, peak = (
+                np.concatenate([kept, new]) for kept, new in zip(carry, (timestamps, close, peak))
+            )
+
+        episodes = find_episodes(timestamps, close, peak)
+        recovered = episodes["Recovery_time"].notna()
+        done.append(episodes[recovered])
+        last = episodes[~recovered]
+        rows = _open_episode(close, peak)
+        carry = (timestamps[rows], close[rows], peak[rows])
+
+    if last is None:
+        return pd.DataFrame(columns=EPISODE_COLUMNS)
+    return pd.concat([*done, last], ignore_index=True)
+
+
+def top_episodes(episodes, n=10):
+    """Les ``n`` épisodes les plus profonds."""
+    return episodes.nsmallest(n, "Depth_pct")
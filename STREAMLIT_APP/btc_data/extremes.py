@@ -0,0 +1,103 @@
+"""
+Index des mouvements extrêmes : plus fortes hausses et baisses par horizon.
+
+Pour chaque horizon (minute, heure, jour, semaine) et chaque année, seuls
+les ``TOP_MOVES`` plus forts mouvements dans chaque sens sont gardés, avec
+leurs dates : celles des deux clôtures, c'est-à-dire de la dernière minute
+de chaque barre, quel que soit le niveau. Un pas plus long que l'horizon
+(trou dans les données) n'est pas compté. Ils sont calculés à l'ingestion, une année à la fois (Return
+minute stocké, Close des barres de la pyramide) : la mémoire reste bornée
+par une année et la table finale fait quelques milliers de lignes.
+
+Les K plus forts mouvements de plusieurs années sont forcément parmi les K
+plus forts de chacune : une sélection d'années se résout en fusionnant ces
+listes (:func:`top_moves`), sans relire la série minute.
+"""
+import numpy as np
+import pandas as pd
+
+# Horizon -> niveau de la pyramide (None = variations minute stockées)
+HORIZONS = {
+    "1min": None,
+    "1h": "1h",
+    "1D": "1D",
+    "1W": "1W",
+}
+
+# Horizon -> durée d'un pas : un écart plus long entre deux clôtures
+# (trou dans les données) n'est pas un mouvement de cet horizon
+HORIZON_STEPS = {
+    "1min": pd.Timedelta(minutes=1),
+    "1h": pd.Timedelta(hours=1),
+    "1D": pd.Timedelta(days=1),
+    "1W": pd.Timedelta(weeks=1),
+}
+
+# Mouvements gardés par (horizon, année, sens)
+TOP_MOVES = 50
+
+MOVE_COLUMNS = ["Start", "Timestamp", "From", "To", "Return"]
+
+
+def moves(timestamps, close, returns=None, max_step=None):
+    """Variations d'une clôture à la suivante (colonnes ``MOVE_COLUMNS``).
+
+    ``timestamps`` : instants des clôtures (dernière minute de chaque
+    barre). Le premier élément ne sert que de point de départ (dernier pas
+    de l'année précédente). ``returns`` : rendements déjà calculés, alignés
+    sur ``close`` (Return minute stocké) ; à défaut, tirés de ``close``.
+    ``max_step`` : les pas plus longs (trous dans les données) sont écartés.
+    """
+    timestamps = np.asarray(timestamps)
+    close = np.asarray(close, dtype="float64")
+    if returns is None:
+        returns = close[1:] / close[:-1] - 1
+    else:
+        returns = np.asarray(returns, dtype="float64")[1:]
+    table = pd.DataFrame({
+        "Start": timestamps[:-1],
+        "Timestamp": timestamps[1:],
+        "From": close[:-1],
+        "To": close[1:],
+        "Return": returns,
+    })
+    if max_step is not None:
+        table = table[table["Timestamp"] - table["Start"] <= max_step].reset_index(drop=True)
+    return table
+
+
+def _largest(values, timestamps, k):
+    # Indices des k plus grandes valeurs, décroissantes (à égalité, la plus
+    # ancienne d'abord) : sélection partielle, sans trier toute l'année
+    candidates = np.flatnonzero(values > 0)
+    if len(candidates) > k:
+        keep = np.argpartition(values[candidates], len(candidates) - k)[-k:]
+        candidates = candidates[keep]
+    order = np.lexsort((timestamps[candidates], -values[candidates]))
+    return candidates[order]
+
+
+def top_moves(table, k=TOP_MOVES):
+    """Les ``k`` plus fortes hausses puis les ``k`` plus fortes baisses de ``table``.
+
+    ``table`` : variations (cf. :func:`moves`) ou extraits de l'index à
+    fusionner. Ajoute les colonnes Direction (``up`` / ``down``) et Rank.
+    """
+    returns = table["Return"].to_numpy(dtype="float64", na_value=np.nan)
+    timestamps = table["Timestamp"].to_numpy()
+    parts = []
+    for direction, sign in [("up", 1), ("down", -1)]:
+        rows = _largest(np.nan_to_num(sign * returns), timestamps, k)
+        parts.append(table.iloc[rows].assign(Direction=direction, Rank=np.arange(1, len(rows) + 1)))
+    return pd.concat(parts, ignore_index=True)
+
+
+def year_extremes(year, moves_by_horizon, k=TOP_MOVES):
+    """Lignes de l'index pour une année : ``{horizon: variations de l'année}``."""
+    parts = [
+        top_moves(table, k).assign(Horizon=horizon, Year=year)
+        for horizon, table in moves_by_horizon.items()
+    ]
+    return pd.concat(parts, ignore_index=True)[
+        ["Horizon", "Year", "Direction", "Rank", *MOVE_COLUMNS]
+    ]
@@ -0,0 +1,106 @@
+"""
+Cache des figures Matplotlib rendues (PNG ou SVG), partagé par les sessions.
+
+Redessiner un ``sns.kdeplot``, un ``sns.boxplot`` sur des millions de
+minutes ou un WordCloud coûte jusqu'à plusieurs secondes à chaque
+interaction, même pour une combinaison déjà affichée. Les pages demandent
+donc leurs figures sous une clé formée de leurs entrées (version des
+données, variable, années, type de graphique…) : à la première demande,
+la figure est dessinée, rendue en octets puis fermée ; ensuite les octets
+sont servis tels quels.
+
+Le cache garde les figures les plus récemment utilisées dans la limite de
+``FIGURE_CACHE_BYTES`` (les plus anciennes sont oubliées). Aucune figure
+ne reste ouverte dans pyplot d'une exécution à l'autre.
+"""
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+
+# Taille maximale des figures rendues gardées en mémoire (par processus)
+FIGURE_CACHE_BYTES = 64 * 1024 ** 2
+
+# Réglages de st.pyplot : même rendu qu'une figure affichée directement
+SAVEFIG_OPTIONS = {"bbox_inches": "tight", "dpi": 200}
+
+
+def render_figure(fig, fmt="png"):
+    """Octets de ``fig`` au format ``fmt`` (png ou svg) ; la figure est fermée."""
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format=fmt, **SAVEFIG_OPTIONS)
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+class FigureCache:
+    """Figures rendues, par clé, avec éviction LRU au-delà de ``max_bytes``."""
+
+    def __init__(self, max_bytes=FIGURE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def rendered(self, key, draw, fmt="png"):
+        """Octets de la figure ``draw()`` au format ``fmt``, et ``True`` s'ils
+        viennent du cache.
+
+        ``key`` : entrées de la figure (hashables) ; ``draw`` n'est appelé
+        qu'en cas d'absence, toutes les lectures de données comprises.
+        """
+        key = (fmt, key)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data, True
+
+        # Dessin hors du verrou : les autres sessions ne sont pas bloquées
+        data = render_figure(draw(), fmt)
+        with self._lock:
+            self.misses += 1
+            self._store(key, data)
+        return data, False
+
+    def _store(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = data
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def info(self):
+        """Nombre de figures, octets occupés, limite, succès et échecs."""
+        with self._lock:
+            return {
+                "figures": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_figure_cache = FigureCache()
+
+
+def figure_cache():
+    """Le cache de figures du processus (partagé par toutes les sessions)."""
+    return _figure_cache
@@ -0,0 +1,88 @@
+"""
+Histogrammes fins pré-calculés, par année et par variable minute.
+
+Toutes les années partagent les mêmes ``HIST_BINS`` classes, régulières en
+``log1p`` sur [0, ``HIST_MAX``] : fusionner des années revient à additionner
+leurs effectifs. L'échelle logarithmique garde une résolution relative
+d'environ 0,4 % aussi bien pour un prix de 10 $ que de 100 000 $, ou pour
+des volumes de 0,01 à plusieurs milliers de BTC.
+
+Les graphiques se dessinent ensuite à partir des effectifs fusionnés
+(histogramme pondéré, KDE par convolution FFT) : temps constant, quel que
+soit le nombre de minutes sélectionnées.
+"""
+import numpy as np
+import pandas as pd
+
+from .sketches import SKETCH_VARIABLES, minute_variable
+from .store import year_ranges
+
+HIST_BINS = 4096
+HIST_MAX = 1e7
+
+_LOG_EDGES = np.linspace(0, np.log1p(HIST_MAX), HIST_BINS + 1)
+HIST_EDGES = np.expm1(_LOG_EDGES)
+HIST_CENTERS = (HIST_EDGES[:-1] + HIST_EDGES[1:]) / 2
+
+
+def bin_counts(values):
+    """Effectifs de ``values`` (positifs, sans NaN) dans les classes communes."""
+    scaled = np.log1p(np.maximum(values, 0)) * (HIST_BINS / _LOG_EDGES[-1])
+    # Au-delà de HIST_MAX : dernière classe
+    index = np.minimum(scaled.astype("int64"), HIST_BINS - 1)
+    return np.bincount(index, minlength=HIST_BINS)
+
+
+def build_histograms(minutes):
+    """Un histogramme par (année, variable) ; ``minutes`` : Timestamp + colonnes minute."""
+    rows = []
+    for year, (start, stop) in year_ranges(minutes).items():
+        part = minutes.iloc[start:stop]
+        for variable in SKETCH_VARIABLES:
+            rows.append({"Year": year, "Variable": variable,
+                         "counts": bin_counts(minute_variable(part, variable))})
+    return pd.DataFrame(rows, columns=["Year", "Variable", "counts"])
+
+
+def merge_counts(histograms):
+    """Somme des effectifs de plusieurs années."""
+    total = np.zeros(HIST_BINS, dtype="int64")
+    for counts in histograms:
+        total += counts
+    return total
+
+
+def kde_from_counts(centers, counts, gridsize=512, cut=3):
+    """Densité gaussienne d'un échantillon donné par ses effectifs par classe.
+
+    Même largeur de bande que seaborn (règle de Scott) ; les effectifs sont
+    ré-échantillonnés sur une grille régulière puis convolués au noyau par
+    FFT. Retourne ``(x, densité)``.
+    """
+    keep = counts > 0
+    centers, counts = centers[keep], counts[keep]
+    n = counts.sum()
+    if n < 2:
+        return np.array([]), np.array([])
+
+    mean = np.average(centers, weights=counts)
+    std = np.sqrt(np.average((centers - mean) ** 2, weights=counts) * n / (n - 1))
+    bandwidth = std * n ** (-1 / 5)
+    if bandwidth <= 0:
+        return np.array([]), np.array([])
+
+    lo, hi = centers[0] - cut * bandwidth, centers[-1] + cut * bandwidth
+    edges = np.linspace(lo, hi, gridsize + 1)
+    step = edges[1] - edges[0]
+    grid, _ = np.histogram(centers, bins=edges, weights=counts)
+
+    # Noyau échantillonné au pas de la grille, convolution linéaire (zéro-padding)
+    offsets = np.arange(-gridsize, gridsize + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    kernel /= kernel.sum()
+    size = 1 << int(np.ceil(np.log2(len(grid) + len(kernel) - 1)))
+    smooth = np.fft.irfft(np.fft.rfft(grid, size) * np.fft.rfft(kernel, size), size)
+    smooth = smooth[gridsize:gridsize + len(grid)]
+
+    x = (edges[:-1] + edges[1:]) / 2
+    return x, np.maximum(smooth, 0) / (n * step)
@@ -0,0 +1,563 @@
+"""
+Construction et mise à jour incrémentale du cache.
+
+Le dataset Kaggle ne fait que grossir par la fin : le manifeste garde le
+dernier Timestamp ingéré (filigrane) et la position en octets déjà lue dans
+le CSV. Une mise à jour ne parse que la fin du fichier, l'ajoute au bout des
+colonnes minute et ne recalcule que les barres et variables dérivées
+touchées par les nouvelles lignes. Si le début du fichier a changé, on
+reconstruit tout.
+
+Une reconstruction lit le CSV par morceaux de ``CHUNK_ROWS`` lignes : les
+colonnes minute sont écrites, et la pyramide et le plus haut historique
+tenus à jour, au fil de la lecture. Les agrégats suivants (cubes, résumés,
+histogrammes, mouvements extrêmes, statistiques glissantes, qualité) sont
+calculés une année par tâche sur les colonnes écrites, les années étant
+réparties sur un processus par cœur ; les épisodes de baisse, qui passent
+d'une année à l'autre, sont ensuite enchaînés partition par partition. La
+mémoire dépend donc de la taille d'un morceau et du nombre d'années
+traitées à la fois, pas de celle du fichier. Seul un CSV non trié est
+chargé entier pour être trié.
+
+En ligne de commande : :mod:`btc_data.cli_ingest`.
+"""
+import hashlib
+import io
+import multiprocessing
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrou entre threads seulement
+    fcntl = None
+
+import pandas as pd
+
+from .cubes import CUBES, build_cube
+from .derived import CONTEXT_ROWS, add_minute_derived, add_peak
+from .drawdown import find_episodes_chunked
+from .extremes import HORIZON_STEPS, HORIZONS, moves, year_extremes
+from .histograms import build_histograms
+from .quality import QUALITY_COLUMNS, quality_report, scan_minutes, year_scans
+from .rolling import ROLLING_LEVEL, build_rolling
+from .rollups import LEVELS, bar_close_time, build_rollups, default_workers, update_rollups
+from .sketches import SKETCH_VARIABLES, build_sketches
+from .store import (
+    CACHE_DIR,
+    CACHE_FORMAT,
+    CSV_PATH,
+    LOCK_FILE,
+    MINUTES_DIR,
+    ROLLUPS_DIR,
+    append_minutes,
+    dataset_version,
+    ensure_sorted,
+    iter_csv,
+    minute_frame,
+    minute_partitions,
+    open_minute_arrays,
+    parse_csv,
+    read_cube,
+    read_extremes,
+    read_histograms,
+    read_manifest,
+    read_minute_tail,
+    read_quality,
+    read_rollup_file,
+    read_sketches,
+    rollup_years,
+    swap_dir,
+    write_cube,
+    write_episodes,
+    write_extremes,
+    write_histograms,
+    write_manifest,
+    write_minutes,
+    write_quality,
+    write_rollups,
+    write_sketches,
+)
+
+# Mises à jour du cache sérialisées : threads du serveur (un par session
+# Streamlit) puis processus (verrou fcntl sur cache_dir/.lock). Réentrant :
+# ensure_cache le prend, puis build_cache / append_new_rows à nouveau.
+_UPDATE_LOCK = threading.RLock()
+_lock_depth = 0
+
+# Empreinte du début et de la fin déjà lue du CSV (détection de réécriture)
+FINGERPRINT_BYTES = 64 * 1024
+
+# Lignes CSV par morceau de lecture (~50 Mo une fois les colonnes dérivées ajoutées)
+CHUNK_ROWS = 500_000
+
+
+def _fingerprint(csv_path, offset):
+    with open(csv_path, "rb") as f:
+        head = f.read(min(offset, FINGERPRINT_BYTES))
+        f.seek(max(0, offset - FINGERPRINT_BYTES))
+        tail = f.read(min(offset, FINGERPRINT_BYTES))
+    return hashlib.sha1(head + tail).hexdigest()
+
+
+def _source_state(csv_path, offset):
+    return {
+        "version": dataset_version(csv_path),
+        "csv_offset": offset,
+        "csv_fingerprint": _fingerprint(csv_path, offset),
+    }
+
+
+def _timestamp_seconds(ts):
+    return int(ts.timestamp())
+
+
+def _stored_minutes(cache_dir, years=None):
+    # Cubes et résumés calculés sur les colonnes stockées (float32), comme à
+    # l'ajout : reconstruction et mise à jour incrémentale donnent les mêmes
+    # valeurs.
+    columns = ["Timestamp", *[v for v in SKETCH_VARIABLES if v != "Volatility"]]
+    return minute_frame(open_minute_arrays(cache_dir, columns, years=years))
+
+
+def _build_episodes(cache_dir):
+    # Un passage vectorisé par partition annuelle, seul l'épisode en cours
+    # passant d'une année à l'autre. Refait aussi après un ajout, l'épisode
+    # en cours pouvant s'être prolongé ou terminé.
+    columns = ["Timestamp", "Close", "Peak"]
+    years = (
+        minute_frame(open_minute_arrays(cache_dir, columns, years=[year]))
+        for year in sorted(minute_partitions(cache_dir))
+    )
+    return find_episodes_chunked((m["Timestamp"], m["Close"], m["Peak"]) for m in years)
+
+
+def _write_episodes(cache_dir):
+    write_episodes(_build_episodes(cache_dir), cache_dir)
+
+
+def _write_rolling(cache_dir, first_year, last_year):
+    # L'année précédente sert seulement d'historique aux fenêtres (30 j max)
+    # du début de ``first_year``.
+    minutes = minute_frame(open_minute_arrays(
+        cache_dir, ["Timestamp", "Close", "Return"], years=range(first_year - 1, last_year + 1)
+    ))
+    rolling = build_rolling(minutes)
+    rolling = rolling[rolling.index.year >= first_year]
+    write_rollups({ROLLING_LEVEL: rolling}, cache_dir, years=set(range(first_year, last_year + 1)))
+
+
+def _year_moves(cache_dir, year, partitions):
+    # Variations de l'année à chaque horizon ; le dernier pas de l'année
+    # précédente sert de point de départ à la première
+    start, stop = partitions[year]
+    arrays = open_minute_arrays(cache_dir, ["Timestamp", "Close", "Return"])
+    minutes = minute_frame({col: values[max(start - 1, 0):stop] for col, values in arrays.items()})
+    by_horizon = {}
+    for horizon, level in HORIZONS.items():
+        step = HORIZON_STEPS[horizon]
+        if level is None:
+            by_horizon[horizon] = moves(
+                minutes["Timestamp"], minutes["Close"], minutes["Return"], max_step=step
+            )
+            continue
+        bars = read_rollup_file(level, cache_dir, columns=["Close"], years=[year - 1, year])
+        bars = bars.iloc[max(int((bars.index.year < year).sum()) - 1, 0):]
+        closes = bar_close_time(bars.index, LEVELS[level][0])
+        by_horizon[horizon] = moves(closes, bars["Close"], max_step=step)
+    return by_horizon
+
+
+def _year_parts(cache_dir, year):
+    # Cubes, résumés, histogrammes et mouvements extrêmes d'une année : ils
+    # ne dépendent que de ses minutes (et de ses barres), la mémoire reste
+    # celle d'une partition.
+    minutes = _stored_minutes(cache_dir, [year])
+    return (
+        {name: build_cube(name, minutes) for name in CUBES},
+        build_sketches(minutes),
+        build_histograms(minutes),
+        year_extremes(year, _year_moves(cache_dir, year, minute_partitions(cache_dir))),
+    )
+
+
+def _concat_parts(parts):
+    cubes, sketches, histograms, extremes = zip(*parts)
+    return (
+        {name: pd.concat([c[name] for c in cubes], ignore_index=True) for name in CUBES},
+        pd.concat(sketches, ignore_index=True),
+        pd.concat(histograms, ignore_index=True),
+        pd.concat(extremes, ignore_index=True),
+    )
+
+
+def _year_aggregates(cache_dir, years):
+    return _concat_parts([_year_parts(cache_dir, year) for year in years])
+
+
+def _scan_years(cache_dir, years):
+    # Compteurs de qualité par partition ; la dernière minute de l'année
+    # précédente sert à repérer un trou au passage d'une année à l'autre.
+    partitions = minute_partitions(cache_dir)
+    timestamps = open_minute_arrays(cache_dir, ["Timestamp"])["Timestamp"]
+    scans = {}
+    for year in years:
+        if year not in partitions:
+            continue
+        start = partitions[year][0]
+        previous = int(timestamps[start - 1]) * 60 if start else None
+        minutes = minute_frame(open_minute_arrays(cache_dir, QUALITY_COLUMNS, years=[year]))
+        scans[year] = scan_minutes(minutes, previous)
+    return scans
+
+
+def _build_year(cache_dir, year):
+    # Tâche d'une reconstruction : tout ce qui se calcule année par année,
+    # sur les colonnes minute et la pyramide déjà écrites. Les statistiques
+    # glissantes sont écrites dans leur partition, le reste est retourné.
+    _write_rolling(cache_dir, year, year)
+    return _year_parts(cache_dir, year), _scan_years(cache_dir, [year])[year]
+
+
+def _build_years(cache_dir, years, workers):
+    if workers <= 1 or len(years) <= 1:
+        return [_build_year(cache_dir, year) for year in years]
+    # « spawn » : comme pour la pyramide, la reconstruction peut partir du
+    # serveur Streamlit. Chaque processus relit ses partitions sur disque.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(min(workers, len(years)), mp_context=context) as pool:
+        return list(pool.map(_build_year, repeat(cache_dir), years))
+
+
+def _minute_types(cache_dir):
+    # Types tels que vus par les pages (Timestamp converti en datetime64)
+    empty = minute_frame(open_minute_arrays(cache_dir, QUALITY_COLUMNS, years=[]))
+    return {col: str(dtype) for col, dtype in empty.dtypes.items()}
+
+
+# -----------------------------------------------
+# 🧱 Reconstruction complète
+# -----------------------------------------------
+def _flush_rollups(levels, cache_dir, year):
+    # Une barre ne contient que des minutes antérieures à son étiquette :
+    # celles des années d'avant ``year`` - 1 sont définitives, on les écrit
+    # et on les oublie. L'année précédente reste en mémoire, update_rollups
+    # pouvant relire sa fin (semaine à cheval sur le Nouvel An).
+    for name, frame in levels.items():
+        if frame.empty:
+            continue
+        keep_from = min(year - 1, frame.index[-1].year)
+        done = frame.index.year < keep_from
+        if done.any():
+            write_rollups({name: frame[done]}, cache_dir, years=set(frame.index.year[done]))
+            levels[name] = frame[~done]
+
+
+def _stream_csv(csv_path, staging, chunk_rows):
+    """Lit le CSV par morceaux et écrit colonnes minute et pyramide dans ``staging``.
+
+    Retourne ``(lignes, premier, dernier Timestamp)``, ou None si le CSV est
+    vide ou n'est pas trié (il faut alors le charger entier pour le trier).
+    """
+    levels, context = {}, None
+    rows, first = 0, None
+    for chunk in iter_csv(csv_path, chunk_rows):
+        if not len(chunk):
+            continue
+        timestamps = chunk["Timestamp"]
+        if not timestamps.is_monotonic_increasing or (
+            context is not None and timestamps.iloc[0] < context["Timestamp"].iloc[-1]
+        ):
+            return None
+
+        # Mêmes calculs qu'un ajout incrémental, avec le morceau précédent
+        # comme contexte (Return, RollingVol, Peak)
+        add_minute_derived(chunk, context)
+        if context is None:
+            write_minutes(chunk, staging / MINUTES_DIR)
+            first = timestamps.iloc[0]
+        else:
+            append_minutes(chunk, staging)
+        update_rollups(levels, chunk)
+        add_peak(levels["1D"])
+        _flush_rollups(levels, staging, timestamps.iloc[-1].year)
+
+        context = chunk.iloc[-CONTEXT_ROWS:].copy()
+        rows += len(chunk)
+
+    if context is None:
+        return None
+    years = set().union(*(frame.index.year for frame in levels.values()))
+    write_rollups(levels, staging, years=years)
+    return rows, first, context["Timestamp"].iloc[-1]
+
+
+def _load_csv(csv_path, staging, workers):
+    """Charge et trie tout le CSV, puis écrit colonnes minute et pyramide."""
+    df, was_sorted = ensure_sorted(parse_csv(csv_path))
+    add_minute_derived(df)
+    write_minutes(df, staging / MINUTES_DIR)
+    levels = build_rollups(df, workers=workers)
+    add_peak(levels["1D"])
+    write_rollups(levels, staging)
+    return len(df), df["Timestamp"].iloc[0], df["Timestamp"].iloc[-1], was_sorted
+
+
+def build_cache(csv_path=CSV_PATH, cache_dir=CACHE_DIR, workers=None, chunk_rows=CHUNK_ROWS):
+    """Reconstruit tout le cache + son manifeste.
+
+    Le CSV est lu par morceaux de ``chunk_rows`` lignes. S'il n'est pas trié
+    (ou avec ``chunk_rows=None``), il est chargé entier, trié, et la
+    pyramide est elle aussi calculée par années. Les calculs par année sont
+    répartis sur ``workers`` processus (défaut : un par cœur).
+    Tout est écrit dans un dossier de travail puis mis en place, sous
+    :func:`cache_lock`.
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with cache_lock(cache_dir):
+        # Dossier de travail unique (les sessions d'un serveur partagent le
+        # pid), retiré même si la construction échoue
+        staging = Path(tempfile.mkdtemp(dir=cache_dir, prefix=".build.", suffix=".tmp"))
+        try:
+            return _build_cache(csv_path, cache_dir, staging, workers, chunk_rows)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+
+def _build_cache(csv_path, cache_dir, staging, workers, chunk_rows):
+    start = time.perf_counter()
+    offset = Path(csv_path).stat().st_size
+    workers = default_workers() if workers is None else workers
+    streamed = chunk_rows is not None and _stream_csv(csv_path, staging, chunk_rows)
+    if streamed:
+        rows, first, last = streamed
+        was_sorted = True
+    else:
+        # Lecture par morceaux abandonnée : on repart d'un dossier vide
+        shutil.rmtree(staging)
+        staging.mkdir()
+        rows, first, last, was_sorted = _load_csv(csv_path, staging, workers)
+    parse_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    years = sorted(minute_partitions(staging))
+    built = _build_years(staging, years, workers)
+    cubes, sketches, histograms, extremes = _concat_parts([parts for parts, _ in built])
+    episodes = _build_episodes(staging)
+    quality = quality_report(
+        {year: scan for year, (_, scan) in zip(years, built)},
+        sketches, _minute_types(staging), was_sorted,
+    )
+    rollup_seconds = time.perf_counter() - start
+
+    (cache_dir / ROLLUPS_DIR).mkdir(exist_ok=True)
+    for level in [*LEVELS, ROLLING_LEVEL]:
+        swap_dir(staging / ROLLUPS_DIR / level, cache_dir / ROLLUPS_DIR / level)
+    swap_dir(staging / MINUTES_DIR, cache_dir / MINUTES_DIR)
+    shutil.rmtree(staging)
+    for name, cube in cubes.items():
+        write_cube(name, cube, cache_dir)
+    write_sketches(sketches, cache_dir)
+    write_histograms(histograms, cache_dir)
+    write_extremes(extremes, cache_dir)
+    write_episodes(episodes, cache_dir)
+    write_quality(quality, cache_dir)
+
+    manifest = {
+        "format": CACHE_FORMAT,
+        **_source_state(csv_path, offset),
+        "source": str(csv_path),
+        "rows": int(rows),
+        "was_sorted": was_sorted,
+        "first": str(first),
+        "last": str(last),
+        "watermark": _timestamp_seconds(last),
+        "parse_seconds": round(parse_seconds, 3),
+        "rollup_seconds": round(rollup_seconds, 3),
+        "chunk_rows": chunk_rows if streamed else None,
+        "workers": workers,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    write_manifest(manifest, cache_dir)
+    return manifest
+
+
+# -----------------------------------------------
+# ➕ Ajout incrémental
+# -----------------------------------------------
+def _can_append(manifest, csv_path):
+    if manifest is None or manifest.get("format") != CACHE_FORMAT:
+        return False
+    if manifest.get("watermark") is None:
+        return False
+    if manifest["version"] == dataset_version(csv_path):
+        return True
+    offset = manifest["csv_offset"]
+    if Path(csv_path).stat().st_size < offset:
+        return False
+    return _fingerprint(csv_path, offset) == manifest["csv_fingerprint"]
+
+
+def _read_new_rows(csv_path, offset):
+    """Parse uniquement les lignes complètes écrites après ``offset``."""
+    with open(csv_path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    if not data[:end].strip():
+        return None, offset
+    return parse_csv(io.BytesIO(data[:end]), header=None), offset + end
+
+
+def _update_year_aggregates(cache_dir, first_year, last_year):
+    # Seules les années touchées sont recalculées à partir de leurs partitions
+    years = list(range(first_year, last_year + 1))
+    cubes, sketches, histograms, extremes = _year_aggregates(cache_dir, years)
+    for name, fresh in cubes.items():
+        old = read_cube(name, cache_dir)
+        cube = pd.concat([old[~old["Year"].isin(years)], fresh])
+        write_cube(name, cube.sort_values(CUBES[name]).reset_index(drop=True), cache_dir)
+
+    for read, fresh, write in [
+        (read_sketches, sketches, write_sketches),
+        (read_histograms, histograms, write_histograms),
+        (read_extremes, extremes, write_extremes),
+    ]:
+        old = read(cache_dir)
+        table = pd.concat([old[~old["Year"].isin(years)], fresh])
+        write(table.sort_values("Year", kind="stable").reset_index(drop=True), cache_dir)
+
+
+def _update_quality(cache_dir, first_year, last_year, was_sorted):
+    # Compteurs des années touchées recalculés, describe() repris des
+    # résumés déjà mis à jour
+    report = read_quality(cache_dir)
+    scans = year_scans(report)
+    scans.update(_scan_years(cache_dir, range(first_year, last_year + 1)))
+    write_quality(quality_report(
+        scans, read_sketches(cache_dir), report["columns"], report["was_sorted"] and was_sorted
+    ), cache_dir)
+
+
+def append_new_rows(csv_path=CSV_PATH, cache_dir=CACHE_DIR, manifest=None):
+    """Ingère seulement la fin du CSV ; retourne le manifeste mis à jour.
+
+    Exécuté sous :func:`cache_lock` ; un ``manifest`` fourni doit avoir été
+    lu sous ce verrou.
+    """
+    cache_dir = Path(cache_dir)
+    with cache_lock(cache_dir):
+        return _append_new_rows(csv_path, cache_dir, manifest or read_manifest(cache_dir))
+
+
+def _append_new_rows(csv_path, cache_dir, manifest):
+    start = time.perf_counter()
+
+    new, offset = _read_new_rows(csv_path, manifest["csv_offset"])
+    if new is not None:
+        # Lignes déjà ingérées (recouvrement) ignorées grâce au filigrane
+        watermark = pd.Timestamp(manifest["watermark"], unit="s")
+        new, new_sorted = ensure_sorted(new[new["Timestamp"] > watermark].reset_index(drop=True))
+
+    if new is not None and len(new):
+        context = read_minute_tail(CONTEXT_ROWS, cache_dir)
+        add_minute_derived(new, context)
+        append_minutes(new, cache_dir)
+
+        # Seules les partitions récentes sont relues puis réécrites : l'année
+        # précédente (semaine à cheval sur le Nouvel An) et les suivantes
+        since = new["Timestamp"].iloc[0].year
+        levels = {}
+        for level in LEVELS:
+            years = rollup_years(level, cache_dir)
+            first = min(since - 1, years[-1]) if years else since
+            levels[level] = read_rollup_file(level, cache_dir, years=range(first, since + 1))
+        update_rollups(levels, new)
+        add_peak(levels["1D"])
+        touched = set(range(since - 1, new["Timestamp"].iloc[-1].year + 2))
+        write_rollups(levels, cache_dir, years=touched)
+        _update_year_aggregates(cache_dir, since, new["Timestamp"].iloc[-1].year)
+        _update_quality(cache_dir, since, new["Timestamp"].iloc[-1].year, new_sorted)
+        _write_episodes(cache_dir)
+        _write_rolling(cache_dir, since, new["Timestamp"].iloc[-1].year)
+
+        manifest["rows"] += int(len(new))
+        manifest["last"] = str(new["Timestamp"].iloc[-1])
+        manifest["watermark"] = _timestamp_seconds(new["Timestamp"].iloc[-1])
+
+    manifest.update(_source_state(csv_path, offset))
+    manifest["appended_rows"] = 0 if new is None else int(len(new))
+    manifest["append_seconds"] = round(time.perf_counter() - start, 3)
+    manifest["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    write_manifest(manifest, cache_dir)
+    return manifest
+
+
+# -----------------------------------------------
+# 🔄 Point d'entrée
+# -----------------------------------------------
+@contextmanager
+def cache_lock(cache_dir=CACHE_DIR):
+    """Verrou exclusif des mises à jour de ``cache_dir`` (threads et processus)."""
+    global _lock_depth
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with _UPDATE_LOCK:
+        if _lock_depth or fcntl is None:
+            _lock_depth += 1
+            try:
+                yield
+            finally:
+                _lock_depth -= 1
+            return
+
+        with open(cache_dir / LOCK_FILE, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            _lock_depth += 1
+            try:
+                yield
+            finally:
+                _lock_depth -= 1
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _up_to_date(manifest, csv_path):
+    return _can_append(manifest, csv_path) and manifest["version"] == dataset_version(csv_path)
+
+
+def ensure_cache(csv_path=CSV_PATH, cache_dir=CACHE_DIR, full=False, workers=None,
+                 chunk_rows=CHUNK_ROWS):
+    """Met le cache à jour par rapport au CSV et retourne le manifeste.
+
+    Ajout incrémental quand le CSV a seulement grossi, reconstruction
+    complète sinon. Sans CSV (déploiement avec cache seul), le cache
+    existant est utilisé tel quel.
+    """
+    manifest = read_manifest(cache_dir)
+
+    if not Path(csv_path).exists():
+        if manifest is None:
+            raise FileNotFoundError(
+                f"Ni le dataset {csv_path} ni son cache {cache_dir} n'existent."
+            )
+        return manifest
+
+    if not full and _up_to_date(manifest, csv_path):
+        return manifest
+
+    with cache_lock(cache_dir):
+        # Relu sous le verrou : une autre session ou un autre processus a pu
+        # mettre le cache à jour pendant l'attente
+        manifest = read_manifest(cache_dir)
+        if full or not _can_append(manifest, csv_path):
+            return build_cache(csv_path, cache_dir, workers, chunk_rows)
+        if manifest["version"] == dataset_version(csv_path):
+            return manifest
+        return append_new_rows(csv_path, cache_dir, manifest)
@@ -0,0 +1,221 @@
+"""
+Instrumentation des pages Streamlit : temps, CPU et mémoire par étape,
+succès / échecs des caches.
+
+Chaque page crée un :class:`PageTrace` au début de son exécution et marque
+la fin de chaque étape (``trace.lap("Chargement")``) ; les fonctions mises
+en cache utilisent :func:`cache_data` / :func:`cache_resource` à la place
+de ``st.cache_data`` / ``st.cache_resource`` pour que chaque appel soit
+compté comme succès (résultat déjà en cache) ou échec (calcul). Les mesures
+sont gardées dans la session et affichées par :func:`instrument_panel` dans
+la barre latérale, d'où elles s'exportent en JSON ou CSV.
+
+Avec la variable d'environnement ``BTC_TRACE_FILE``, chaque mesure de
+chaque session est aussi ajoutée à ce fichier (une ligne JSON par mesure),
+pour repérer les étapes lentes sous la charge réelle.
+
+Le temps CPU est celui du thread de la session (les processus et threads
+de calcul lancés par une étape n'y figurent pas) ; la variation de mémoire
+est celle du processus serveur, partagé par toutes les sessions.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from .memory import resident_memory
+
+# Mesures gardées par session (les plus anciennes sont oubliées)
+MAX_RECORDS = 2_000
+
+TRACE_FILE_ENV = "BTC_TRACE_FILE"
+
+_STATE_KEY = "_btc_instrument"
+_PANEL_KEY = "_btc_instrument_panel"
+_file_lock = threading.Lock()
+
+
+def _session():
+    return st.session_state.setdefault(_STATE_KEY, {
+        "runs": 0,
+        "current": None,
+        "records": deque(maxlen=MAX_RECORDS),
+        "cache": {},
+    })
+
+
+def _snapshot():
+    return time.perf_counter(), time.thread_time(), resident_memory()[0]
+
+
+def _write_trace_file(record):
+    path = os.environ.get(TRACE_FILE_ENV)
+    if not path:
+        return
+    ctx = get_script_run_ctx()
+    line = json.dumps({"session": ctx.session_id if ctx else None, **record})
+    with _file_lock, open(path, "a") as f:
+        f.write(line + "\n")
+
+
+class PageTrace:
+    """Mesures d'une exécution de page, étape par étape."""
+
+    def __init__(self, page):
+        self.session = _session()
+        self.session["runs"] += 1
+        self.session["current"] = self
+        self.run = self.session["runs"]
+        self.page = page
+        self._last = _snapshot()
+
+    def _record(self, stage, start, end, cache=None):
+        record = {
+            "run": self.run,
+            "page": self.page,
+            "stage": stage,
+            "wall_ms": (end[0] - start[0]) * 1000,
+            "cpu_ms": (end[1] - start[1]) * 1000,
+            "rss_delta_mb": (end[2] - start[2]) / 1024 ** 2,
+            "cache": cache,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        self.session["records"].append(record)
+        _write_trace_file(record)
+
+    def _close(self, stage, start, cache=None):
+        # La marque suivante repart d'ici : rien n'est compté deux fois
+        self._record(stage, start, _snapshot(), cache)
+        self._last = _snapshot()
+
+    def lap(self, stage, cache=None):
+        """Enregistre ``stage`` : tout ce qui s'est exécuté depuis la marque précédente.
+
+        ``cache`` : ``hit`` ou ``miss`` si l'étape a été servie par un cache
+        propre à la page (compté comme ceux de :func:`cache_data`).
+        """
+        if cache is not None:
+            count_cache(stage, cache)
+        self._close(stage, self._last, cache)
+
+    @contextmanager
+    def stage(self, stage):
+        """Mesure le bloc ``with`` (exclu de la marque suivante)."""
+        start = _snapshot()
+        try:
+            yield
+        finally:
+            self._close(stage, start)
+
+    def records(self):
+        """Mesures de cette exécution (DataFrame)."""
+        return pd.DataFrame([r for r in self.session["records"] if r["run"] == self.run])
+
+
+def count_cache(name, outcome):
+    """Compte un succès (``hit``) ou un échec (``miss``) du cache ``name`` pour la session."""
+    counts = _session()["cache"].setdefault(name, {"hit": 0, "miss": 0})
+    counts[outcome] += 1
+
+
+def _counted(st_cache, fn=None, **cache_kwargs):
+    # Le calcul n'est exécuté qu'en cas d'échec du cache : un drapeau (par
+    # thread, donc par session) levé dans la fonction décorée les distingue
+    def decorate(fn):
+        flag = threading.local()
+
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            flag.miss = True
+            return fn(*args, **kwargs)
+
+        cached = st_cache(**cache_kwargs)(compute)
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            flag.miss = False
+            trace = _session()["current"]
+            start = _snapshot()
+            result = cached(*args, **kwargs)
+            outcome = "miss" if flag.miss else "hit"
+            count_cache(name, outcome)
+            if trace is not None:
+                trace._close(f"cache : {name}", start, outcome)
+            return result
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorate if fn is None else decorate(fn)
+
+
+def cache_data(fn=None, **cache_kwargs):
+    """``st.cache_data`` avec comptage des succès / échecs."""
+    return _counted(st.cache_data, fn, **cache_kwargs)
+
+
+def cache_resource(fn=None, **cache_kwargs):
+    """``st.cache_resource`` avec comptage des succès / échecs."""
+    return _counted(st.cache_resource, fn, **cache_kwargs)
+
+
+def cache_table():
+    """Succès / échecs par fonction en cache depuis le début de la session."""
+    counts = pd.DataFrame.from_dict(_session()["cache"], orient="index", columns=["hit", "miss"])
+    counts["hit_rate"] = counts["hit"] / (counts["hit"] + counts["miss"])
+    return counts.rename_axis("function")
+
+
+def export_trace(fmt="json"):
+    """Toutes les mesures de la session : JSON (avec les compteurs de cache) ou CSV."""
+    session = _session()
+    if fmt == "csv":
+        return pd.DataFrame(list(session["records"])).to_csv(index=False)
+    return json.dumps({"records": list(session["records"]), "cache": session["cache"]}, indent=2)
+
+
+def instrument_panel(trace):
+    """Panneau optionnel de la barre latérale (à appeler en fin de page)."""
+    trace.lap("Fin de page")
+
+    # Widget à clé : Streamlit tient lui-même son état. La réaffectation
+    # avant création garde cet état d'une page à l'autre (Streamlit oublie
+    # les widgets absents d'une exécution)
+    if _PANEL_KEY in st.session_state:
+        st.session_state[_PANEL_KEY] = st.session_state[_PANEL_KEY]
+    st.sidebar.toggle("⏱️ Instrumentation", key=_PANEL_KEY)
+    if not st.session_state[_PANEL_KEY]:
+        return
+
+    records = trace.records()
+    with st.sidebar:
+        st.caption(
+            f"Exécution n° {trace.run} — {records['wall_ms'].sum():,.0f} ms".replace(",", " ")
+        )
+        st.dataframe(
+            records[["stage", "wall_ms", "cpu_ms", "rss_delta_mb", "cache"]].rename(columns={
+                "stage": "Étape",
+                "wall_ms": "Temps (ms)",
+                "cpu_ms": "CPU (ms)",
+                "rss_delta_mb": "Δ mémoire (Mo)",
+                "cache": "Cache",
+            }).round(1),
+            hide_index=True,
+        )
+        if _session()["cache"]:
+            st.caption("Caches (depuis le début de la session)")
+            st.dataframe(cache_table().round(2))
+
+        col1, col2 = st.columns(2)
+        col1.download_button("JSON", lambda: export_trace("json"),
+                             file_name="btc_trace.json", mime="application/json")
+        col2.download_button("CSV", lambda: export_trace("csv"),
+                             file_name="btc_trace.csv", mime="text/csv")
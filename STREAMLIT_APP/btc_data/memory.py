@@ -0,0 +1,54 @@
+"""
+Mesure de l'empreinte mémoire du processus Streamlit.
+"""
+import os
+import sys
+
+
+def resident_memory():
+    """Mémoire résidente du processus, en octets : ``(totale, partagée)``.
+
+    La part partagée correspond surtout aux fichiers mappés (memmaps du
+    cache), communs à toutes les sessions. Hors Linux, seul le pic de
+    mémoire est disponible et la part partagée vaut ``None``.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            fields = f.read().split()
+        page = os.sysconf("SC_PAGE_SIZE")
+        return int(fields[1]) * page, int(fields[2]) * page
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss : kilo-octets sous Linux, octets sous macOS
+        return (peak if sys.platform == "darwin" else peak * 1024), None
+
+
+def reset_peak_memory():
+    """Remet le pic de mémoire résidente au niveau actuel (Linux seulement).
+
+    Retourne ``False`` si le système ne le permet pas : le pic mesuré inclut
+    alors tout ce qui précède (imports compris).
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_memory():
+    """Pic de mémoire résidente du processus, en octets."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
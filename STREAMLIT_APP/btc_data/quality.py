@@ -0,0 +1,100 @@
+"""
+Rapport de qualité des données minute, calculé une fois à l'ingestion.
+
+Valeurs manquantes, doublons, tri, trous dans la grille minute et
+statistiques descriptives : la page d'exploration lit ce rapport au lieu de
+parcourir les millions de lignes à chaque affichage.
+
+Les compteurs sont calculés par partition annuelle et s'additionnent ; un
+ajout incrémental ne recalcule que les années touchées. Les statistiques
+descriptives viennent des résumés fusionnables (:mod:`btc_data.sketches`).
+"""
+import numpy as np
+import pandas as pd
+
+from .sketches import RANK_ERROR, describe_sketches, sketch_rows
+from .store import OHLCV
+
+QUALITY_COLUMNS = ["Timestamp", *OHLCV]
+
+# Nombre de plus grands trous gardés dans le rapport
+TOP_GAPS = 10
+
+_COUNTERS = ["rows", "duplicate_timestamps", "duplicate_rows", "gaps", "missing_minutes"]
+
+
+def scan_minutes(minutes, previous=None):
+    """Compteurs de qualité de lignes minute triées (Timestamp + OHLCV).
+
+    ``previous`` : dernier Timestamp des lignes qui précèdent, pour compter
+    un trou à la jonction.
+    """
+    timestamps = minutes["Timestamp"].to_numpy().astype("datetime64[s]")
+    if previous is not None:
+        timestamps = np.r_[np.datetime64(previous, "s"), timestamps]
+    step = np.diff(timestamps).astype("int64")
+
+    # Deux lignes identiques ont le même Timestamp : on ne compare que les
+    # lignes des Timestamps en double (quelques-unes au plus)
+    shared = minutes[minutes["Timestamp"].duplicated(keep=False)]
+    gaps = np.flatnonzero(step > 60)
+    largest = gaps[np.argsort(step[gaps], kind="stable")[::-1][:TOP_GAPS]]
+
+    return {
+        "rows": int(len(minutes)),
+        "nulls": {col: int(n) for col, n in minutes[QUALITY_COLUMNS].isna().sum().items()},
+        "duplicate_timestamps": int((step == 0).sum()),
+        "duplicate_rows": int(shared[QUALITY_COLUMNS].duplicated().sum()),
+        "gaps": int(len(gaps)),
+        "missing_minutes": int((step[gaps] // 60 - 1).sum()),
+        "largest_gaps": [
+            {"start": str(timestamps[i]), "end": str(timestamps[i + 1]),
+             "missing_minutes": int(step[i] // 60 - 1)}
+            for i in largest
+        ],
+    }
+
+
+def merge_scans(scans):
+    """Additionne les compteurs de plusieurs partitions."""
+    merged = {key: 0 for key in _COUNTERS}
+    merged["nulls"] = {col: 0 for col in QUALITY_COLUMNS}
+    gaps = []
+    for scan in scans:
+        for key in _COUNTERS:
+            merged[key] += scan[key]
+        for col, n in scan["nulls"].items():
+            merged["nulls"][col] += n
+        gaps.extend(scan["largest_gaps"])
+    merged["largest_gaps"] = sorted(gaps, key=lambda g: -g["missing_minutes"])[:TOP_GAPS]
+    return merged
+
+
+def quality_report(scans, sketches, types, was_sorted):
+    """Rapport complet à enregistrer.
+
+    ``scans`` : ``{année: scan_minutes(...)}`` ; ``sketches`` : table des
+    résumés ; ``types`` : ``{colonne: type}`` du DataFrame minute.
+    """
+    describe = {}
+    for col in OHLCV:
+        stats = describe_sketches(sketch_rows(sketches[sketches["Variable"] == col]))
+        describe[col] = stats.drop(["skewness", "kurtosis"]).astype("float64").to_dict()
+    return {
+        **merge_scans(scans[year] for year in sorted(scans)),
+        "columns": dict(types),
+        "was_sorted": bool(was_sorted),
+        "describe": describe,
+        "quantile_rank_error": RANK_ERROR,
+        "years": {str(year): scans[year] for year in sorted(scans)},
+    }
+
+
+def year_scans(report):
+    """Compteurs par année d'un rapport enregistré (clés entières)."""
+    return {int(year): scan for year, scan in report["years"].items()}
+
+
+def describe_table(report):
+    """Tableau façon ``df.describe().T`` (une ligne par colonne OHLCV)."""
+    return pd.DataFrame(report["describe"]).T
@@ -0,0 +1,520 @@
+"""
+Rapport hors ligne : les analyses des pages 1 à 6, sans Streamlit.
+
+Les calculs des pages sont refaits sur la couche de données avec leurs
+sélections par défaut (toutes les années), pour chaque variable, échelle
+ou fenêtre proposée. Le cache est mis à jour une fois, puis chaque élément
+est calculé et dessiné dans un processus de travail : graphiques Plotly en
+HTML, Matplotlib en PNG, tableaux en CSV.
+
+Le dossier produit se suffit à lui-même : ``index.html`` présente tout le
+rapport, ``plotly.min.js`` y est copié une fois pour toutes les pages
+Plotly, et ``report.json`` donne l'état et la durée de chaque élément.
+``--timeout`` borne la durée totale : ce qui n'est pas terminé à temps est
+noté ``timeout`` et les processus sont arrêtés. Le code de sortie est non
+nul si un élément a échoué.
+
+Usage (depuis le dossier STREAMLIT_APP) :
+
+    python -m btc_data.report data/report
+    python -m btc_data.report data/report --pages 3 4 --workers 4
+    python -m btc_data.report data/report --timeout 600 --text article.txt
+"""
+import argparse
+import functools
+import html
+import json
+import multiprocessing
+import time
+from collections import Counter
+from multiprocessing import get_context
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")  # sans affichage ; avant pyplot (importé aussi par charts)
+
+import matplotlib.pyplot as plt
+import pandas as pd
+import plotly.express as px
+from plotly.offline import get_plotlyjs
+
+from .charts import (
+    DISTRIBUTION_VARIABLES,
+    GRAPH_TYPES,
+    distribution_figure,
+    prepare_binned,
+    prepare_for_plot,
+    wordcloud_figure,
+)
+from .cubes import WEEKDAY_LABELS, calendar_cycle, calendar_months, weekday_hour_table
+from .dataset import (
+    load_cube,
+    load_drawdown_episodes,
+    load_histogram,
+    load_minutes,
+    load_quality,
+    load_rolling,
+    load_rollup,
+    load_sketches,
+)
+from .decimate import decimate
+from .drawdown import drawdown_pct, top_episodes
+from .ingest import ensure_cache
+from .quality import describe_table
+from .rolling import WINDOWS, rolling_column
+from .rollups import default_workers
+from .sketches import describe_sketches
+from .store import CACHE_DIR, CSV_PATH, OHLCV
+from .text import SAMPLE_TEXT, clean_text, french_stopwords
+
+# Durée maximale du rapport complet (secondes)
+REPORT_TIMEOUT = 15 * 60
+
+PAGES = {
+    1: "Exploration des données",
+    2: "Statistiques descriptives",
+    3: "Visualisations interactives",
+    4: "Cycles & Heatmaps",
+    5: "Performance & Drawdown",
+    6: "Text Mining",
+}
+
+# Échelles de la page 3 et rendements de la page 2 -> niveau de la pyramide
+SCALES = {"Heure": "1h", "Jour": "1D", "Semaine": "1W", "Mois": "1M"}
+RETURN_LEVELS = {
+    "Return_daily_pct": "1D",
+    "Return_weekly_pct": "1W",
+    "Return_monthly_pct": "1M",
+}
+
+PNG_DPI = 100
+_SUFFIXES = {"plotly": ".html", "matplotlib": ".png", "table": ".csv"}
+
+
+# -----------------------------------------------
+# 🔧 Données (gardées par processus de travail)
+# -----------------------------------------------
+@functools.lru_cache(maxsize=None)
+def _bars(level, **source):
+    # Barres OHLCV + Volume_USD, Volatility, Year ; partagées par les
+    # éléments d'un même processus : ne pas les modifier
+    bars = load_rollup(level, columns=OHLCV, **source)
+    return bars.assign(
+        Volume_USD=bars["Volume"] * bars["Close"],
+        Volatility=bars["High"] - bars["Low"],
+        Year=bars.index.year,
+        Timestamp=bars.index,
+    )
+
+
+def _returns(variable, **source):
+    close = _bars(RETURN_LEVELS[variable], **source)["Close"]
+    return (close.pct_change() * 100).rename(variable)
+
+
+def _minute_series(variable, **source):
+    if variable == "Volatility":
+        df = load_minutes(columns=["High", "Low"], **source)
+        return df["High"] - df["Low"]
+    return load_minutes(columns=[variable], **source)[variable]
+
+
+# -----------------------------------------------
+# 1️⃣ Exploration des données
+# -----------------------------------------------
+def _quality_table(source, part):
+    quality = load_quality(**source)
+    if part == "types":
+        return pd.Series(quality["columns"], name="Type").to_frame()
+    if part == "nulls":
+        return pd.Series(quality["nulls"], name="Valeurs manquantes").to_frame()
+    if part == "gaps":
+        return pd.DataFrame(quality["largest_gaps"], columns=["start", "end", "missing_minutes"])
+    return describe_table(quality)
+
+
+# -----------------------------------------------
+# 2️⃣ Statistiques descriptives
+# -----------------------------------------------
+def _describe_variables(source):
+    columns = {}
+    for variable in DISTRIBUTION_VARIABLES:
+        if variable in RETURN_LEVELS:
+            series = _returns(variable, **source).dropna()
+            stats = series.describe()
+            stats["skewness"] = series.skew()
+            stats["kurtosis"] = series.kurt()
+        else:
+            stats = describe_sketches(load_sketches(variable, **source))
+        columns[variable] = stats.round(4)
+    return pd.DataFrame(columns)
+
+
+def _distribution(source, variable, graph_type):
+    if variable in RETURN_LEVELS:
+        data, _ = prepare_for_plot(_returns(variable, **source), variable)
+        return distribution_figure(graph_type, variable, data)
+
+    # Variables minute : effectifs pré-calculés, minutes lues pour le boxplot
+    sketches = load_sketches(variable, **source)
+    if graph_type == "Boxplot":
+        data, _ = prepare_for_plot(_minute_series(variable, **source), variable, sketches)
+        return distribution_figure(graph_type, variable, data)
+    centers, counts, _ = prepare_binned(load_histogram(variable, **source), variable, sketches)
+    return distribution_figure(graph_type, variable, binned=(centers, counts))
+
+
+# -----------------------------------------------
+# 3️⃣ Visualisations interactives
+# -----------------------------------------------
+_CURVE_LABELS = {"Close": "Prix ($)", "Volume": "Volume (BTC)", "Volume_USD": "Volume ($)"}
+_BOX_LABELS = {"Volatility": "Volatilité ($)", "Volume_USD": "Volume ($)"}
+_HEATMAP_LABELS = {"Volume": "Volume moyen (BTC)", "Volatility": "Volatilité moyenne ($)"}
+
+
+def _curve(source, level, column):
+    return px.line(
+        decimate(_bars(level, **source), "Timestamp", column),
+        x="Timestamp",
+        y=column,
+        labels={column: _CURVE_LABELS[column], "Timestamp": "Date"}
+    )
+
+
+def _box(source, level, column):
+    return px.box(_bars(level, **source), y=column, labels={column: _BOX_LABELS[column]})
+
+
+def _weekday_hour(source, field):
+    return px.imshow(
+        weekday_hour_table(load_cube("weekday_hour", **source), field),
+        aspect="auto",
+        color_continuous_scale="YlOrRd",
+        labels=dict(x="Heure (UTC)", y="Jour", color=_HEATMAP_LABELS[field])
+    )
+
+
+# -----------------------------------------------
+# 4️⃣ Cycles & Heatmaps
+# -----------------------------------------------
+_CYCLE_LABELS = {"Volume": "Volume moyen (BTC)", "Volatility": "Volatilité moyenne ($)"}
+_CYCLE_TITLES = {"Volume": "Volume moyen par", "Volatility": "Volatilité moyenne par"}
+
+
+def _cycle(source, by, period, column):
+    table = calendar_cycle(load_cube("calendar", **source), by, period).reset_index()
+    if by == "Weekday":
+        table["Jour"] = table["Weekday"].map(dict(enumerate(WEEKDAY_LABELS)))
+        return px.bar(table, x="Jour", y=column, labels={column: _CYCLE_LABELS[column]},
+                      title=f"{_CYCLE_TITLES[column]} jour")
+    axis = {"Hour": ("Heure (UTC)", "heure"), "Month": ("Mois", "mois")}[by]
+    return px.line(table, x=by, y=column, labels={column: _CYCLE_LABELS[column], by: axis[0]},
+                   title=f"{_CYCLE_TITLES[column]} {axis[1]}")
+
+
+def _season_heatmap(source, column):
+    pivot = calendar_months(load_cube("calendar", **source))[column].unstack("Month")
+    label = "Volume moyen (BTC)" if column == "Volume" else "Volatilité moyenne ($)"
+    return px.imshow(pivot, aspect="auto", color_continuous_scale="YlOrRd", labels={"color": label})
+
+
+# -----------------------------------------------
+# 5️⃣ Performance & Drawdown
+# -----------------------------------------------
+def _yearly_performance(source):
+    yearly_close = _bars("1D", **source).groupby("Year")["Close"].agg(["first", "last"])
+    perf = ((yearly_close["last"] / yearly_close["first"] - 1) * 100).rename("Return_pct")
+    return px.bar(
+        perf.reset_index(),
+        x="Year",
+        y="Return_pct",
+        labels={"Return_pct": "Performance (%)", "Year": "Année"},
+        title="Performance annuelle du Bitcoin (%)",
+        color="Return_pct",
+        color_continuous_scale="RdYlGn"
+    )
+
+
+def _yearly_volatility(source):
+    volatility = _bars("1D", **source).groupby("Year")["Volatility"].mean()
+    return px.bar(
+        volatility.rename("Volatilité_moyenne").reset_index(),
+        x="Year",
+        y="Volatilité_moyenne",
+        labels={"Volatilité_moyenne": "Volatilité (moyenne daily en $)", "Year": "Année"},
+        title="Volatilité moyenne du Bitcoin par année"
+    )
+
+
+def _rolling_volatility(source, window):
+    column = rolling_column("Return", "std", window)
+    rolling = load_rolling(columns=[column], **source).reset_index()
+    rolling[column] = rolling[column] * 100
+    return px.line(
+        decimate(rolling, "Timestamp", column),
+        x="Timestamp",
+        y=column,
+        labels={column: "Écart-type (%)", "Timestamp": "Date"},
+        title=f"Écart-type glissant ({window}) des rendements minute"
+    )
+
+
+def _drawdown(source):
+    minutes = load_minutes(columns=["Timestamp", "Close", "Peak"], **source)
+    curve = pd.DataFrame({
+        "Timestamp": minutes["Timestamp"],
+        "Drawdown_pct": drawdown_pct(minutes["Close"], minutes["Peak"]),
+    })
+    fig = px.area(
+        decimate(curve, "Timestamp", "Drawdown_pct"),
+        x="Timestamp",
+        y="Drawdown_pct",
+        labels={"Drawdown_pct": "Drawdown (%)", "Timestamp": "Date"},
+        title="Drawdown du Bitcoin (baisse par rapport au dernier plus haut)"
+    )
+    return fig.update_traces(line_color="red")
+
+
+def _worst_episodes(source):
+    top = top_episodes(load_drawdown_episodes(**source), 50)
+    return pd.DataFrame({
+        "Plus haut": top["Peak_time"],
+        "Creux": top["Trough_time"],
+        "Reprise": top["Recovery_time"],
+        "Prix au plus haut ($)": top["Peak"].round(2),
+        "Prix au creux ($)": top["Trough"].round(2),
+        "Profondeur (%)": top["Depth_pct"].round(2),
+        "Durée (jours)": (top["Duration"].dt.total_seconds() / 86400).round(1),
+    }).reset_index(drop=True)
+
+
+# -----------------------------------------------
+# 6️⃣ Text Mining
+# -----------------------------------------------
+def _words(text):
+    return clean_text(text, french_stopwords())
+
+
+def _top_words(source, text):
+    return pd.DataFrame(Counter(_words(text)).most_common(30), columns=["Mot", "Fréquence"])
+
+
+def _wordcloud(source, text):
+    return wordcloud_figure(" ".join(_words(text)))
+
+
+# -----------------------------------------------
+# 📋 Éléments du rapport
+# -----------------------------------------------
+def report_items(text=SAMPLE_TEXT):
+    """Éléments du rapport : ``(page, nom, titre, type, fonction, paramètres)``.
+
+    ``type`` parmi plotly, matplotlib et table ; ``fonction(source,
+    **paramètres)`` retourne la figure ou le DataFrame.
+    """
+    items = [
+        (1, "1_types", "Types des variables", "table", _quality_table, {"part": "types"}),
+        (1, "1_manquants", "Valeurs manquantes", "table", _quality_table, {"part": "nulls"}),
+        (1, "1_trous", "Plus grands trous de la grille minute", "table", _quality_table,
+         {"part": "gaps"}),
+        (1, "1_statistiques", "Statistiques descriptives (OHLCV)", "table", _quality_table,
+         {"part": "describe"}),
+        (2, "2_statistiques", "Statistiques descriptives par variable", "table",
+         _describe_variables, {}),
+    ]
+    for variable in DISTRIBUTION_VARIABLES:
+        for number, graph_type in enumerate(GRAPH_TYPES):
+            items.append((2, f"2_{variable}_{number}", f"{graph_type} — {variable}", "matplotlib",
+                          _distribution, {"variable": variable, "graph_type": graph_type}))
+
+    for scale, level in SCALES.items():
+        for column, title in [("Close", "Prix"), ("Volume", "Volume (BTC)"),
+                              ("Volume_USD", "Volume (USD)")]:
+            items.append((3, f"3_{column}_{level}", f"{title} — {scale.lower()}", "plotly",
+                          _curve, {"level": level, "column": column}))
+        for column in _BOX_LABELS:
+            items.append((3, f"3_box_{column}_{level}", f"Distribution de {column} — "
+                          f"{scale.lower()}", "plotly", _box, {"level": level, "column": column}))
+    for field, label in _HEATMAP_LABELS.items():
+        items.append((3, f"3_heatmap_{field}", f"Jour × heure — {label}", "plotly",
+                      _weekday_hour, {"field": field}))
+
+    for by, period, name in [("Hour", "1h", "journalier"), ("Weekday", "1D", "hebdomadaire"),
+                             ("Month", "1M", "mensuel")]:
+        for column in _CYCLE_LABELS:
+            items.append((4, f"4_{by}_{column}", f"Cycle {name} — {column}", "plotly",
+                          _cycle, {"by": by, "period": period, "column": column}))
+    for column in ["Volume", "Volatility"]:
+        items.append((4, f"4_saison_{column}", f"Année × mois — {column}", "plotly",
+                      _season_heatmap, {"column": column}))
+
+    items += [
+        (5, "5_performance", "Performance annuelle (%)", "plotly", _yearly_performance, {}),
+        (5, "5_volatilite", "Volatilité journalière moyenne par année", "plotly",
+         _yearly_volatility, {}),
+        *[(5, f"5_glissante_{window}", f"Volatilité glissante ({window})", "plotly",
+           _rolling_volatility, {"window": window}) for window in WINDOWS],
+        (5, "5_drawdown", "Drawdown (%)", "plotly", _drawdown, {}),
+        (5, "5_episodes", "Pires épisodes de drawdown", "table", _worst_episodes, {}),
+        (6, "6_mots", "Mots les plus fréquents", "table", _top_words, {"text": text}),
+        (6, "6_wordcloud", "WordCloud du vocabulaire dominant", "matplotlib", _wordcloud,
+         {"text": text}),
+    ]
+    return items
+
+
+def _record(item, **fields):
+    page, name, title, kind, _, _ = item
+    return {"page": page, "name": name, "title": title, "kind": kind, **fields}
+
+
+def _render(item, output, source):
+    """Calcule et écrit un élément (dans un processus de travail)."""
+    _, name, _, kind, build, params = item
+    start = time.perf_counter()
+    try:
+        result = build(source, **params)
+        path = Path(output) / f"{name}{_SUFFIXES[kind]}"
+        if kind == "plotly":
+            # plotly.min.js déjà copié dans le dossier : simple référence
+            result.write_html(path, include_plotlyjs="directory", full_html=True)
+        elif kind == "matplotlib":
+            result.savefig(path, dpi=PNG_DPI, bbox_inches="tight")
+            plt.close(result)
+        else:
+            result.to_csv(path)
+        fields = {"status": "ok", "file": path.name}
+    except Exception as exc:
+        fields = {"status": "error", "error": f"{type(exc).__name__}: {exc}"}
+    return _record(item, seconds=round(time.perf_counter() - start, 3), **fields)
+
+
+# -----------------------------------------------
+# 🌐 Page d'index
+# -----------------------------------------------
+def _item_html(output, record):
+    title = f"<h3>{html.escape(record['title'])}</h3>"
+    if record["status"] != "ok":
+        return f"{title}<p class='error'>{html.escape(record.get('error', record['status']))}</p>"
+    file = html.escape(record["file"])
+    if record["kind"] == "table":
+        table = pd.read_csv(Path(output) / record["file"], index_col=0)
+        return f"{title}{table.to_html(border=0)}<p><a href='{file}'>CSV</a></p>"
+    if record["kind"] == "matplotlib":
+        return f"{title}<img src='{file}' alt='{html.escape(record['title'])}'>"
+    return (f"{title}<iframe src='{file}' loading='lazy'></iframe>"
+            f"<p><a href='{file}'>Plein écran</a></p>")
+
+
+def _write_index(output, summary):
+    sections = []
+    for page, name in PAGES.items():
+        records = [r for r in summary["items"] if r["page"] == page]
+        if records:
+            body = "".join(_item_html(output, r) for r in records)
+            sections.append(f"<section><h2>{page}. {html.escape(name)}</h2>{body}</section>")
+    rows = f"{summary['rows']:,}".replace(",", " ")
+    (Path(output) / "index.html").write_text(f"""<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8"><title>Rapport Bitcoin</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em auto; max-width: 1100px; }}
+iframe {{ border: 0; width: 100%; height: 500px; }}
+img {{ max-width: 100%; }}
+table {{ border-collapse: collapse; font-size: 0.9em; }}
+td, th {{ padding: 2px 8px; text-align: right; }}
+.error {{ color: #b00; }}
+</style></head><body>
+<h1>Rapport Bitcoin</h1>
+<p>Données : {html.escape(summary["source"])} ({rows} lignes, version
+{html.escape(summary["version"])}), rapport généré le {summary["created_at"]}
+en {summary["seconds"]:.1f} s.</p>
+{"".join(sections)}
+</body></html>
+""")
+
+
+# -----------------------------------------------
+# 🚀 Génération
+# -----------------------------------------------
+def build_report(output, pages=None, workers=None, timeout=REPORT_TIMEOUT, text=SAMPLE_TEXT,
+                 csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Écrit le rapport dans le dossier ``output`` et retourne son résumé.
+
+    ``pages`` : numéros des pages à inclure (toutes par défaut) ;
+    ``workers`` : processus de calcul et de rendu (défaut : un par cœur) ;
+    ``timeout`` : durée maximale en secondes, cache compris.
+    """
+    start = time.perf_counter()
+    deadline = time.monotonic() + timeout
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+
+    # Cache mis à jour une seule fois, avant de lancer les processus
+    manifest = ensure_cache(csv_path, cache_dir)
+    (output / "plotly.min.js").write_text(get_plotlyjs())
+
+    items = [item for item in report_items(text) if pages is None or item[0] in pages]
+    source = {"csv_path": Path(csv_path), "cache_dir": Path(cache_dir)}
+    workers = default_workers() if workers is None else workers
+
+    records = []
+    pool = get_context("spawn").Pool(workers)
+    try:
+        pending = [(item, pool.apply_async(_render, (item, str(output), source))) for item in items]
+        for item, result in pending:
+            try:
+                records.append(result.get(max(0.0, deadline - time.monotonic())))
+            except multiprocessing.TimeoutError:
+                records.append(_record(item, status="timeout"))
+            except Exception as exc:
+                records.append(_record(item, status="error", error=f"{type(exc).__name__}: {exc}"))
+    finally:
+        # Éléments en retard : les processus sont arrêtés sans les attendre
+        pool.terminate()
+        pool.join()
+
+    summary = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "source": str(csv_path),
+        "version": manifest["version"],
+        "rows": manifest["rows"],
+        "workers": workers,
+        "timeout": timeout,
+        "seconds": round(time.perf_counter() - start, 3),
+        "items": records,
+    }
+    _write_index(output, summary)
+    (output / "report.json").write_text(json.dumps(summary, indent=2, ensure_ascii=False))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rapport hors ligne des pages 1 à 6.")
+    parser.add_argument("output", type=Path, help="dossier du rapport")
+    parser.add_argument("--csv", default=CSV_PATH, type=Path)
+    parser.add_argument("--cache", default=CACHE_DIR, type=Path)
+    parser.add_argument("--pages", type=int, nargs="+", choices=list(PAGES),
+                        help="pages à inclure (toutes par défaut)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processus de calcul et de rendu (défaut : un par cœur)")
+    parser.add_argument("--timeout", type=float, default=REPORT_TIMEOUT,
+                        help=f"durée maximale en secondes (défaut : {REPORT_TIMEOUT})")
+    parser.add_argument("--text", type=Path, default=None,
+                        help="texte de la page Text Mining (défaut : article d'exemple)")
+    args = parser.parse_args()
+
+    text = SAMPLE_TEXT if args.text is None else args.text.read_text()
+    summary = build_report(args.output, args.pages, args.workers, args.timeout, text,
+                           args.csv, args.cache)
+
+    failed = [r for r in summary["items"] if r["status"] != "ok"]
+    for record in failed:
+        print(f"{record['status']:<8} {record['name']}  {record.get('error', '')}")
+    print(f"{len(summary['items']) - len(failed)}/{len(summary['items'])} éléments écrits dans "
+          f"{args.output} en {summary['seconds']:.1f} s ({summary['workers']} processus)")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Pyramide d'agrégats OHLCV multi-résolution (1 min → 5 min → … → 1 mois).
+
+Seul le premier niveau (5 min) est calculé à partir des 7 M de lignes
+minute ; chaque niveau plus grossier est ensuite agrégé à partir du niveau
+immédiatement plus fin, ce qui donne les mêmes barres qu'un resample direct
+(first / max / min / last / sum sont composables).
+
+Pour une reconstruction complète, les minutes peuvent être découpées par
+année (ou par mois) et chaque morceau agrégé dans un processus séparé ; les
+barres à cheval sur deux morceaux (semaine du Nouvel An…) sont ensuite
+fusionnées avec les mêmes règles.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# Niveau -> (règle pandas, niveau source). None = données minute.
+# Les mois ne sont pas un multiple des semaines : 1M repart du journalier.
+LEVELS = {
+    "5min": ("5min", None),
+    "15min": ("15min", "5min"),
+    "1h": ("h", "15min"),
+    "1D": ("D", "1h"),
+    "1W": ("W", "1D"),
+    "1M": ("ME", "1D"),
+}
+
+OHLCV_AGG = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Volume": "sum",
+    "Volume_USD": "sum",
+}
+
+
+def resample_ohlcv(df, rule):
+    """Agrège un DataFrame OHLCV indexé par Timestamp ; périodes vides retirées."""
+    agg = {col: how for col, how in OHLCV_AGG.items() if col in df.columns}
+    return df.resample(rule).agg(agg).dropna()
+
+
+def _minute_base(minutes):
+    base = minutes.set_index("Timestamp")
+    return base.assign(Volume_USD=base["Volume"] * base["Close"])
+
+
+def _build_levels(minutes):
+    base = _minute_base(minutes)
+
+    levels = {}
+    for name, (rule, source) in LEVELS.items():
+        finer = base if source is None else levels[source]
+        levels[name] = resample_ohlcv(finer, rule)
+    return levels
+
+
+def merge_chunks(frames):
+    """Concatène les barres de morceaux consécutifs.
+
+    Une barre présente dans deux morceaux (même étiquette) est recombinée :
+    Open du premier, Close du dernier, max / min / somme sur les deux.
+    """
+    combined = pd.concat(frames)
+    shared = combined.index.duplicated(keep=False)
+    if not shared.any():
+        return combined
+    agg = {col: how for col, how in OHLCV_AGG.items() if col in combined.columns}
+    merged = combined[shared].groupby(level=0, sort=False).agg(agg)
+    return pd.concat([combined[~shared], merged]).sort_index()
+
+
+def chunk_bounds(minutes, by="year"):
+    """Plages de lignes ``(début, fin)`` des années ou des mois consécutifs."""
+    ts = minutes["Timestamp"].dt
+    periods = ts.year.to_numpy() if by == "year" else (ts.year * 12 + ts.month).to_numpy()
+    if not len(periods):
+        return []
+    starts = [0, *(i + 1 for i in (periods[1:] != periods[:-1]).nonzero()[0])]
+    return list(zip(starts, [*starts[1:], len(periods)]))
+
+
+def build_rollups(minutes, workers=1, chunk="year"):
+    """Construit tous les niveaux à partir du DataFrame minute trié.
+
+    ``workers`` > 1 : un morceau (``chunk`` = year ou month) par tâche dans
+    un pool de processus, chaque morceau leur étant envoyé avec sa tâche.
+    """
+    bounds = chunk_bounds(minutes, chunk)
+    if workers <= 1 or len(bounds) <= 1:
+        return _build_levels(minutes)
+
+    # « spawn » et non « fork » : appelé depuis le serveur Streamlit, dont
+    # les threads peuvent tenir des verrous au moment d'un fork
+    columns = ["Timestamp", *(col for col in OHLCV_AGG if col in minutes.columns)]
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(min(workers, len(bounds)), mp_context=context) as pool:
+        parts = list(pool.map(
+            _build_levels, (minutes.iloc[start:stop][columns] for start, stop in bounds)
+        ))
+    return {name: merge_chunks([part[name] for part in parts]) for name in LEVELS}
+
+
+def default_workers():
+    """Nombre de processus pour une reconstruction : un par cœur."""
+    return os.cpu_count() or 1
+
+
+def bar_close_time(labels, rule):
+    """Instant de la dernière minute des barres ``rule`` d'étiquettes ``labels``.
+
+    Heures et jours sont étiquetés à leur début, semaines et mois à leur
+    dernier jour (dimanche, fin de mois) : une même convention de clôture
+    pour tous les niveaux.
+    """
+    minute = pd.Timedelta(minutes=1)
+    if rule in ("W", "ME"):
+        return labels + pd.Timedelta(days=1) - minute
+    return labels + pd.tseries.frequencies.to_offset(rule) - minute
+
+
+def bucket_start(ts, rule):
+    """Début de la barre ``rule`` qui contient l'instant ``ts``."""
+    if rule == "W":
+        # Semaines lundi → dimanche, étiquetées au dimanche
+        return ts.normalize() - pd.Timedelta(days=ts.weekday())
+    if rule == "ME":
+        return ts.normalize().replace(day=1)
+    return ts.floor(rule)
+
+
+def update_rollups(levels, new):
+    """Met à jour ``levels`` en place avec les nouvelles lignes minute ``new``.
+
+    Seules les barres qui contiennent des lignes de ``new`` sont recalculées.
+    La barre 5 min en cours est fusionnée avec les nouvelles minutes
+    (first / max / min / last / sum se composent), sans relire les minutes
+    déjà stockées.
+    """
+    since = new["Timestamp"].iloc[0]
+    base = _minute_base(new)
+
+    for name, (rule, source) in LEVELS.items():
+        start = bucket_start(since, rule)
+        old = levels.get(name)
+        if source is None:
+            finer = base if old is None else pd.concat([old[old.index >= start], base])
+        else:
+            finer = levels[source]
+        fresh = resample_ohlcv(finer[finer.index >= start], rule)
+        if old is None or old.empty:
+            levels[name] = fresh
+        else:
+            levels[name] = pd.concat([old[old.index < fresh.index[0]], fresh])
+    return levels
@@ -0,0 +1,117 @@
+"""
+Jeu de données partagé, en lecture seule, par toutes les pages et sessions.
+
+``st.cache_data`` garde un résultat par fonction et le recopie (pickle) à
+chaque appel : avec dix sessions sur cinq pages, autant de copies des
+mêmes barres. :func:`shared_dataset` retourne au contraire un seul objet
+par processus et par version du cache ; ses tables sont lues ou calculées
+une fois, puis remises aux pages sous forme de vues sans copie.
+
+Les vues sont sûres grâce au Copy-on-Write de pandas (toujours actif depuis
+pandas 3) : une page qui ajoute une colonne, filtre ou modifie une valeur
+obtient sa propre copie des seules données touchées, et la table partagée
+n'est jamais modifiée. Les tableaux numpy sous-jacents sont en lecture
+seule.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .cubes import CUBES
+from .ingest import ensure_cache
+from .rollups import LEVELS
+from .store import CACHE_DIR, CSV_PATH, read_cube, read_rollup_file
+
+_datasets = {}
+_datasets_lock = threading.Lock()
+
+
+def _view(obj):
+    # Vue sans copie des DataFrames / Series, y compris dans un tuple ou un dict
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return obj.copy(deep=False)
+    if isinstance(obj, tuple):
+        return tuple(_view(item) for item in obj)
+    if isinstance(obj, dict):
+        return {key: _view(value) for key, value in obj.items()}
+    return obj
+
+
+def _frames(obj):
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        yield obj
+    elif isinstance(obj, (tuple, dict)):
+        for item in obj.values() if isinstance(obj, dict) else obj:
+            yield from _frames(item)
+
+
+class SharedDataset:
+    """Tables d'une version du cache, calculées une fois par processus."""
+
+    def __init__(self, version, csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+        self.version = version
+        self.csv_path = csv_path
+        self.cache_dir = cache_dir
+        self._tables = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def table(self, key, build):
+        """Résultat de ``build()`` (DataFrame, ou tuple / dict de DataFrames),
+        calculé au premier appel pour ``key`` puis rendu en vues.
+
+        Deux sessions qui demandent la même table en même temps ne la
+        calculent qu'une fois : la seconde attend la première.
+        """
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._tables:
+                self._tables[key] = build()
+        return _view(self._tables[key])
+
+    def rollup(self, level):
+        """Niveau complet de la pyramide (toutes colonnes, index Timestamp)."""
+        if level not in LEVELS:
+            raise ValueError(f"Niveau inconnu : {level!r} (attendu : {', '.join(LEVELS)})")
+        return self.table(("rollup", level), lambda: read_rollup_file(level, self.cache_dir))
+
+    def cube(self, name):
+        """Cube d'activité complet (cf. ``load_cube``)."""
+        if name not in CUBES:
+            raise ValueError(f"Cube inconnu : {name!r} (attendu : {', '.join(CUBES)})")
+        # Trié par année : les filtres d'années sont des tranches (timeindex)
+        return self.table(
+            ("cube", name),
+            lambda: read_cube(name, self.cache_dir).sort_values("Year", kind="stable"),
+        )
+
+    def memory_usage(self):
+        """Octets occupés par les tables partagées (une seule fois en mémoire)."""
+        seen, total = set(), 0
+        for frame in (f for table in list(self._tables.values()) for f in _frames(table)):
+            columns = frame.items() if isinstance(frame, pd.DataFrame) else [(None, frame)]
+            for values in [frame.index, *(column for _, column in columns)]:
+                values = np.asarray(values)
+                # Colonnes communes à plusieurs tables (vues) : comptées une fois
+                address = values.__array_interface__["data"][0]
+                if address not in seen:
+                    seen.add(address)
+                    total += values.nbytes
+        return total
+
+
+def shared_dataset(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Le jeu partagé de la version courante du cache (mis à jour au besoin).
+
+    Après une ingestion, un nouvel objet remplace l'ancien, libéré dès que
+    plus aucune page ne s'en sert.
+    """
+    version = ensure_cache(csv_path, cache_dir)["version"]
+    key = (str(csv_path), str(cache_dir))
+    with _datasets_lock:
+        dataset = _datasets.get(key)
+        if dataset is None or dataset.version != version:
+            dataset = _datasets[key] = SharedDataset(version, csv_path, cache_dir)
+    return dataset
@@ -0,0 +1,141 @@
+"""
+Résumés statistiques fusionnables, par année et par variable minute.
+
+Chaque résumé (calculé une fois à l'ingestion) contient le nombre de
+valeurs, la moyenne, les sommes des écarts à la moyenne aux puissances 2
+à 4, le min, le max et ``QUANTILE_POINTS`` quantiles régulièrement
+espacés. Deux résumés se fusionnent exactement pour les moments (formules
+de Pébay) ; les quantiles fusionnés viennent du mélange pondéré des
+fonctions de répartition approchées de chaque année.
+
+Précision des quantiles : entre deux points stockés, le rang exact est
+encadré à ``RANK_ERROR`` près (1 / 1000). Un mélange pondéré garde cette
+borne : le quantile q d'une sélection d'années est la valeur exacte d'un
+rang compris entre q - 0,1 % et q + 0,1 %.
+"""
+import numpy as np
+import pandas as pd
+
+from .store import year_ranges
+
+QUANTILE_POINTS = 1001
+RANK_ERROR = 1 / (QUANTILE_POINTS - 1)
+_GRID = np.linspace(0, 1, QUANTILE_POINTS)
+
+# Variables minute résumées (Volatility = High - Low de la minute)
+SKETCH_VARIABLES = ["Open", "High", "Low", "Close", "Volume", "Volatility", "RollingVol"]
+
+_MOMENTS = ["count", "mean", "M2", "M3", "M4", "min", "max"]
+
+
+def minute_variable(minutes, variable):
+    """Valeurs float64 d'une variable minute, NaN retirés."""
+    if variable == "Volatility":
+        values = minutes["High"].to_numpy("float64") - minutes["Low"].to_numpy("float64")
+    else:
+        values = minutes[variable].to_numpy("float64")
+    return values[~np.isnan(values)]
+
+
+def sketch(values):
+    """Résumé d'un tableau de valeurs sans NaN."""
+    n = len(values)
+    if not n:
+        return {"count": 0, "mean": np.nan, "M2": 0.0, "M3": 0.0, "M4": 0.0,
+                "min": np.nan, "max": np.nan, "quantiles": np.full(QUANTILE_POINTS, np.nan)}
+    mean = values.mean()
+    d2 = (values - mean) ** 2
+    return {
+        "count": n,
+        "mean": mean,
+        "M2": d2.sum(),
+        "M3": (d2 * (values - mean)).sum(),
+        "M4": (d2 * d2).sum(),
+        "min": values.min(),
+        "max": values.max(),
+        "quantiles": np.quantile(values, _GRID),
+    }
+
+
+def merge_moments(a, b):
+    """Fusionne les moments de deux résumés (exact, sans relire les valeurs)."""
+    na, nb = a["count"], b["count"]
+    if not na:
+        return dict(b)
+    if not nb:
+        return dict(a)
+    n = na + nb
+    delta = b["mean"] - a["mean"]
+    return {
+        "count": n,
+        "mean": a["mean"] + delta * nb / n,
+        "M2": a["M2"] + b["M2"] + delta ** 2 * na * nb / n,
+        "M3": (a["M3"] + b["M3"]
+               + delta ** 3 * na * nb * (na - nb) / n ** 2
+               + 3 * delta * (na * b["M2"] - nb * a["M2"]) / n),
+        "M4": (a["M4"] + b["M4"]
+               + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / n ** 3
+               + 6 * delta ** 2 * (na ** 2 * b["M2"] + nb ** 2 * a["M2"]) / n ** 2
+               + 4 * delta * (na * b["M3"] - nb * a["M3"]) / n),
+        "min": min(a["min"], b["min"]),
+        "max": max(a["max"], b["max"]),
+    }
+
+
+def sketch_quantile(sketches, q):
+    """Quantile(s) ``q`` de l'union des valeurs résumées par ``sketches``."""
+    parts = [s for s in sketches if s["count"]]
+    if not parts:
+        return np.full(np.shape(q), np.nan)
+    if len(parts) == 1:
+        return np.interp(q, _GRID, parts[0]["quantiles"])
+
+    # Répartition du mélange, évaluée sur tous les points stockés
+    points = np.unique(np.concatenate([s["quantiles"] for s in parts]))
+    total = sum(s["count"] for s in parts)
+    cdf = sum(s["count"] * np.interp(points, s["quantiles"], _GRID) for s in parts) / total
+    return np.interp(q, cdf, points)
+
+
+def describe_sketches(sketches):
+    """Équivalent de ``describe()`` + ``skew()`` + ``kurt()`` de pandas."""
+    sketches = list(sketches)
+    moments = {"count": 0}
+    for s in sketches:
+        moments = merge_moments(moments, s)
+
+    n = moments["count"]
+    q25, q50, q75 = sketch_quantile(sketches, [0.25, 0.5, 0.75])
+    stats = {"count": float(n), "mean": np.nan, "std": np.nan, "min": np.nan,
+             "25%": q25, "50%": q50, "75%": q75, "max": np.nan,
+             "skewness": np.nan, "kurtosis": np.nan}
+    if n:
+        m2 = moments["M2"]
+        stats.update(mean=moments["mean"], min=moments["min"], max=moments["max"])
+        if n > 1:
+            stats["std"] = np.sqrt(m2 / (n - 1))
+        # Mêmes estimateurs corrigés du biais que pandas
+        if n > 2 and m2 > 0:
+            stats["skewness"] = (np.sqrt(n * (n - 1)) / (n - 2)
+                                 * (moments["M3"] / n) / (m2 / n) ** 1.5)
+        if n > 3 and m2 > 0:
+            stats["kurtosis"] = (n * (n + 1) * (n - 1) * moments["M4"]
+                                 / ((n - 2) * (n - 3) * m2 ** 2)
+                                 - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)))
+    return pd.Series(stats)
+
+
+def build_sketches(minutes):
+    """Un résumé par (année, variable) ; ``minutes`` : Timestamp + colonnes minute."""
+    rows = []
+    for year, (start, stop) in year_ranges(minutes).items():
+        part = minutes.iloc[start:stop]
+        for variable in SKETCH_VARIABLES:
+            rows.append({"Year": year, "Variable": variable,
+                         **sketch(minute_variable(part, variable))})
+    return pd.DataFrame(rows, columns=["Year", "Variable", *_MOMENTS, "quantiles"])
+
+
+def sketch_rows(frame):
+    """Lignes d'un DataFrame de résumés -> liste de dictionnaires fusionnables."""
+    return frame[[*_MOMENTS, "quantiles"]].to_dict("records")
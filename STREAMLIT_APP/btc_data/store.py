@@ -0,0 +1,501 @@
+"""
+Stockage sur disque du cache (NumPy, Parquet et manifeste JSON).
+
+Organisation de ``data/cache/`` :
+
+- ``manifest.json`` : version du CSV source, filigrane d'ingestion, tailles ;
+- ``minutes/<champ>.npy`` : données minute triées, un tableau NumPy par
+  colonne, ouvert en mémoire partagée (``mmap``) par toutes les pages et
+  sessions sans copie ;
+- ``minutes/partitions.json`` : plage de lignes ``[début, fin)`` de chaque
+  année (les données étant triées, une année est un bloc contigu) ;
+- ``rollups/<niveau>/<année>.parquet`` : pyramide d'agrégats OHLCV, un
+  fichier par année (année de l'étiquette de la barre), et
+  ``rollups/rolling/`` pour les statistiques glissantes horaires ;
+- ``cubes/<cube>.parquet`` : cubes d'activité (année × jour × heure…),
+  quelques milliers de lignes au plus ;
+- ``sketches.parquet`` et ``histograms.parquet`` : résumés statistiques et
+  histogrammes fins par (année, variable minute) ;
+- ``drawdowns.parquet`` : épisodes de drawdown calculés à la minute ;
+- ``extremes.parquet`` : plus fortes hausses et baisses par (horizon,
+  année) ;
+- ``quality.json`` : rapport de qualité (manquants, doublons, trous,
+  statistiques descriptives) ;
+- ``.lock`` : verrou des mises à jour (cf. :func:`btc_data.ingest.cache_lock`) ;
+- ``exports/`` : fichiers générés pour le téléchargement (cf.
+  :mod:`btc_data.export`).
+
+Une sélection d'années ne lit que ses partitions : plage de lignes du
+memmap pour les minutes, fichiers de l'année pour les agrégats.
+
+Ce module ne fait que lire et écrire ces fichiers ; la construction et la
+mise à jour du cache sont dans :mod:`btc_data.ingest`.
+"""
+import io
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .rolling import ROLLING_FIELDS, ROLLING_LEVEL, ROLLING_STATS, WINDOWS, rolling_column
+
+# -----------------------------------------------
+# 🔧 Emplacements (relatifs au dossier STREAMLIT_APP)
+# -----------------------------------------------
+CSV_PATH = Path("data/DATASET_BTC.csv")
+CACHE_DIR = Path("data/cache")
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+CSV_COLUMNS = ["Timestamp", *OHLCV]
+CSV_DTYPES = {col: "float64" for col in CSV_COLUMNS}
+
+MINUTES_DIR = "minutes"
+PARTITIONS_FILE = "partitions.json"
+MANIFEST_FILE = "manifest.json"
+ROLLUPS_DIR = "rollups"
+CUBES_DIR = "cubes"
+SKETCHES_FILE = "sketches.parquet"
+HISTOGRAMS_FILE = "histograms.parquet"
+EPISODES_FILE = "drawdowns.parquet"
+EXTREMES_FILE = "extremes.parquet"
+QUALITY_FILE = "quality.json"
+LOCK_FILE = ".lock"
+EXPORTS_DIR = "exports"
+
+# Colonnes minute stockées -> type sur disque. Timestamp est stocké en
+# minutes depuis 1970 (int32, valable jusqu'en 6053) ; float32 garde ~7
+# chiffres significatifs, soit moins d'un centime d'écart à 100 000 $.
+MINUTE_FIELDS = {
+    "Timestamp": "int32",
+    "Open": "float32",
+    "High": "float32",
+    "Low": "float32",
+    "Close": "float32",
+    "Volume": "float32",
+    "Return": "float32",
+    "RollingVol": "float32",
+    "Peak": "float32",
+}
+
+# À incrémenter quand la structure du cache change : force une reconstruction.
+CACHE_FORMAT = 14
+
+
+def dataset_version(csv_path=CSV_PATH):
+    """Identifiant de version du CSV : taille et date de modification."""
+    stat = Path(csv_path).stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def parse_csv(source, header="infer"):
+    """Parse le CSV Kaggle (chemin ou flux) avec des types explicites."""
+    names = None if header == "infer" else CSV_COLUMNS
+    df = pd.read_csv(source, dtype=CSV_DTYPES, header=header, names=names)
+    df["Timestamp"] = pd.to_datetime(df["Timestamp"], unit="s")
+    return df
+
+
+def iter_csv(source, chunk_rows):
+    """Parse le CSV par morceaux de ``chunk_rows`` lignes (mêmes types que ``parse_csv``)."""
+    with pd.read_csv(source, dtype=CSV_DTYPES, chunksize=chunk_rows) as reader:
+        for df in reader:
+            df = df.reset_index(drop=True)
+            df["Timestamp"] = pd.to_datetime(df["Timestamp"], unit="s")
+            yield df
+
+
+def ensure_sorted(df):
+    """Trie par Timestamp seulement si nécessaire.
+
+    Retourne le DataFrame et un booléen indiquant s'il était déjà trié.
+    """
+    if df["Timestamp"].is_monotonic_increasing:
+        return df, True
+    df = df.sort_values("Timestamp", kind="stable").reset_index(drop=True)
+    return df, False
+
+
+def _private_name(path, suffix):
+    # Propre au processus et au thread : deux sessions Streamlit (threads
+    # d'un même serveur) n'écrivent jamais dans le même fichier temporaire
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.{suffix}")
+
+
+def write_atomic(path, write):
+    # Écriture dans un fichier temporaire puis renommage : une page qui lit
+    # le cache pendant qu'une autre le reconstruit ne voit jamais un fichier
+    # à moitié écrit.
+    path = Path(path)
+    tmp = _private_name(path, "tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def replace_dir(path, fill):
+    """Remplit un nouveau dossier via ``fill(tmp_dir)`` puis remplace ``path``."""
+    path = Path(path)
+    tmp = _private_name(path, "tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    fill(tmp)
+    swap_dir(tmp, path)
+
+
+def swap_dir(new, path):
+    """Remplace le dossier ``path`` par le dossier ``new`` (même disque)."""
+    path = Path(path)
+    old = _private_name(path, "old")
+    if path.exists():
+        os.replace(path, old)
+    os.replace(new, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+# -----------------------------------------------
+# 📄 Manifeste
+# -----------------------------------------------
+def read_manifest(cache_dir=CACHE_DIR):
+    path = Path(cache_dir) / MANIFEST_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def write_manifest(manifest, cache_dir=CACHE_DIR):
+    write_atomic(
+        Path(cache_dir) / MANIFEST_FILE,
+        lambda tmp: tmp.write_text(json.dumps(manifest, indent=2)),
+    )
+
+
+# -----------------------------------------------
+# ⏱️ Données minute (un .npy par colonne)
+# -----------------------------------------------
+def _to_stored(df, column):
+    if column == "Timestamp":
+        seconds = df["Timestamp"].to_numpy().astype("datetime64[s]").astype("int64")
+        return (seconds // 60).astype(MINUTE_FIELDS[column])
+    return df[column].to_numpy().astype(MINUTE_FIELDS[column])
+
+
+def _npy_bytes(values):
+    # np.save ajouterait .npy au nom du fichier temporaire : on passe un flux
+    buffer = io.BytesIO()
+    np.save(buffer, values)
+    return buffer.getvalue()
+
+
+def _npy_header(f):
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+    return version, shape, fortran, dtype
+
+
+def _append_npy(path, values):
+    """Ajoute ``values`` à la fin d'un .npy 1D sans réécrire l'existant.
+
+    Les données sont écrites avant l'en-tête : un lecteur qui ouvre le
+    fichier entre les deux voit simplement l'ancienne longueur.
+    """
+    with open(path, "r+b") as f:
+        version, shape, fortran, dtype = _npy_header(f)
+        header_len = f.tell()
+        header = {"descr": np.lib.format.dtype_to_descr(dtype),
+                  "fortran_order": fortran,
+                  "shape": (shape[0] + len(values),)}
+        buffer = io.BytesIO()
+        np.lib.format.write_array_header_1_0(buffer, header)
+        if version != (1, 0) or len(buffer.getvalue()) != header_len:
+            # En-tête de taille différente (rare) : réécriture complète
+            old = np.load(path, mmap_mode="r")
+            merged = np.concatenate([old, values.astype(dtype)])
+            del old
+            write_atomic(path, lambda tmp: tmp.write_bytes(_npy_bytes(merged)))
+            return
+        f.seek(0, os.SEEK_END)
+        f.write(values.astype(dtype).tobytes())
+        f.flush()
+        f.seek(0)
+        f.write(buffer.getvalue())
+
+
+def year_ranges(df, offset=0):
+    """Plages de lignes ``{année: [début, fin)}`` d'un DataFrame trié."""
+    years = df["Timestamp"].dt.year.to_numpy()
+    if not len(years):
+        return {}
+    starts = np.r_[0, np.flatnonzero(np.diff(years)) + 1]
+    stops = np.r_[starts[1:], len(years)]
+    return {
+        int(years[start]): [int(start) + offset, int(stop) + offset]
+        for start, stop in zip(starts, stops)
+    }
+
+
+def _write_partitions(partitions, minutes_dir):
+    write_atomic(
+        Path(minutes_dir) / PARTITIONS_FILE,
+        lambda tmp: tmp.write_text(json.dumps(partitions, indent=2)),
+    )
+
+
+def minute_partitions(cache_dir=CACHE_DIR):
+    """Index des partitions annuelles : ``{année: (début, fin)}``."""
+    path = Path(cache_dir) / MINUTES_DIR / PARTITIONS_FILE
+    return {int(year): tuple(rows) for year, rows in json.loads(path.read_text()).items()}
+
+
+def write_minutes(df, minutes_dir):
+    """Écrit toutes les colonnes minute de ``df`` (une par fichier .npy)."""
+    minutes_dir = Path(minutes_dir)
+    minutes_dir.mkdir(parents=True, exist_ok=True)
+    for column in MINUTE_FIELDS:
+        write_atomic(
+            minutes_dir / f"{column}.npy",
+            lambda tmp: tmp.write_bytes(_npy_bytes(_to_stored(df, column))),
+        )
+    _write_partitions(year_ranges(df), minutes_dir)
+
+
+def append_minutes(df, cache_dir=CACHE_DIR):
+    """Ajoute les lignes ``df`` à la fin des colonnes minute existantes."""
+    minutes_dir = Path(cache_dir) / MINUTES_DIR
+    partitions = minute_partitions(cache_dir)
+    rows = max(stop for _, stop in partitions.values()) if partitions else 0
+
+    # Timestamp en dernier : sa longueur fait foi pour les lecteurs
+    for column in [*[c for c in MINUTE_FIELDS if c != "Timestamp"], "Timestamp"]:
+        _append_npy(minutes_dir / f"{column}.npy", _to_stored(df, column))
+
+    # L'année en cours s'allonge, une nouvelle année ouvre une partition
+    for year, (start, stop) in year_ranges(df, offset=rows).items():
+        if year in partitions:
+            start = partitions[year][0]
+        partitions[year] = (start, stop)
+    _write_partitions(partitions, minutes_dir)
+
+
+def _row_slices(partitions, years):
+    """Plages de lignes des années demandées, fusionnées quand contiguës."""
+    slices = []
+    for year in sorted(set(years)):
+        if year not in partitions:
+            continue
+        start, stop = partitions[year]
+        if slices and slices[-1][1] == start:
+            slices[-1] = (slices[-1][0], stop)
+        else:
+            slices.append((start, stop))
+    return slices
+
+
+def open_minute_arrays(cache_dir=CACHE_DIR, columns=None, years=None):
+    """Ouvre les colonnes minute en lecture seule (``np.memmap``).
+
+    ``years`` restreint aux partitions demandées : des années consécutives
+    restent une vue sans copie du memmap ; seules des années disjointes
+    (ex. 2013 + 2017) sont concaténées, et seulement leurs lignes sont lues.
+    """
+    minutes_dir = Path(cache_dir) / MINUTES_DIR
+    columns = list(MINUTE_FIELDS) if columns is None else list(columns)
+    arrays = {col: np.load(minutes_dir / f"{col}.npy", mmap_mode="r") for col in columns}
+    # Un ajout concurrent peut avoir allongé certaines colonnes : on aligne
+    # sur la plus courte.
+    rows = min(len(values) for values in arrays.values())
+    if years is None:
+        return {col: values[:rows] for col, values in arrays.items()}
+
+    slices = _row_slices(minute_partitions(cache_dir), years)
+    slices = [(start, min(stop, rows)) for start, stop in slices]
+    if len(slices) == 1:
+        start, stop = slices[0]
+        return {col: values[start:stop] for col, values in arrays.items()}
+    return {
+        col: np.concatenate([values[start:stop] for start, stop in slices])
+        if slices else values[:0]
+        for col, values in arrays.items()
+    }
+
+
+def minute_frame(arrays):
+    """DataFrame pandas adossé aux tableaux (aucune copie des prix/volumes).
+
+    Seul Timestamp est converti (minutes int32 -> datetime64[s]).
+    """
+    data = {}
+    for col, values in arrays.items():
+        if col == "Timestamp":
+            values = (values.astype("int64") * 60).view("datetime64[s]")
+        data[col] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def read_minute_tail(n, cache_dir=CACHE_DIR):
+    """Dernières ``n`` lignes minute stockées (copie de ces seules lignes)."""
+    arrays = open_minute_arrays(cache_dir)
+    if not len(arrays["Timestamp"]):
+        return None
+    return minute_frame({col: np.array(values[-n:]) for col, values in arrays.items()})
+
+
+# -----------------------------------------------
+# 📊 Agrégats
+# -----------------------------------------------
+def rollup_years(level, cache_dir=CACHE_DIR):
+    return sorted(int(p.stem) for p in (Path(cache_dir) / ROLLUPS_DIR / level).glob("*.parquet"))
+
+
+def _empty_level(level, columns=None):
+    # Niveau sans aucune partition (cache vide) : colonnes connues du niveau
+    if level == ROLLING_LEVEL:
+        known = [
+            rolling_column(field, stat, window)
+            for field in ROLLING_FIELDS for window in WINDOWS for stat in ROLLING_STATS
+        ]
+    else:
+        known = [*OHLCV, "Volume_USD", *(["Peak"] if level == "1D" else [])]
+    index = pd.DatetimeIndex([], dtype="datetime64[ms]", name="Timestamp")
+    return pd.DataFrame({col: pd.Series(dtype="float64") for col in columns or known}, index=index)
+
+
+def read_rollup_file(level, cache_dir=CACHE_DIR, columns=None, years=None):
+    """Lit un niveau d'agrégats ; ``years`` limite la lecture à ces fichiers."""
+    available = rollup_years(level, cache_dir)
+    wanted = available if years is None else sorted(set(years) & set(available))
+    level_dir = Path(cache_dir) / ROLLUPS_DIR / level
+    frames = [pd.read_parquet(level_dir / f"{year}.parquet", columns=columns) for year in wanted]
+    if not available:
+        return _empty_level(level, columns)
+    if not frames:
+        # Aucune année retenue : niveau vide mais avec les bonnes colonnes
+        first = level_dir / f"{available[0]}.parquet"
+        return pd.read_parquet(first, columns=columns).iloc[:0]
+    return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+
+def _write_rollup_years(frame, level_dir, years=None):
+    for year, part in frame.groupby(frame.index.year):
+        if years is None or year in years:
+            write_atomic(Path(level_dir) / f"{year}.parquet", part.to_parquet)
+
+
+def write_rollups(levels, cache_dir=CACHE_DIR, years=None):
+    """Écrit les niveaux d'agrégats, une partition par année.
+
+    Sans ``years``, chaque niveau est entièrement réécrit ; sinon seules les
+    partitions de ces années sont remplacées (mise à jour incrémentale).
+    """
+    rollups_dir = Path(cache_dir) / ROLLUPS_DIR
+    rollups_dir.mkdir(parents=True, exist_ok=True)
+    for level, frame in levels.items():
+        if years is None:
+            replace_dir(rollups_dir / level, lambda tmp: _write_rollup_years(frame, tmp))
+        else:
+            (rollups_dir / level).mkdir(exist_ok=True)
+            _write_rollup_years(frame, rollups_dir / level, years)
+
+
+# -----------------------------------------------
+# 🧊 Cubes d'activité
+# -----------------------------------------------
+def read_cube(name, cache_dir=CACHE_DIR, years=None):
+    """Lit un cube ; ``years`` ne garde que les cellules de ces années."""
+    cube = pd.read_parquet(Path(cache_dir) / CUBES_DIR / f"{name}.parquet")
+    if years is not None:
+        cube = cube[cube["Year"].isin(list(years))]
+    return cube
+
+
+def write_cube(name, cube, cache_dir=CACHE_DIR):
+    cubes_dir = Path(cache_dir) / CUBES_DIR
+    cubes_dir.mkdir(parents=True, exist_ok=True)
+    write_atomic(cubes_dir / f"{name}.parquet", lambda tmp: cube.to_parquet(tmp, index=False))
+
+
+# -----------------------------------------------
+# 📐 Résumés statistiques et histogrammes (par année et variable)
+# -----------------------------------------------
+def _read_variable_table(filename, cache_dir, variable, years):
+    table = pd.read_parquet(Path(cache_dir) / filename)
+    if variable is not None:
+        table = table[table["Variable"] == variable]
+    if years is not None:
+        table = table[table["Year"].isin(list(years))]
+    return table
+
+
+def _write_variable_table(table, filename, cache_dir):
+    write_atomic(Path(cache_dir) / filename, lambda tmp: table.to_parquet(tmp, index=False))
+
+
+def read_sketches(cache_dir=CACHE_DIR, variable=None, years=None):
+    """Lit les résumés ; filtre optionnel sur la variable et les années."""
+    return _read_variable_table(SKETCHES_FILE, cache_dir, variable, years)
+
+
+def write_sketches(sketches, cache_dir=CACHE_DIR):
+    _write_variable_table(sketches, SKETCHES_FILE, cache_dir)
+
+
+def read_histograms(cache_dir=CACHE_DIR, variable=None, years=None):
+    """Lit les histogrammes ; filtre optionnel sur la variable et les années."""
+    return _read_variable_table(HISTOGRAMS_FILE, cache_dir, variable, years)
+
+
+def write_histograms(histograms, cache_dir=CACHE_DIR):
+    _write_variable_table(histograms, HISTOGRAMS_FILE, cache_dir)
+
+
+# -----------------------------------------------
+# 📉 Épisodes de drawdown
+# -----------------------------------------------
+def read_episodes(cache_dir=CACHE_DIR):
+    return pd.read_parquet(Path(cache_dir) / EPISODES_FILE)
+
+
+def write_episodes(episodes, cache_dir=CACHE_DIR):
+    write_atomic(
+        Path(cache_dir) / EPISODES_FILE,
+        lambda tmp: episodes.to_parquet(tmp, index=False),
+    )
+
+
+# -----------------------------------------------
+# 🚨 Mouvements extrêmes
+# -----------------------------------------------
+def read_extremes(cache_dir=CACHE_DIR, horizon=None, years=None):
+    """Lit l'index des mouvements extrêmes ; filtre optionnel sur l'horizon et les années."""
+    table = pd.read_parquet(Path(cache_dir) / EXTREMES_FILE)
+    if horizon is not None:
+        table = table[table["Horizon"] == horizon]
+    if years is not None:
+        table = table[table["Year"].isin(list(years))]
+    return table
+
+
+def write_extremes(extremes, cache_dir=CACHE_DIR):
+    write_atomic(
+        Path(cache_dir) / EXTREMES_FILE,
+        lambda tmp: extremes.to_parquet(tmp, index=False),
+    )
+
+
+# -----------------------------------------------
+# 🩺 Rapport de qualité
+# -----------------------------------------------
+def read_quality(cache_dir=CACHE_DIR):
+    return json.loads((Path(cache_dir) / QUALITY_FILE).read_text())
+
+
+def write_quality(report, cache_dir=CACHE_DIR):
+    write_atomic(
+        Path(cache_dir) / QUALITY_FILE,
+        lambda tmp: tmp.write_text(json.dumps(report, indent=2)),
+    )
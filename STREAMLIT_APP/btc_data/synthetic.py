@@ -0,0 +1,212 @@
+"""
+Générateur déterministe de données minute OHLCV synthétiques.
+
+Le CSV Kaggle (plus de 100 Mo) n'est pas versionné : ce module écrit un
+fichier de même schéma (``Timestamp`` Unix en secondes puis
+Open/High/Low/Close/Volume) pour tester et mesurer l'application hors
+ligne, à la taille du vrai dataset ou bien au-delà.
+
+Le prix suit une tendance haussière qui s'essouffle, autour de laquelle il
+oscille (écart de retour à la moyenne) ; la volatilité alterne entre
+régimes calme, normal et agité, et varie avec l'heure et le jour de la
+semaine, comme le volume. Le fichier contient aussi des trous dans la grille
+minute et quelques lignes en double.
+
+Les lignes sont produites par blocs de ``BLOCK_MINUTES`` minutes, chacun
+avec son propre générateur aléatoire dérivé de la graine : même graine,
+même fichier, octet pour octet, et rien n'est gardé en mémoire au-delà d'un
+bloc.
+
+Usage (depuis le dossier STREAMLIT_APP) :
+
+    python -m btc_data.synthetic data/SYNTHETIC_BTC.csv             # 1x
+    python -m btc_data.synthetic data/SYNTHETIC_BTC.csv --scale 10  # 10x
+    python -m btc_data.synthetic data/SYNTHETIC_BTC.csv --rows 100000 --seed 7
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from .store import CSV_COLUMNS, write_atomic
+
+# Taille du dataset Kaggle, référence de --scale
+REFERENCE_ROWS = 7_300_000
+
+SYNTHETIC_START = pd.Timestamp("2012-01-01")
+START_PRICE = 5.0
+
+# Minutes générées par bloc (et lignes écrites à la fois)
+BLOCK_MINUTES = 100_000
+
+# Tendance : le log du prix gagne ``TREND_LOG_GAIN / 2`` en REFERENCE_ROWS
+# minutes (5 $ -> ~100 000 $), puis de moins en moins
+TREND_LOG_GAIN = 2 * np.log(20_000)
+
+# Écart à la tendance : rendement minute d'écart-type ``BASE_SIGMA`` et
+# retour à la moyenne en ~30 jours
+BASE_SIGMA = 0.001
+REVERSION_MINUTES = 30 * 1440
+
+# Régimes de volatilité (multiplicateurs de BASE_SIGMA et du volume) ;
+# durée moyenne d'un régime en minutes
+REGIMES = (0.5, 1.0, 2.5)
+REGIME_MINUTES = 3 * 1440
+
+# Volume minute (BTC) : log-normal autour de VOLUME_MEDIAN
+VOLUME_MEDIAN = 5.0
+VOLUME_SIGMA = 1.2
+
+# Trous : probabilité qu'un trou commence après une minute, et durée
+# moyenne (minutes manquantes)
+GAP_RATE = 2e-4
+GAP_MINUTES = 20
+
+# Probabilité qu'une ligne soit écrite deux fois
+DUPLICATE_RATE = 1e-5
+
+
+def intraday_factor(minutes):
+    """Multiplicateur de volatilité et de volume selon l'heure et le jour.
+
+    ``minutes`` : minutes depuis 1970 (UTC). Pic vers 15 h (ouverture
+    américaine), creux la nuit ; activité réduite le week-end.
+    """
+    hour = (minutes // 60) % 24 + (minutes % 60) / 60
+    weekday = (minutes // 1440 + 3) % 7  # 1970-01-01 était un jeudi
+    daily = 1 + 0.35 * np.cos(2 * np.pi * (hour - 15) / 24)
+    return daily * np.where(weekday >= 5, 0.7, 1.0)
+
+
+def _regimes(rng, n, state):
+    """Régime de chaque minute du bloc ; ``state`` = (régime, minutes restantes)."""
+    regime, remaining = state
+    out = np.empty(n, dtype=np.int8)
+    filled = 0
+    while filled < n:
+        if remaining == 0:
+            # Changement vers l'un des autres régimes, durée géométrique
+            regime = (regime + rng.integers(1, len(REGIMES))) % len(REGIMES)
+            remaining = int(rng.geometric(1 / REGIME_MINUTES))
+        take = min(remaining, n - filled)
+        out[filled:filled + take] = regime
+        filled += take
+        remaining -= take
+    return out, (regime, remaining)
+
+
+def _ar1(shocks, phi, x0):
+    # x[t] = phi * x[t-1] + shocks[t], sans boucle Python : sur un bloc,
+    # phi ** -t reste borné (e ** (BLOCK_MINUTES / REVERSION_MINUTES))
+    t = np.arange(1, len(shocks) + 1)
+    return phi ** t * (x0 + np.cumsum(shocks * phi ** -t))
+
+
+def iter_synthetic(rows, seed=0, start=SYNTHETIC_START, gap_rate=GAP_RATE,
+                   duplicate_rate=DUPLICATE_RATE):
+    """Blocs (DataFrames, schéma du CSV Kaggle) totalisant ``rows`` lignes."""
+    start_minute = (pd.Timestamp(start) - pd.Timestamp(0)) // pd.Timedelta(minutes=1)
+    phi = 1 - 1 / REVERSION_MINUTES
+    minute, elapsed = start_minute, 0
+    deviation, close = 0.0, START_PRICE
+    regime = (1, int(np.random.default_rng(seed).geometric(1 / REGIME_MINUTES)))
+    emitted, block = 0, 0
+
+    while emitted < rows:
+        rng = np.random.default_rng([seed, block])
+        n = BLOCK_MINUTES
+
+        # Grille minute, avec des trous de durée géométrique
+        step = np.ones(n, dtype=np.int64)
+        gaps = rng.random(n) < gap_rate
+        step[gaps] += rng.geometric(1 / GAP_MINUTES, gaps.sum())
+        if block == 0:
+            step[0] = 0
+        minutes = minute + np.cumsum(step)
+        minute = int(minutes[-1])
+
+        # Volatilité du moment : régime x saisonnalité
+        states, regime = _regimes(rng, n, regime)
+        season = intraday_factor(minutes)
+        sigma = BASE_SIGMA * np.asarray(REGIMES)[states] * season
+
+        # Log du prix = tendance + écart AR(1) à la tendance
+        t = elapsed + np.arange(1, n + 1)
+        trend = np.log(START_PRICE) + TREND_LOG_GAIN * t / (t + REFERENCE_ROWS)
+        path = _ar1(rng.standard_normal(n) * sigma, phi, deviation)
+        deviation, elapsed = float(path[-1]), elapsed + n
+        closes = np.exp(trend + path)
+
+        opens = np.r_[close, closes[:-1]]
+        close = float(closes[-1])
+        # Mèches : excursions au-delà de l'ouverture et de la clôture
+        wick = np.abs(rng.standard_normal((2, n))) * sigma * 0.5
+        highs = np.maximum(opens, closes) * np.exp(wick[0])
+        lows = np.minimum(opens, closes) * np.exp(-wick[1])
+        volume = (VOLUME_MEDIAN * np.exp(VOLUME_SIGMA * rng.standard_normal(n))
+                  * season * np.asarray(REGIMES)[states])
+
+        frame = pd.DataFrame({
+            "Timestamp": minutes * 60.0,
+            "Open": opens.round(2),
+            "High": highs.round(2),
+            "Low": lows.round(2),
+            "Close": closes.round(2),
+            "Volume": volume.round(8),
+        }, columns=CSV_COLUMNS)
+        # Le prix arrondi reste dans [Low, High]
+        frame["High"] = frame[["Open", "High", "Close"]].max(axis=1)
+        frame["Low"] = frame[["Open", "Low", "Close"]].min(axis=1)
+
+        # Quelques lignes écrites deux fois de suite
+        repeats = 1 + (rng.random(n) < duplicate_rate)
+        if repeats.max() > 1:
+            frame = frame.loc[frame.index.repeat(repeats)]
+
+        frame = frame.iloc[:rows - emitted].reset_index(drop=True)
+        emitted += len(frame)
+        block += 1
+        yield frame
+
+
+def write_synthetic_csv(path, rows, seed=0, **options):
+    """Écrit ``rows`` lignes synthétiques dans ``path`` (bloc par bloc)."""
+    # Écriture CSV de pyarrow : ~10x plus rapide que DataFrame.to_csv
+    no_header = pa_csv.WriteOptions(include_header=False)
+
+    def write(tmp):
+        with open(tmp, "wb") as f:
+            f.write((",".join(CSV_COLUMNS) + "\n").encode())
+            for frame in iter_synthetic(rows, seed, **options):
+                pa_csv.write_csv(pa.Table.from_pandas(frame, preserve_index=False), f, no_header)
+
+    write_atomic(path, write)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère un CSV minute OHLCV synthétique.")
+    parser.add_argument("output", help="fichier CSV à écrire")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--rows", type=int, help="nombre de lignes")
+    size.add_argument("--scale", type=float, default=1.0,
+                      help=f"multiple de la taille du dataset Kaggle ({REFERENCE_ROWS:,} lignes)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", default=str(SYNTHETIC_START.date()), help="première minute")
+    parser.add_argument("--gap-rate", type=float, default=GAP_RATE)
+    parser.add_argument("--duplicate-rate", type=float, default=DUPLICATE_RATE)
+    args = parser.parse_args()
+
+    rows = args.rows if args.rows is not None else int(args.scale * REFERENCE_ROWS)
+    t0 = time.perf_counter()
+    write_synthetic_csv(args.output, rows, args.seed, start=args.start,
+                        gap_rate=args.gap_rate, duplicate_rate=args.duplicate_rate)
+    print(f"{rows:,} lignes écrites dans {args.output} en {time.perf_counter() - t0:.1f} s"
+          .replace(",", " "))
+
+
+if __name__ == "__main__":
+    main()
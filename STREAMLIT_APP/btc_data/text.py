@@ -0,0 +1,59 @@
+"""
+Nettoyage de texte pour la page Text Mining.
+
+Règles de ``clean_text`` : minuscules, tout ce qui n'est pas une lettre
+(accents français compris) remplacé par un espace, puis suppression des
+mots vides français (NLTK) et des mots de deux lettres ou moins.
+"""
+import re
+
+import nltk
+
+# Tout caractère hors lettres (accents français compris) et espaces
+_NON_LETTERS = re.compile(r"[^a-zàâäéèêëîïôöùûüçñ\s]")
+
+# Article d'exemple affiché par défaut (et texte des mesures de performance)
+SAMPLE_TEXT = """
+Bitcoin : Pour Tom Lee, le BTC retournera à 100 000 $ en 2025, mais plus question des 250 000 $.
+
+Tom Lee, le président de BitMine, a légèrement revu à la baisse sa prédiction audacieuse de voir Bitcoin atteindre
+250 000 $ d’ici la fin de l’année. Bien qu’il ait précédemment maintenu cette prévision, Lee parle maintenant
+d’un « peut-être » concernant un nouveau sommet pour Bitcoin avant 2026.
+
+Dans une interview récente, il a déclaré qu’il est « très probable » que Bitcoin dépasse les 100 000 $ avant la fin
+de l’année, tout en restant plus prudent sur tout nouveau record. Cette déclaration marque une révision de son
+optimisme initial.
+
+Lee souligne que la cryptomonnaie réalise souvent ses plus forts gains sur une poignée de jours chaque année.
+Il évoque des périodes de volatilité élevée, des ajustements de marché et une incertitude accrue, mais reste
+convaincu du potentiel de long terme de Bitcoin.
+
+Malgré une tendance baissière récente et un marché chahuté, Lee estime que Bitcoin a encore des « bons jours »
+devant lui. Il note que même après des mouvements imprévus, la cryptomonnaie a montré qu’elle pouvait se relever,
+ce qui le rend confiant quant à un rebond possible avant la fin de 2025.
+
+Selon lui, les conditions actuelles pourraient offrir une opportunité d’achat, avec un retour du marché vers un
+cycle haussier si les bons signaux s’alignent. Toutefois, il avertit que le marché reste exposé aux risques de
+volatilité, à la macroéconomie et aux incertitudes.
+
+Cette position, moins extrême qu’en début d’année, reflète une approche plus nuancée du marché, tout en conservant
+une vision haussière sur le moyen terme.
+"""
+
+
+def french_stopwords():
+    """Mots vides français de NLTK (téléchargés au premier appel si absents)."""
+    try:
+        nltk.data.find("corpora/stopwords")
+    except LookupError:
+        nltk.download("stopwords")
+    from nltk.corpus import stopwords
+    return set(stopwords.words("french"))
+
+
+def clean_text(text, stopwords):
+    """Liste des mots retenus de ``text``."""
+    # minuscule, retirer chiffres, ponctuation, symboles, puis découpage
+    words = _NON_LETTERS.sub(" ", text.lower()).split()
+    # suppression stopwords + mots trop courts
+    return [w for w in words if w not in stopwords and len(w) > 2]
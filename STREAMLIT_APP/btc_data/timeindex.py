@@ -0,0 +1,84 @@
+"""
+Sélection de plages de temps sur des tables triées, sans masque ni copie.
+
+Un filtre ``df[df["Year"].isin(years)]`` parcourt toute la table, alloue un
+masque booléen et copie les lignes retenues. Les tables du cache étant
+triées par date, les bornes d'une plage se trouvent par recherche
+dichotomique (``searchsorted``) et la sélection est une tranche de lignes
+contiguës : une vue, sans copie (Copy-on-Write de pandas).
+
+Plusieurs années consécutives forment une seule tranche ; seules des années
+disjointes (ex. 2013 + 2017) donnent plusieurs tranches, recollées par
+:func:`select_years`.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _sorted_values(frame, on):
+    values = frame.index if on is None else frame[on]
+    return np.asarray(values)
+
+
+def _bound(values, bound):
+    # Borne comparable aux valeurs triées (dates ou nombres), dans leur unité :
+    # sinon numpy convertit tout le tableau avant la recherche
+    if np.issubdtype(values.dtype, np.datetime64):
+        return np.datetime64(pd.Timestamp(bound)).astype(values.dtype)
+    return bound
+
+
+def _year_key(values, year):
+    # Début de l'année ``year`` (date, ou l'année elle-même pour une colonne Year)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return _bound(values, f"{year:04d}-01-01")
+    return year
+
+
+def year_runs(years):
+    """Années regroupées en suites consécutives : ``[(première, dernière), ...]``."""
+    runs = []
+    for year in sorted(set(int(y) for y in years)):
+        if runs and runs[-1][1] == year - 1:
+            runs[-1] = (runs[-1][0], year)
+        else:
+            runs.append((year, year))
+    return runs
+
+
+def range_slice(frame, start=None, end=None, on=None):
+    """Tranche ``[start, end)`` de ``frame`` trié (vue sans copie).
+
+    ``on`` : colonne triée à utiliser, l'index par défaut ; ``None`` comme
+    borne laisse la plage ouverte de ce côté.
+    """
+    values = _sorted_values(frame, on)
+    lo = 0 if start is None else int(np.searchsorted(values, _bound(values, start)))
+    hi = len(values) if end is None else int(np.searchsorted(values, _bound(values, end)))
+    return frame.iloc[lo:hi]
+
+
+def year_slices(frame, years, on=None):
+    """Tranches de lignes (``slice``) des années ``years``, fusionnées quand contiguës.
+
+    ``on`` : colonne triée de dates ou d'années entières (ex. ``Year`` d'un
+    cube), l'index par défaut.
+    """
+    values = _sorted_values(frame, on)
+    slices = []
+    for first, last in year_runs(years):
+        lo = int(np.searchsorted(values, _year_key(values, first)))
+        hi = int(np.searchsorted(values, _year_key(values, last + 1)))
+        if hi > lo:
+            slices.append(slice(lo, hi))
+    return slices
+
+
+def select_years(frame, years, on=None):
+    """Lignes des années ``years`` : vue sans copie si elles sont consécutives."""
+    slices = year_slices(frame, years, on)
+    if len(slices) == 1:
+        return frame.iloc[slices[0]]
+    if not slices:
+        return frame.iloc[:0]
+    return pd.concat([frame.iloc[rows] for rows in slices])
@@ -2,7 +2,22 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
+from btc_data import (
+    EXPORT_FORMATS,
+    EXPORT_RESOLUTIONS,
+    OHLCV,
+    describe_table,
+    export_dataset,
+    load_minutes,
+    load_quality,
+    open_minutes,
+    resident_memory,
+    shared_dataset,
+)
+from btc_data.instrument import PageTrace, instrument_panel
+
 st.set_page_config(page_title="Exploration du dataset", page_icon="📂")
+trace = PageTrace("Exploration des données")
 
 # -----------------------------------------------
 # 🟦 TITRE DE LA PAGE
@@ -25,13 +40,15 @@ Vous trouverez :
 # -----------------------------------------------
 # 🟩 Chargement du dataset
 # -----------------------------------------------
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/DATASET_BTC.csv")
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'], unit='s')
-    return df
+# Colonnes minute ouvertes en mémoire partagée (memmap) : aucune copie par
+# session, donc pas de st.cache_data ici (il copierait le DataFrame)
+df = load_minutes(columns=["Timestamp", *OHLCV])
+trace.lap("Ouverture des colonnes minute")
 
-df = load_data()
+# Manquants, doublons, trous et statistiques : calculés une fois à
+# l'ingestion, lus ici en quelques millisecondes
+quality = load_quality()
+trace.lap("Rapport qualité")
 
 
 # -----------------------------------------------
@@ -58,7 +75,7 @@ st.markdown("""
 # -----------------------------------------------
 st.header("2. Dimensions du dataset")
 
-rows, cols = df.shape
+rows, cols = quality["rows"], len(quality["columns"])
 st.metric("Nombre d'observations", f"{rows:,}".replace(",", " "))
 st.metric("Nombre de variables", cols)
 
@@ -70,6 +87,7 @@ st.header("3. Aperçu des données")
 
 n = st.slider("Nombre de lignes à afficher :", 5, 50, 10)
 st.dataframe(df.head(n))
+trace.lap("Aperçu des données")
 
 
 # -----------------------------------------------
@@ -77,7 +95,7 @@ st.dataframe(df.head(n))
 # -----------------------------------------------
 st.header("4. Types des variables")
 
-st.dataframe(df.dtypes.rename("Type"))
+st.dataframe(pd.Series(quality["columns"], name="Type"))
 
 
 # -----------------------------------------------
@@ -85,7 +103,7 @@ st.dataframe(df.dtypes.rename("Type"))
 # -----------------------------------------------
 st.header("5. Valeurs manquantes")
 
-missing = df.isna().sum()
+missing = pd.Series(quality["nulls"])
 missing_df = pd.DataFrame({
     "Colonnes": missing.index,
     "Valeurs manquantes": missing.values
@@ -98,8 +116,28 @@ st.dataframe(missing_df)
 # -----------------------------------------------
 st.header("6. Doublons dans le dataset")
 
-duplicates = df.duplicated().sum()
+duplicates = quality["duplicate_rows"]
 st.write(f"🔁 Nombre de lignes dupliquées : **{duplicates}**")
+st.write(f"🕒 Timestamps en double : **{quality['duplicate_timestamps']}**")
+st.write(
+    "↕️ Fichier source trié par Timestamp : **"
+    + ("oui" if quality["was_sorted"] else "non (trié à l'ingestion)") + "**"
+)
+
+st.subheader("Trous dans la grille minute")
+
+col1, col2 = st.columns(2)
+col1.metric("Nombre de trous", f"{quality['gaps']:,}".replace(",", " "))
+col2.metric("Minutes manquantes", f"{quality['missing_minutes']:,}".replace(",", " "))
+
+if quality["largest_gaps"]:
+    gaps = pd.DataFrame(quality["largest_gaps"])
+    st.write("Plus grands trous :")
+    st.dataframe(gaps.rename(columns={
+        "start": "Dernière minute avant",
+        "end": "Première minute après",
+        "missing_minutes": "Minutes manquantes",
+    }))
 
 
 # -----------------------------------------------
@@ -108,7 +146,12 @@ st.write(f"🔁 Nombre de lignes dupliquées : **{duplicates}**")
 st.header("7. Statistiques descriptives")
 
 st.write("Statistiques pour les variables numériques (OHLCV) :")
-st.dataframe(df.describe().T)
+st.dataframe(describe_table(quality))
+st.caption(
+    f"Quartiles approchés (rang exact à ±{quality['quantile_rank_error']:.1%} près), "
+    "calculés sur les valeurs stockées (float32)."
+)
+trace.lap("Qualité et statistiques")
 
 
 
@@ -123,16 +166,8 @@ Au cours du projet, plusieurs variables ont été créées afin d'enrichir l'ana
 comprendre le comportement du Bitcoin. Ces variables ne figurent pas dans le dataset original.
 """)
 
-# Création des variables dérivées (si pas encore créées ici)
-df['Return'] = df['Close'].pct_change()
-df['Volatility'] = df['High'] - df['Low']
-df['RollingVol'] = df['Close'].rolling(window=60).std()
-
-df['Year'] = df['Timestamp'].dt.year
-df['Month'] = df['Timestamp'].dt.month
-df['Day'] = df['Timestamp'].dt.day
-df['Hour'] = df['Timestamp'].dt.hour
-df['Weekday'] = df['Timestamp'].dt.weekday
+# Return et RollingVol sont calculés une fois à l'ingestion (cache partagé) ;
+# les variables calendaires sont dérivées du Timestamp dans chaque page.
 
 # Tableau explicatif
 variables_deriv = {
@@ -159,17 +194,72 @@ Vous pouvez télécharger le jeu de données utilisé dans ce projet afin de :
 - reproduire les analyses,
 - explorer les données hors de l’application,
 - effectuer vos propres traitements.
+
+Choisissez la période, la résolution (minute ou barres agrégées) et le format.
 """)
 
-@st.cache_data
-def convert_df_to_csv(df):
-    return df.to_csv(index=False).encode("utf-8")
+first_day = pd.Timestamp(df["Timestamp"].iloc[0]).date()
+last_day = pd.Timestamp(df["Timestamp"].iloc[-1]).date()
+
+col1, col2, col3 = st.columns(3)
+period = col1.date_input(
+    "Période", (first_day, last_day), min_value=first_day, max_value=last_day
+)
+resolution = col2.selectbox("Résolution", EXPORT_RESOLUTIONS)
+fmt = col3.radio("Format", list(EXPORT_FORMATS), horizontal=True)
 
-csv_data = convert_df_to_csv(df)
+# Tant que la seconde date n'est pas choisie, date_input ne renvoie qu'une date
+start, end = period if len(period) == 2 else (period[0], period[0])
+extension, mime = EXPORT_FORMATS[fmt]
 
+# Le fichier n'est écrit qu'au clic, par morceaux, puis réutilisé tant que
+# le dataset ne change pas : rien n'est gardé dans st.cache_data
 st.download_button(
-    label="📥 Télécharger le dataset Bitcoin (CSV)",
-    data=csv_data,
-    file_name="DATASET_BTC.csv",
-    mime="text/csv"
+    label="📥 Télécharger le dataset Bitcoin",
+    data=lambda: export_dataset(resolution, start, end, fmt).read_bytes(),
+    file_name=f"DATASET_BTC_{resolution}_{start}_{end}{extension}",
+    mime=mime
 )
+if resolution == "1min":
+    st.caption(
+        "À la minute, les prix et volumes sont exportés depuis le cache en float32 "
+        "(~7 chiffres significatifs) : ils peuvent différer du CSV source au-delà."
+    )
+trace.lap("Téléchargement")
+
+# ============================================================
+# 🟦 SECTION 10 : Empreinte mémoire
+# ============================================================
+
+st.header("10. Empreinte mémoire")
+
+st.markdown("""
+Les colonnes minute sont stockées sur disque (un fichier `.npy` par colonne, prix et
+volumes en float32, Timestamp en minutes int32) et ouvertes **en mémoire partagée** :
+toutes les pages et toutes les sessions lisent les mêmes pages mémoire, sans copie.
+Les barres agrégées et les tables dérivées des pages sont elles aussi chargées une seule
+fois par processus, puis remises à chaque session sous forme de vues.
+""")
+
+rss, shared = resident_memory()
+store_bytes = sum(values.nbytes for values in open_minutes().values())
+# Avant : une copie float64 / int64 par page (6 colonnes + 8 variables dérivées)
+legacy_bytes = quality["rows"] * 8 * 14
+
+def to_mb(n):
+    return f"{n / 1024 ** 2:,.0f} Mo".replace(",", " ")
+
+col1, col2 = st.columns(2)
+col1.metric("Mémoire résidente du serveur", to_mb(rss))
+col2.metric("dont fichiers mappés (partagés)", to_mb(shared) if shared is not None else "n/d")
+
+col3, col4 = st.columns(2)
+col3.metric("Colonnes minute (memmap, une seule fois)", to_mb(store_bytes))
+col4.metric("Ancienne copie pandas, par page et session", to_mb(legacy_bytes))
+
+st.metric("Tables partagées par les pages (une seule fois)", to_mb(shared_dataset().memory_usage()))
+
+# ============================================================
+# ⏱️ Instrumentation (panneau optionnel de la barre latérale)
+# ============================================================
+instrument_panel(trace)
@@ -1,57 +1,70 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from btc_data import (
+    OHLCV,
+    RANK_ERROR,
+    available_years,
+    describe_sketches,
+    load_histogram,
+    load_minutes,
+    load_sketches,
+    select_years,
+    shared_dataset,
+)
+from btc_data.charts import (
+    DISTRIBUTION_VARIABLES,
+    GRAPH_TYPES,
+    distribution_figure,
+    prepare_binned,
+    prepare_for_plot,
+)
+from btc_data.figcache import figure_cache
+from btc_data.instrument import PageTrace, instrument_panel
 
 st.set_page_config(page_title="Statistiques Descriptives", page_icon="📊")
+trace = PageTrace("Statistiques descriptives")
 
 # --------------------------------------------------------
 # 🔧 Chargement des données
 # --------------------------------------------------------
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/DATASET_BTC.csv")
-    df["Timestamp"] = pd.to_datetime(df["Timestamp"], unit="s")
-    df = df.sort_values("Timestamp")
+def load_minute_series(variable, years):
+    # Colonnes minute en mémoire partagée (memmap), sans st.cache_data qui
+    # copierait les données pour chaque session. Seules les partitions des
+    # années choisies sont lues. (RollingVol calculé une fois à l'ingestion)
+    if variable == "Volatility":
+        df = load_minutes(columns=["High", "Low"], years=years)
+        return df["High"] - df["Low"]
+    return load_minutes(columns=[variable], years=years)[variable]
 
-    # Variables minute
-    df["Volatility"] = df["High"] - df["Low"]
-    df["RollingVol"] = df["Close"].rolling(window=60).std()
-    df["Year"] = df["Timestamp"].dt.year
 
+def load_data(data):
     # ---------------- DAILY ----------------
-    df_daily = df.resample("D", on="Timestamp").agg({
-        "Open": "first",
-        "High": "max",
-        "Low": "min",
-        "Close": "last",
-        "Volume": "sum"
-    }).dropna()
+    # Barres pré-agrégées par le cache (pyramide OHLCV)
+    df_daily = data.rollup("1D")[OHLCV]
 
     df_daily["Return_daily_pct"] = df_daily["Close"].pct_change() * 100
     df_daily["Year"] = df_daily.index.year
 
     # ---------------- WEEKLY ----------------
-    df_weekly = df.resample("W", on="Timestamp").agg({
-        "Close": "last"
-    }).dropna()
+    df_weekly = data.rollup("1W")[["Close"]]
 
     df_weekly["Return_weekly_pct"] = df_weekly["Close"].pct_change() * 100
     df_weekly["Year"] = df_weekly.index.year
 
     # ---------------- MONTHLY ----------------
-    df_monthly = df.resample("M", on="Timestamp").agg({
-        "Close": "last"
-    }).dropna()
+    df_monthly = data.rollup("1M")[["Close"]]
 
     df_monthly["Return_monthly_pct"] = df_monthly["Close"].pct_change() * 100
     df_monthly["Year"] = df_monthly.index.year
 
-    return df, df_daily, df_weekly, df_monthly
+    return df_daily, df_weekly, df_monthly
 
 
-df, df_daily, df_weekly, df_monthly = load_data()
+# Calculé une fois par processus et partagé par toutes les sessions : chaque
+# exécution reçoit des vues sans copie (cf. btc_data.shared)
+data = shared_dataset()
+df_daily, df_weekly, df_monthly = data.table("statistiques", lambda: load_data(data))
+trace.lap("Données partagées")
 
 # --------------------------------------------------------
 # 🟦 TITRE
@@ -63,7 +76,7 @@ st.title("📊 Statistiques Descriptives du Bitcoin")
 # --------------------------------------------------------
 graph_type = st.sidebar.selectbox(
     "📌 Type de graphique",
-    ["Histogramme", "Densité (KDE)", "Boxplot"]
+    GRAPH_TYPES
 )
 
 # --------------------------------------------------------
@@ -71,18 +84,7 @@ graph_type = st.sidebar.selectbox(
 # --------------------------------------------------------
 variable = st.sidebar.selectbox(
     "🎯 Variable analysée",
-    [
-        "Open",
-        "High",
-        "Low",
-        "Close",
-        "Volume",
-        "Volatility",
-        "RollingVol",
-        "Return_daily_pct",
-        "Return_weekly_pct",
-        "Return_monthly_pct"
-    ]
+    DISTRIBUTION_VARIABLES
 )
 
 # --------------------------------------------------------
@@ -95,106 +97,96 @@ elif variable == "Return_weekly_pct":
 elif variable == "Return_monthly_pct":
     data_df = df_monthly
 else:
-    data_df = df
+    data_df = None  # variable minute, lue plus bas par partitions annuelles
 
 # --------------------------------------------------------
 # 4️⃣ Filtre années
 # --------------------------------------------------------
-years = sorted(data_df["Year"].unique())
+years = available_years() if data_df is None else sorted(data_df["Year"].unique())
 selected_years = st.sidebar.multiselect(
     "📅 Années à afficher :", years, default=years
 )
 
-filtered_series = (
-    data_df[data_df["Year"].isin(selected_years)][variable]
-    .dropna()
-)
+if data_df is None:
+    # Résumés et histogrammes annuels pré-calculés : fusion d'un par année
+    # choisie. Les minutes elles-mêmes ne sont lues que pour le boxplot.
+    sketches = load_sketches(variable, selected_years)
+    counts = load_histogram(variable, selected_years)
+else:
+    sketches = None
+    # Barres triées par date : tranche(s) trouvée(s) par recherche
+    # dichotomique, sans masque ni copie
+    filtered_series = (
+        select_years(data_df, selected_years)[variable]
+        .dropna()
+    )
+
+trace.lap("Sélection des données")
 
 # --------------------------------------------------------
 # 🧠 Préparation intelligente des données
 # --------------------------------------------------------
-def prepare_for_plot(series, variable_name):
-    series = series.dropna()
-    log_used = False
-
-    # Winsorisation
-    if variable_name in ["Volume", "Volatility", "RollingVol"]:
-        p99 = series.quantile(0.99)
-        series = series[series <= p99]
-
-    # Log automatique pour le volume
-    if variable_name == "Volume" and series.max() > 100:
-        series = np.log1p(series)
-        log_used = True
-
-    return series, log_used
+# Winsorisation et log partagés avec le rapport hors ligne (btc_data.charts)
+if sketches is None:
+    plot_values, log_used = prepare_for_plot(filtered_series, variable)
+else:
+    centers, bin_counts, log_used = prepare_binned(counts, variable, sketches)
 
-data, log_used = prepare_for_plot(filtered_series, variable)
+trace.lap("Préparation (winsorisation, log)")
 
 # --------------------------------------------------------
 # 📋 Statistiques descriptives
 # --------------------------------------------------------
 st.subheader(f"📋 Statistiques descriptives — {variable}")
 
-stats = filtered_series.describe().round(4)
-stats["skewness"] = filtered_series.skew().round(4)
-stats["kurtosis"] = filtered_series.kurt().round(4)
-
-st.dataframe(stats.to_frame(name="Valeur"))
-
-# --------------------------------------------------------
-# 📊 Graphiques
-# --------------------------------------------------------
-
-# -------- HISTOGRAMME --------
-if graph_type == "Histogramme":
-    st.subheader(f"📊 Histogramme — {variable}")
-
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.hist(data, bins=40, color="skyblue", edgecolor="black")
-
-    # Ligne zéro pour les returns
-    if "Return" in variable:
-        ax.axvline(0, color="red", linestyle="--", linewidth=2)
-        ax.set_xlabel("Return (%)")
-        ax.set_ylabel("Nombre de périodes")
-    else:
-        ax.set_xlabel(variable)
-        ax.set_ylabel("Fréquence")
-
-    ax.set_title(f"Distribution de {variable}")
-    st.pyplot(fig)
-
-# -------- KDE --------
-elif graph_type == "Densité (KDE)":
-    st.subheader(f"🌡️ Densité — {variable}")
-
-    fig, ax = plt.subplots(figsize=(10, 4))
-    sns.kdeplot(data, fill=True, color="purple", ax=ax)
-
-    if "Return" in variable:
-        ax.axvline(0, color="red", linestyle="--", linewidth=2)
-        ax.set_xlabel("Return (%)")
-    else:
-        ax.set_xlabel(variable)
-
-    ax.set_title(f"Densité de {variable}")
-    st.pyplot(fig)
-
-# -------- BOXPLOT --------
+if sketches is None:
+    stats = filtered_series.describe().round(4)
+    stats["skewness"] = filtered_series.skew().round(4)
+    stats["kurtosis"] = filtered_series.kurt().round(4)
 else:
-    st.subheader(f"📦 Boxplot — {variable}")
+    stats = describe_sketches(sketches).round(4)
 
-    fig, ax = plt.subplots(figsize=(10, 3))
-    sns.boxplot(x=data, color="orange", ax=ax)
+st.dataframe(stats.to_frame(name="Valeur"))
 
-    if "Return" in variable:
-        ax.axvline(0, color="red", linestyle="--", linewidth=2)
-        ax.set_xlabel("Return (%)")
-    else:
-        ax.set_xlabel(variable)
+if sketches is not None:
+    st.caption(
+        f"Quartiles issus des résumés annuels pré-calculés : "
+        f"erreur de rang ≤ {RANK_ERROR:.1%}."
+    )
 
-    ax.set_title(f"Boxplot de {variable}")
-    st.pyplot(fig)
+trace.lap("Statistiques descriptives")
 
 # --------------------------------------------------------
+# 📊 Graphiques
+# --------------------------------------------------------
+titles = {
+    "Histogramme": f"📊 Histogramme — {variable}",
+    "Densité (KDE)": f"🌡️ Densité — {variable}",
+    "Boxplot": f"📦 Boxplot — {variable}",
+}
+st.subheader(titles[graph_type])
+
+def draw():
+    if graph_type == "Boxplot" and sketches is not None:
+        # Seul le boxplot a besoin des minutes elles-mêmes
+        series = load_minute_series(variable, selected_years).dropna()
+        minute_data, _ = prepare_for_plot(series, variable, sketches)
+        return distribution_figure(graph_type, variable, minute_data)
+    if sketches is not None:
+        # Histogramme pondéré / KDE par convolution FFT des effectifs pré-calculés
+        return distribution_figure(graph_type, variable, binned=(centers, bin_counts))
+    return distribution_figure(graph_type, variable, plot_values)
+
+
+# Figure déjà rendue pour ces entrées (toutes sessions) : servie depuis le
+# cache, sans relire les minutes ni redessiner (cf. btc_data.figcache)
+key = ("distribution", data.version, variable, tuple(sorted(selected_years)), graph_type)
+png, cached = figure_cache().rendered(key, draw)
+trace.lap("Figure Matplotlib", cache="hit" if cached else "miss")
+st.image(png, width="stretch")
+trace.lap("Affichage de la figure")
+
+# --------------------------------------------------------
+# ⏱️ Instrumentation (panneau optionnel de la barre latérale)
+# --------------------------------------------------------
+instrument_panel(trace)
@@ -1,31 +1,40 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
+from btc_data import (
+    OHLCV,
+    decimate,
+    select_years,
+    shared_dataset,
+    weekday_hour_table,
+)
+from btc_data.instrument import PageTrace, instrument_panel
+
 st.set_page_config(
     page_title="Visualisations avancées",
     page_icon="📈",
     layout="wide"
 )
+trace = PageTrace("Visualisations interactives")
 
 # ========================================================
 # 🔧 Chargement & préparation des données
 # ========================================================
-@st.cache_data
-def load_data():
+def load_data(data):
+
+    # Barres pré-agrégées par le cache (pyramide OHLCV)
+
+    # ================= HOURLY =================
+    df_hourly = data.rollup("1h")[OHLCV]
 
-    df = pd.read_csv("data/DATASET_BTC.csv")
-    df["Timestamp"] = pd.to_datetime(df["Timestamp"], unit="s")
-    df = df.sort_values("Timestamp")
+    df_hourly["Volatility"] = df_hourly["High"] - df_hourly["Low"]
+    df_hourly["Volume_USD"] = df_hourly["Volume"] * df_hourly["Close"]
+    df_hourly["Year"] = df_hourly.index.year
+    df_hourly["Month"] = df_hourly.index.month
+    df_hourly["Timestamp"] = df_hourly.index
 
     # ================= DAILY =================
-    df_daily = df.resample("D", on="Timestamp").agg({
-        "Open": "first",
-        "High": "max",
-        "Low": "min",
-        "Close": "last",
-        "Volume": "sum"
-    }).dropna()
+    df_daily = data.rollup("1D")[OHLCV]
 
     df_daily["Volatility"] = df_daily["High"] - df_daily["Low"]
     df_daily["Volume_USD"] = df_daily["Volume"] * df_daily["Close"]
@@ -34,13 +43,7 @@ def load_data():
     df_daily["Timestamp"] = df_daily.index
 
     # ================= WEEKLY =================
-    df_weekly = df.resample("W", on="Timestamp").agg({
-        "Open": "first",
-        "High": "max",
-        "Low": "min",
-        "Close": "last",
-        "Volume": "sum"
-    }).dropna()
+    df_weekly = data.rollup("1W")[OHLCV]
 
     df_weekly["Volatility"] = df_weekly["High"] - df_weekly["Low"]
     df_weekly["Volume_USD"] = df_weekly["Volume"] * df_weekly["Close"]
@@ -49,13 +52,7 @@ def load_data():
     df_weekly["Timestamp"] = df_weekly.index
 
     # ================= MONTHLY =================
-    df_monthly = df.resample("M", on="Timestamp").agg({
-        "Open": "first",
-        "High": "max",
-        "Low": "min",
-        "Close": "last",
-        "Volume": "sum"
-    }).dropna()
+    df_monthly = data.rollup("1M")[OHLCV]
 
     df_monthly["Volatility"] = df_monthly["High"] - df_monthly["Low"]
     df_monthly["Volume_USD"] = df_monthly["Volume"] * df_monthly["Close"]
@@ -63,10 +60,14 @@ def load_data():
     df_monthly["Month"] = df_monthly.index.month
     df_monthly["Timestamp"] = df_monthly.index
 
-    return df_daily, df_weekly, df_monthly
+    return df_hourly, df_daily, df_weekly, df_monthly
 
 
-df_daily, df_weekly, df_monthly = load_data()
+# Calculé une fois par processus et partagé par toutes les sessions : chaque
+# exécution reçoit des vues sans copie (cf. btc_data.shared)
+data = shared_dataset()
+df_hourly, df_daily, df_weekly, df_monthly = data.table("visualisations", lambda: load_data(data))
+trace.lap("Données partagées")
 
 # ========================================================
 # 🟦 TITRE
@@ -89,18 +90,22 @@ st.sidebar.header("⚙️ Filtres")
 
 time_scale = st.sidebar.radio(
     "🕒 Échelle temporelle",
-    ["Jour", "Semaine", "Mois"],
-    index=0
+    ["Heure", "Jour", "Semaine", "Mois"],
+    index=1
 )
 
-if time_scale == "Jour":
-    df_curve = df_daily.copy()
+# Vues sur les barres partagées : pas de copie
+if time_scale == "Heure":
+    df_curve = df_hourly
+    period_label = "horaire"
+elif time_scale == "Jour":
+    df_curve = df_daily
     period_label = "journalier"
 elif time_scale == "Semaine":
-    df_curve = df_weekly.copy()
+    df_curve = df_weekly
     period_label = "hebdomadaire"
 else:
-    df_curve = df_monthly.copy()
+    df_curve = df_monthly
     period_label = "mensuel"
 
 years = sorted(df_curve["Year"].unique())
@@ -110,7 +115,10 @@ selected_years = st.sidebar.multiselect(
     default=years
 )
 
-df_curve = df_curve[df_curve["Year"].isin(selected_years)]
+# Barres triées par date : années consécutives = une tranche, sans copie
+df_curve = select_years(df_curve, selected_years)
+
+trace.lap("Filtres")
 
 # ========================================================
 # 🧩 ONGLET
@@ -128,37 +136,43 @@ with tab1:
 
     st.subheader(f"Prix du Bitcoin ({period_label})")
 
+    # Chaque courbe est plafonnée à POINT_BUDGET points (min / max par
+    # tranche) : même les 120 000 barres horaires restent fluides.
+
     st.plotly_chart(
         px.line(
-            df_curve,
+            decimate(df_curve, "Timestamp", "Close"),
             x="Timestamp",
             y="Close",
             labels={"Close": "Prix ($)", "Timestamp": "Date"}
         ),
         use_container_width=True
     )
+    trace.lap("Graphique prix (Plotly)")
 
     st.subheader("Volume échangé (BTC)")
     st.plotly_chart(
         px.line(
-            df_curve,
+            decimate(df_curve, "Timestamp", "Volume"),
             x="Timestamp",
             y="Volume",
             labels={"Volume": "Volume (BTC)", "Timestamp": "Date"}
         ),
         use_container_width=True
     )
+    trace.lap("Graphique volume BTC (Plotly)")
 
     st.subheader("Volume échangé (USD)")
     st.plotly_chart(
         px.line(
-            df_curve,
+            decimate(df_curve, "Timestamp", "Volume_USD"),
             x="Timestamp",
             y="Volume_USD",
             labels={"Volume_USD": "Volume ($)", "Timestamp": "Date"}
         ),
         use_container_width=True
     )
+    trace.lap("Graphique volume USD (Plotly)")
 st.markdown("""
 ### Repères historiques majeurs du Bitcoin
 
@@ -193,33 +207,34 @@ with tab2:
 
     st.subheader("Cycle d’activité du marché (UTC)")
 
-    df_hourly = pd.read_csv("data/DATASET_BTC.csv")
-    df_hourly["Timestamp"] = pd.to_datetime(df_hourly["Timestamp"], unit="s")
-    df_hourly["Hour"] = df_hourly["Timestamp"].dt.hour
-    df_hourly["Weekday"] = df_hourly["Timestamp"].dt.weekday
-    df_hourly["Year"] = df_hourly["Timestamp"].dt.year
-
-    df_hourly = df_hourly[df_hourly["Year"].isin(selected_years)]
+    heatmap_labels = {
+        "Volume": "Volume moyen (BTC)",
+        "Volatility": "Volatilité moyenne ($)"
+    }
 
-    heatmap = df_hourly.pivot_table(
-        values="Volume",
-        index="Weekday",
-        columns="Hour",
-        aggfunc="mean"
+    heatmap_var = st.radio(
+        "Mesure",
+        list(heatmap_labels),
+        format_func=heatmap_labels.get,
+        horizontal=True
     )
 
-    heatmap.index = ["Lundi", "Mardi", "Mercredi",
-                     "Jeudi", "Vendredi", "Samedi", "Dimanche"]
+    # Cube (année, jour, heure) pré-agrégé à l'ingestion (~2 000 lignes) :
+    # somme de ses tranches 7×24 des années choisies, sans relecture minute
+    cube = data.cube("weekday_hour")
+    heatmap = weekday_hour_table(select_years(cube, selected_years, on="Year"), heatmap_var)
+    trace.lap("Pivot jour × heure")
 
     st.plotly_chart(
         px.imshow(
             heatmap,
             aspect="auto",
             color_continuous_scale="YlOrRd",
-            labels=dict(x="Heure (UTC)", y="Jour", color="Volume moyen (BTC)")
+            labels=dict(x="Heure (UTC)", y="Jour", color=heatmap_labels[heatmap_var])
         ),
         use_container_width=True
     )
+    trace.lap("Heatmap (Plotly)")
 
 # ========================================================
 # TAB 3 — DISTRIBUTIONS
@@ -246,3 +261,9 @@ with tab3:
         ),
         use_container_width=True
     )
+    trace.lap("Boxplot (Plotly)")
+
+# ========================================================
+# ⏱️ Instrumentation (panneau optionnel de la barre latérale)
+# ========================================================
+instrument_panel(trace)
@@ -1,40 +1,35 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
+from btc_data import (
+    WEEKDAY_LABELS,
+    calendar_cycle,
+    calendar_months,
+    select_years,
+    shared_dataset,
+)
+from btc_data.instrument import PageTrace, instrument_panel
+
 st.set_page_config(page_title="Cycles & Heatmaps", page_icon="🔥", layout="wide")
+trace = PageTrace("Cycles & Heatmaps")
 
 # =========================================================
 # 🔧 Chargement des données
 # =========================================================
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/DATASET_BTC.csv")
-    df["Timestamp"] = pd.to_datetime(df["Timestamp"], unit="s")
-    df = df.sort_values("Timestamp").set_index("Timestamp")
-
-    # Volatilité ($)
-    df["Volatility"] = df["High"] - df["Low"]
-
-    # Volume en dollars
-    df["Volume_USD"] = df["Volume"] * df["Close"]
-
-    # Variables temporelles
-    df["Year"] = df.index.year
-    df["Month"] = df.index.month
-    df["Hour"] = df.index.hour
-    df["Weekday"] = df.index.weekday
-
-    return df
-
-df = load_data()
+# Cube (année, mois, jour, heure) pré-agrégé à l'ingestion, lu une fois par
+# processus et partagé par toutes les sessions (~2 000 lignes par année au
+# plus) : chaque onglet en est une réduction, le filtre d'années une tranche
+# (cube trié par année) et le choix BTC / USD une colonne. Aucune donnée
+# minute ni barre n'est relue.
+data = shared_dataset()
+calendar = data.cube("calendar")
 
 # =========================================================
 # 🎛️ FILTRES
 # =========================================================
 st.title("Cycles & Heatmaps du Bitcoin")
 
-years = sorted(df["Year"].unique())
+years = sorted(calendar["Year"].unique())
 selected_years = st.sidebar.multiselect("📅 Années à analyser", years, default=years)
 
 use_usd = st.sidebar.checkbox("💵 Exprimer le volume en dollars (USD)", value=False)
@@ -42,7 +37,8 @@ use_usd = st.sidebar.checkbox("💵 Exprimer le volume en dollars (USD)", value=
 volume_col = "Volume_USD" if use_usd else "Volume"
 volume_label = "Volume moyen ($)" if use_usd else "Volume moyen (BTC)"
 
-df_filt = df[df["Year"].isin(selected_years)]
+cube = select_years(calendar, selected_years, on="Year")
+trace.lap("Données partagées")
 
 # =========================================================
 # 🧩 ONGLET
@@ -60,16 +56,9 @@ tab1, tab2, tab3, tab4 = st.tabs([
 with tab1:
     st.subheader("Cycle journalier – volume & volatilité par heure")
 
-    hourly = df_filt.resample("H").agg({
-        volume_col: "sum",
-        "High": "max",
-        "Low": "min"
-    }).dropna()
-
-    hourly["Volatility"] = hourly["High"] - hourly["Low"]
-    hourly["Hour"] = hourly.index.hour
-
-    hourly_avg = hourly.groupby("Hour").mean().reset_index()
+    # Moyennes par barre horaire : sommes et nombres de barres par heure
+    hourly_avg = calendar_cycle(cube, "Hour", "1h").reset_index()
+    trace.lap("Moyennes par heure")
 
     st.plotly_chart(
         px.line(
@@ -92,6 +81,7 @@ with tab1:
         ),
         use_container_width=True
     )
+    trace.lap("Graphiques par heure (Plotly)")
 
 
 # =========================================================
@@ -100,22 +90,10 @@ with tab1:
 with tab2:
     st.subheader("Cycle hebdomadaire – volume & volatilité par jour")
 
-    daily = df_filt.resample("D").agg({
-        volume_col: "sum",
-        "High": "max",
-        "Low": "min"
-    }).dropna()
-
-    daily["Volatility"] = daily["High"] - daily["Low"]
-    daily["Weekday"] = daily.index.weekday
-
-    weekly_avg = daily.groupby("Weekday").mean().reset_index()
-
-    weekday_map = {
-        0: "Lundi", 1: "Mardi", 2: "Mercredi",
-        3: "Jeudi", 4: "Vendredi", 5: "Samedi", 6: "Dimanche"
-    }
-    weekly_avg["Jour"] = weekly_avg["Weekday"].map(weekday_map)
+    # Moyennes par barre journalière (chaque jour compté une fois)
+    weekly_avg = calendar_cycle(cube, "Weekday", "1D").reset_index()
+    weekly_avg["Jour"] = weekly_avg["Weekday"].map(dict(enumerate(WEEKDAY_LABELS)))
+    trace.lap("Moyennes par jour")
 
     st.plotly_chart(
         px.bar(
@@ -138,6 +116,7 @@ with tab2:
         ),
         use_container_width=True
     )
+    trace.lap("Graphiques par jour (Plotly)")
 
 # =========================================================
 # 🟩 TAB 3 — CYCLE MENSUEL (VRAI volume mensuel)
@@ -145,16 +124,9 @@ with tab2:
 with tab3:
     st.subheader("Cycle mensuel – volume & volatilité par mois")
 
-    monthly = df_filt.resample("M").agg({
-        volume_col: "sum",
-        "High": "max",
-        "Low": "min"
-    }).dropna()
-
-    monthly["Volatility"] = monthly["High"] - monthly["Low"]
-    monthly["Month"] = monthly.index.month
-
-    monthly_avg = monthly.groupby("Month").mean().reset_index()
+    # Barres mensuelles (plus haut / plus bas du mois) puis moyenne par mois
+    monthly_avg = calendar_cycle(cube, "Month", "1M").reset_index()
+    trace.lap("Moyennes par mois")
 
     st.plotly_chart(
         px.line(
@@ -177,6 +149,7 @@ with tab3:
         ),
         use_container_width=True
     )
+    trace.lap("Graphiques par mois (Plotly)")
 
 # =========================================================
 # 🟥 TAB 4 — HEATMAPS SAISONNIÈRES
@@ -184,24 +157,17 @@ with tab3:
 with tab4:
     st.subheader("Heatmaps saisonnières (Année × Mois)")
 
-    heat = df_filt.resample("M").agg({
-        volume_col: "sum",
-        "High": "max",
-        "Low": "min"
-    }).dropna()
-
-    heat["Volatility"] = heat["High"] - heat["Low"]
-    heat["Year"] = heat.index.year
-    heat["Month"] = heat.index.month
+    heat = calendar_months(cube)
 
     metric = st.selectbox("Choisir une métrique", ["Volume", "Volatilité"])
 
     if metric == "Volume":
-        pivot = heat.pivot(index="Year", columns="Month", values=volume_col)
+        pivot = heat[volume_col].unstack("Month")
         label = volume_label
     else:
-        pivot = heat.pivot(index="Year", columns="Month", values="Volatility")
+        pivot = heat["Volatility"].unstack("Month")
         label = "Volatilité moyenne ($)"
+    trace.lap("Pivot année × mois")
 
     st.plotly_chart(
         px.imshow(
@@ -212,5 +178,9 @@ with tab4:
         ),
         use_container_width=True
     )
+    trace.lap("Heatmap (Plotly)")
 
-
+# =========================================================
+# ⏱️ Instrumentation (panneau optionnel de la barre latérale)
+# =========================================================
+instrument_panel(trace)
@@ -3,46 +3,60 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 
+from btc_data import (
+    OHLCV,
+    WINDOWS,
+    decimate,
+    drawdown_pct,
+    load_drawdown_episodes,
+    load_minutes,
+    load_rolling,
+    rolling_column,
+    select_years,
+    shared_dataset,
+    top_episodes,
+)
+from btc_data.instrument import PageTrace, cache_data, instrument_panel
+
 st.set_page_config(
     page_title="Performance & Drawdown",
     page_icon="📉",
     layout="wide"
 )
+trace = PageTrace("Performance & Drawdown")
 
 # ---------------------------------------------------------
 # 🔧 Chargement des données
 # ---------------------------------------------------------
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/DATASET_BTC.csv")
-    df["Timestamp"] = pd.to_datetime(df["Timestamp"], unit="s")
-    df = df.sort_values("Timestamp")
-
-    # Variables dérivées
-    df["Return"] = df["Close"].pct_change()
-    df["Volatility"] = df["High"] - df["Low"]
-    df["Year"] = df["Timestamp"].dt.year
-
-    # Daily
-    df_daily = df.resample("D", on="Timestamp").agg({
-        "Open": "first",
-        "High": "max",
-        "Low": "min",
-        "Close": "last",
-        "Volume": "sum"
-    }).dropna()
+def load_data(data):
+    # Daily : barres pré-agrégées par le cache (pyramide OHLCV)
+    df_daily = data.rollup("1D")[OHLCV]
 
     df_daily["Return"] = df_daily["Close"].pct_change()
     df_daily["Volatility"] = df_daily["High"] - df_daily["Low"]
     df_daily["Year"] = df_daily.index.year
 
-    # Peak & Drawdown
-    df_daily["Peak"] = df_daily["Close"].cummax()
-    df_daily["Drawdown_pct"] = (df_daily["Close"] - df_daily["Peak"]) / df_daily["Peak"] * 100
+    return df_daily
+
 
-    return df, df_daily
+@cache_data
+def load_drawdown_curve(version, years):
+    # Drawdown minute (Peak minute stocké à l'ingestion), décimé pour le
+    # graphique : seul le résultat réduit est gardé en cache.
+    df = load_minutes(columns=["Timestamp", "Close", "Peak"], years=years)
+    curve = pd.DataFrame({
+        "Timestamp": df["Timestamp"],
+        "Drawdown_pct": drawdown_pct(df["Close"], df["Peak"]),
+    })
+    return decimate(curve, "Timestamp", "Drawdown_pct").reset_index(drop=True)
 
-df_raw, df_daily = load_data()
+
+# Calculé une fois par processus et partagé par toutes les sessions : chaque
+# exécution reçoit une vue sans copie (cf. btc_data.shared)
+data = shared_dataset()
+version = data.version
+df_daily = data.table("performance", lambda: load_data(data))
+trace.lap("Données partagées")
 
 # ---------------------------------------------------------
 # 🟦 TITRE
@@ -64,7 +78,10 @@ selected_years = st.sidebar.multiselect(
     "📅 Années à inclure :", years, default=years
 )
 
-df_d = df_daily[df_daily["Year"].isin(selected_years)].copy()
+# Tranche(s) du daily trié, par recherche dichotomique (vue sans copie)
+df_d = select_years(df_daily, selected_years)
+
+trace.lap("Filtres")
 
 # ---------------------------------------------------------
 # 📊 Performance annuelle
@@ -84,6 +101,7 @@ yearly_return_df["Return_pct"] = yearly_return[0] if 0 in yearly_return.columns
 yearly_perf = (yearly_close["last"] / yearly_close["first"] - 1) * 100
 perf_df = yearly_perf.reset_index().rename(columns={0: "Return_pct", "last": "last"})
 perf_df = perf_df.rename(columns={perf_df.columns[1]: "Return_pct"})
+trace.lap("Performance annuelle")
 
 fig_perf = px.bar(
     perf_df,
@@ -95,6 +113,7 @@ fig_perf = px.bar(
     color_continuous_scale="RdYlGn"
 )
 st.plotly_chart(fig_perf, use_container_width=True)
+trace.lap("Graphique performance (Plotly)")
 
 st.markdown("""
 💡 **Interprétation rapide :**  
@@ -118,6 +137,7 @@ fig_vol = px.bar(
     title="Volatilité moyenne du Bitcoin par année"
 )
 st.plotly_chart(fig_vol, use_container_width=True)
+trace.lap("Volatilité annuelle")
 
 st.markdown("""
 💡 **Volatilité annuelle :**  
@@ -125,13 +145,38 @@ Plus la barre est haute, plus le Bitcoin a bougé fortement au cours de l'année
 (amplitude High-Low journalière en moyenne).
 """)
 
+# ---------------------------------------------------------
+# 🌊 Volatilité glissante
+# ---------------------------------------------------------
+st.subheader("Volatilité glissante des rendements minute (%)")
+
+window = st.selectbox("Fenêtre", list(WINDOWS), index=list(WINDOWS).index("30D"))
+vol_col = rolling_column("Return", "std", window)
+
+# Statistiques glissantes pré-calculées à l'ingestion (une ligne par heure)
+rolling = load_rolling(columns=[vol_col], years=selected_years).reset_index()
+rolling[vol_col] = rolling[vol_col] * 100
+trace.lap("Lecture volatilité glissante")
+
+fig_roll = px.line(
+    decimate(rolling, "Timestamp", vol_col),
+    x="Timestamp",
+    y=vol_col,
+    labels={vol_col: "Écart-type (%)", "Timestamp": "Date"},
+    title=f"Écart-type glissant ({window}) des rendements minute"
+)
+st.plotly_chart(fig_roll, use_container_width=True)
+trace.lap("Graphique volatilité glissante (Plotly)")
+
 # ---------------------------------------------------------
 # 📉 Courbe de Drawdown
 # ---------------------------------------------------------
 st.subheader("Drawdown du Bitcoin (%)")
 
+# Calculé à la minute : les krachs intrajournaliers ne sont plus lissés.
+# Min / max par tranche : les creux des bear markets sont conservés.
 fig_dd = px.area(
-    df_d.reset_index(),
+    load_drawdown_curve(version, tuple(selected_years)),
     x="Timestamp",
     y="Drawdown_pct",
     labels={"Drawdown_pct": "Drawdown (%)", "Timestamp": "Date"},
@@ -139,6 +184,7 @@ fig_dd = px.area(
 )
 fig_dd.update_traces(line_color="red")
 st.plotly_chart(fig_dd, use_container_width=True)
+trace.lap("Graphique drawdown (Plotly)")
 
 st.markdown("""
 💡 **Drawdown :**  
@@ -149,4 +195,37 @@ de **−70 à −80 %** lors des grands bear markets.
 """)
 
 # ---------------------------------------------------------
+# 🏆 Pires épisodes de drawdown
+# ---------------------------------------------------------
+st.subheader("Pires épisodes de drawdown")
+
+top_n = st.slider("Nombre d'épisodes", min_value=5, max_value=50, value=10, step=5)
+
+# Épisodes pré-calculés à l'ingestion ; filtre sur l'année du plus haut
+episodes = load_drawdown_episodes()
+episodes = select_years(episodes, selected_years, on="Peak_time")
+top = top_episodes(episodes, top_n)
+trace.lap("Épisodes de drawdown")
+
+st.dataframe(
+    pd.DataFrame({
+        "Plus haut": top["Peak_time"],
+        "Creux": top["Trough_time"],
+        "Reprise": top["Recovery_time"],
+        "Prix au plus haut ($)": top["Peak"].round(2),
+        "Prix au creux ($)": top["Trough"].round(2),
+        "Profondeur (%)": top["Depth_pct"].round(2),
+        "Durée (jours)": (top["Duration"].dt.total_seconds() / 86400).round(1),
+    }).reset_index(drop=True),
+    use_container_width=True
+)
 
+st.markdown("""
+💡 **Épisode :** du dernier plus haut historique avant la baisse jusqu'au premier retour 
+à ce niveau (reprise). Une reprise vide signifie que l'épisode est toujours en cours.
+""")
+
+# ---------------------------------------------------------
+# ⏱️ Instrumentation (panneau optionnel de la barre latérale)
+# ---------------------------------------------------------
+instrument_panel(trace)
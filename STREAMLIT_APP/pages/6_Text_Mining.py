@@ -1,24 +1,26 @@
 import streamlit as st
 import pandas as pd
-import re
-import nltk
+import plotly.express as px
+import hashlib
 from collections import Counter
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+from pathlib import Path
+
+from btc_data.charts import wordcloud_figure
+from btc_data.corpus import corpus_tfidf, group_tfidf, matrix_bytes, top_terms
+from btc_data.figcache import figure_cache
+from btc_data.instrument import PageTrace, cache_resource, instrument_panel
+from btc_data.rollups import default_workers
+from btc_data.text import SAMPLE_TEXT, clean_text, french_stopwords
 
 st.set_page_config(page_title="Text Mining Bitcoin", page_icon="🧠")
+trace = PageTrace("Text Mining")
 
 # ---------------------------------------------------------
 # 🔧 Chargement des ressources NLTK
 # ---------------------------------------------------------
-@st.cache_resource
+@cache_resource
 def load_stopwords():
-    try:
-        nltk.data.find('corpora/stopwords')
-    except LookupError:
-        nltk.download('stopwords')
-    from nltk.corpus import stopwords
-    return set(stopwords.words('french'))
+    return french_stopwords()
 
 STOPWORDS_FR = load_stopwords()
 
@@ -33,39 +35,130 @@ Cette page permet d'analyser un **article en français** parlant du Bitcoin :
 - extraction des mots les plus fréquents,
 - génération d'un **WordCloud**,
 - interprétation rapide du vocabulaire dominant.
+
+Le mode **Corpus** analyse des milliers d'articles à la fois (dossier ou archive)
+avec une pondération **TF-IDF** : termes caractéristiques de chaque document et
+de chaque groupe d'articles.
 """)
 
+mode = st.sidebar.radio("🗂️ Mode d'analyse", ["Article", "Corpus (TF-IDF)"])
+
 # ---------------------------------------------------------
-# 📝 Zone de texte pour l'article
+# 📚 Mode corpus (TF-IDF)
 # ---------------------------------------------------------
-st.subheader("Texte à analyser")
-
-default_text = """
-Bitcoin : Pour Tom Lee, le BTC retournera à 100 000 $ en 2025, mais plus question des 250 000 $.
-
-Tom Lee, le président de BitMine, a légèrement revu à la baisse sa prédiction audacieuse de voir Bitcoin atteindre
-250 000 $ d’ici la fin de l’année. Bien qu’il ait précédemment maintenu cette prévision, Lee parle maintenant
-d’un « peut-être » concernant un nouveau sommet pour Bitcoin avant 2026.
-
-Dans une interview récente, il a déclaré qu’il est « très probable » que Bitcoin dépasse les 100 000 $ avant la fin
-de l’année, tout en restant plus prudent sur tout nouveau record. Cette déclaration marque une révision de son
-optimisme initial.
-
-Lee souligne que la cryptomonnaie réalise souvent ses plus forts gains sur une poignée de jours chaque année.
-Il évoque des périodes de volatilité élevée, des ajustements de marché et une incertitude accrue, mais reste
-convaincu du potentiel de long terme de Bitcoin.
+@cache_resource(max_entries=2)
+def load_corpus(source_key, _source, min_df):
+    # Une matrice creuse par corpus, partagée par les sessions ; nettoyage
+    # et comptage parallèles (btc_data.corpus). _source n'est pas haché :
+    # la clé est le chemin du dossier ou l'identifiant du fichier envoyé.
+    matrix, terms, documents = corpus_tfidf(
+        _source, STOPWORDS_FR, workers=default_workers(), min_df=min_df
+    )
+    groups, group_names = group_tfidf(matrix, documents["Groupe"])
+    return matrix, terms, documents, groups, group_names
+
+
+if mode == "Corpus (TF-IDF)":
+    st.subheader("📚 Corpus d'articles")
+
+    origin = st.radio("Source du corpus", ["Dossier local", "Archive envoyée"], horizontal=True)
+    if origin == "Dossier local":
+        folder = st.text_input("Dossier contenant les articles (.txt, .md) :")
+        source = Path(folder).expanduser() if folder.strip() else None
+        if source is not None and not source.is_dir():
+            st.warning(f"⚠️ Dossier introuvable : {source}")
+            source = None
+        source_key = None if source is None else str(source.resolve())
+    else:
+        upload = st.file_uploader(
+            "Archive d'articles (zip, tar, tar.gz) :", type=["zip", "tar", "gz", "tgz"]
+        )
+        source = None if upload is None else upload.getvalue()
+        source_key = None if upload is None else upload.file_id
+
+    st.caption(
+        "Chaque fichier texte est un document ; son dossier parent sert de groupe "
+        "(source, période, thème…)."
+    )
+    min_df = st.sidebar.slider("Présence minimale d'un terme (documents)", 1, 20, 2)
+    if st.sidebar.button("🔄 Relire le corpus"):
+        load_corpus.clear()
+
+    if source is None:
+        st.info("Indiquez un dossier ou envoyez une archive pour lancer l'analyse.")
+        instrument_panel(trace)
+        st.stop()
 
-Malgré une tendance baissière récente et un marché chahuté, Lee estime que Bitcoin a encore des « bons jours »
-devant lui. Il note que même après des mouvements imprévus, la cryptomonnaie a montré qu’elle pouvait se relever,
-ce qui le rend confiant quant à un rebond possible avant la fin de 2025.
+    try:
+        matrix, terms, documents, groups, group_names = load_corpus(source_key, source, min_df)
+    except ValueError as error:
+        st.warning(f"⚠️ {error}")
+        instrument_panel(trace)
+        st.stop()
+    trace.lap("Corpus TF-IDF")
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Documents", f"{matrix.shape[0]:,}".replace(",", " "))
+    col2.metric("Termes", f"{matrix.shape[1]:,}".replace(",", " "))
+    col3.metric("Groupes", len(group_names))
+    col4.metric("Matrice creuse", f"{matrix_bytes(matrix) / 1024 ** 2:.1f} Mo")
+
+    n_terms = st.slider("Nombre de termes par document / groupe :", 5, 30, 10)
+
+    # ---------------- Par groupe ----------------
+    st.subheader("🗂️ Termes caractéristiques par groupe")
+
+    # TF-IDF moyen des documents de chaque groupe
+    by_group = top_terms(groups, terms, range(len(group_names)), n_terms)
+    by_group["Groupe"] = group_names[by_group["Ligne"].to_numpy()]
+    st.dataframe(by_group.pivot(index="Groupe", columns="Rang", values="Terme"))
+
+    group = st.selectbox("Groupe détaillé", group_names)
+    detail = by_group[by_group["Groupe"] == group]
+    st.plotly_chart(
+        px.bar(
+            detail.iloc[::-1],
+            x="Score",
+            y="Terme",
+            orientation="h",
+            labels={"Score": "TF-IDF moyen"},
+            title=f"Termes dominants — {group}"
+        ),
+        use_container_width=True
+    )
+    trace.lap("Termes par groupe")
+
+    # ---------------- Par document ----------------
+    st.subheader("📄 Termes caractéristiques par document")
+
+    pattern = st.text_input("Filtrer les documents par nom :")
+    matches = documents[documents["Document"].str.contains(pattern, regex=False)] if pattern else documents
+    if matches.empty:
+        st.warning("⚠️ Aucun document ne correspond à ce filtre.")
+    else:
+        # Liste limitée : un selectbox de 100 000 options serait envoyé en entier au navigateur
+        shown = matches.head(1_000)
+        row = st.selectbox(
+            f"Document ({len(matches)} correspondant(s), 1 000 premiers listés)",
+            shown.index,
+            format_func=lambda i: documents.at[i, "Document"],
+        )
+        st.write(
+            f"Groupe : **{documents.at[row, 'Groupe']}** — "
+            f"mots après nettoyage : **{documents.at[row, 'Mots']}**"
+        )
+        st.dataframe(top_terms(matrix, terms, [row], n_terms)[["Rang", "Terme", "Score"]])
+    trace.lap("Termes par document")
+
+    instrument_panel(trace)
+    st.stop()
 
-Selon lui, les conditions actuelles pourraient offrir une opportunité d’achat, avec un retour du marché vers un
-cycle haussier si les bons signaux s’alignent. Toutefois, il avertit que le marché reste exposé aux risques de
-volatilité, à la macroéconomie et aux incertitudes.
+# ---------------------------------------------------------
+# 📝 Zone de texte pour l'article
+# ---------------------------------------------------------
+st.subheader("Texte à analyser")
 
-Cette position, moins extrême qu’en début d’année, reflète une approche plus nuancée du marché, tout en conservant
-une vision haussière sur le moyen terme.
-"""
+default_text = SAMPLE_TEXT
 
 user_text = st.text_area(
     "Collez ici un article ou un texte en français sur le Bitcoin :",
@@ -82,19 +175,10 @@ if not user_text.strip():
 # ---------------------------------------------------------
 st.subheader("🧼 Nettoyage du texte")
 
-def clean_text(text: str):
-    # minuscule
-    text = text.lower()
-    # retirer chiffres, ponctuation, symboles
-    text = re.sub(r"[^a-zàâäéèêëîïôöùûüçñ\s]", " ", text)
-    # découpage
-    words = text.split()
-    # suppression stopwords + mots trop courts
-    words = [w for w in words if w not in STOPWORDS_FR and len(w) > 2]
-    return words
-
-words = clean_text(user_text)
+# Règles de nettoyage partagées avec les mesures de performance (btc_data.text)
+words = clean_text(user_text, STOPWORDS_FR)
 cleaned_text = " ".join(words)
+trace.lap("Nettoyage du texte")
 
 st.write(f"Nombre de mots après nettoyage : **{len(words)}**")
 
@@ -106,6 +190,7 @@ st.subheader("🔝 Mots les plus fréquents")
 n_top = st.slider("Nombre de mots à afficher :", 5, 30, 10)
 counter = Counter(words)
 most_common = counter.most_common(n_top)
+trace.lap("Comptage des mots")
 
 freq_df = pd.DataFrame(most_common, columns=["Mot", "Fréquence"])
 st.dataframe(freq_df)
@@ -115,17 +200,13 @@ st.dataframe(freq_df)
 # ---------------------------------------------------------
 st.subheader("☁️ WordCloud du vocabulaire dominant")
 
-wc = WordCloud(
-    width=800,
-    height=400,
-    background_color="white",
-    colormap="Oranges"
-).generate(cleaned_text)
-
-fig, ax = plt.subplots(figsize=(10, 5))
-ax.imshow(wc, interpolation="bilinear")
-ax.axis("off")
-st.pyplot(fig)
+# Même figure que le rapport hors ligne (btc_data.charts), rendue une fois
+# par texte nettoyé puis servie depuis le cache (cf. btc_data.figcache)
+key = ("wordcloud", hashlib.sha1(cleaned_text.encode("utf-8")).hexdigest())
+png, cached = figure_cache().rendered(key, lambda: wordcloud_figure(cleaned_text))
+trace.lap("WordCloud", cache="hit" if cached else "miss")
+st.image(png, width="stretch")
+trace.lap("Affichage de la figure")
 
 # ---------------------------------------------------------
 # Interprétation simple
@@ -147,4 +228,7 @@ Ce type d'analyse textuelle permet de :
 - comparer plusieurs articles entre eux sur la même période.
 """)
 
-
+# ---------------------------------------------------------
+# ⏱️ Instrumentation (panneau optionnel de la barre latérale)
+# ---------------------------------------------------------
+instrument_panel(trace)
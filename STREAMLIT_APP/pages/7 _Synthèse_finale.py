@@ -1,6 +1,9 @@
 import streamlit as st
 
+from btc_data.instrument import PageTrace, instrument_panel
+
 st.set_page_config(page_title="Synthèse finale", page_icon="📊")
+trace = PageTrace("Synthèse finale")
 
 # ---------------------------------------------------------
 # TITRE
@@ -131,3 +134,8 @@ L’application Streamlit permet une exploration claire et interactive :
 
 Elle offre ainsi une **compréhension globale et structurée du marché Bitcoin**, sans chercher à produire de prédiction.
 """)
+
+# ---------------------------------------------------------
+# ⏱️ Instrumentation (panneau optionnel de la barre latérale)
+# ---------------------------------------------------------
+instrument_panel(trace)
@@ -0,0 +1,140 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from btc_data import (
+    HORIZONS,
+    TOP_MOVES,
+    load_extremes,
+    select_years,
+    shared_dataset,
+    top_moves,
+)
+from btc_data.instrument import PageTrace, instrument_panel
+
+st.set_page_config(
+    page_title="Mouvements extrêmes",
+    page_icon="🚨",
+    layout="wide"
+)
+trace = PageTrace("Mouvements extrêmes")
+
+# ---------------------------------------------------------
+# 🔧 Chargement des données
+# ---------------------------------------------------------
+def load_data():
+    # Index calculé à l'ingestion : TOP_MOVES hausses et baisses par
+    # (horizon, année), quelques milliers de lignes en tout
+    extremes = load_extremes()
+    return {horizon: extremes[extremes["Horizon"] == horizon] for horizon in HORIZONS}
+
+
+# Calculé une fois par processus et partagé par toutes les sessions : chaque
+# exécution reçoit des vues sans copie (cf. btc_data.shared)
+data = shared_dataset()
+extremes = data.table("extremes", load_data)
+trace.lap("Données partagées")
+
+# ---------------------------------------------------------
+# 🟦 TITRE
+# ---------------------------------------------------------
+st.title("🚨 Mouvements extrêmes du Bitcoin")
+
+st.markdown("""
+Cette page liste les **plus fortes hausses** et les **plus fortes baisses** du prix de clôture
+d'un pas au suivant, à plusieurs horizons : **minute**, **heure**, **jour** et **semaine**.
+Début et fin sont les instants des deux clôtures (dernière minute de chaque barre) ; les pas
+qui enjambent un trou dans les données sont ignorés.
+""")
+
+# ---------------------------------------------------------
+# 🎛️ FILTRES
+# ---------------------------------------------------------
+st.sidebar.header("⚙️ Filtres")
+
+horizon_labels = {
+    "1min": "Minute",
+    "1h": "Heure",
+    "1D": "Jour",
+    "1W": "Semaine",
+}
+
+horizon = st.sidebar.radio(
+    "🕒 Horizon",
+    list(HORIZONS),
+    format_func=horizon_labels.get,
+    index=2
+)
+
+years = sorted(pd.concat(extremes.values())["Year"].unique())
+selected_years = st.sidebar.multiselect(
+    "📅 Années",
+    years,
+    default=years
+)
+
+top_n = st.sidebar.slider("Nombre de mouvements", min_value=5, max_value=TOP_MOVES, value=10, step=5)
+
+# Les K plus forts mouvements des années choisies sont parmi les K plus
+# forts de chaque année : fusion des listes annuelles, sans relire les minutes
+top = top_moves(select_years(extremes[horizon], selected_years, on="Year"), top_n)
+trace.lap("Sélection des mouvements")
+
+# ---------------------------------------------------------
+# 📋 Classements
+# ---------------------------------------------------------
+def moves_table(moves):
+    return pd.DataFrame({
+        "Rang": moves["Rank"],
+        "Début": moves["Start"],
+        "Fin": moves["Timestamp"],
+        "Prix de départ ($)": moves["From"].round(2),
+        "Prix d'arrivée ($)": moves["To"].round(2),
+        "Variation (%)": (moves["Return"] * 100).round(2),
+    }).reset_index(drop=True)
+
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.subheader(f"📈 Plus fortes hausses ({horizon_labels[horizon].lower()})")
+    st.dataframe(moves_table(top[top["Direction"] == "up"]), hide_index=True, use_container_width=True)
+
+with col2:
+    st.subheader(f"📉 Plus fortes baisses ({horizon_labels[horizon].lower()})")
+    st.dataframe(moves_table(top[top["Direction"] == "down"]), hide_index=True, use_container_width=True)
+
+trace.lap("Tableaux")
+
+# ---------------------------------------------------------
+# 📍 Mouvements dans le temps
+# ---------------------------------------------------------
+st.subheader("Mouvements extrêmes dans le temps")
+
+fig = px.scatter(
+    top.assign(
+        Return_pct=top["Return"] * 100,
+        Sens=top["Direction"].map({"up": "Hausse", "down": "Baisse"}),
+    ),
+    x="Timestamp",
+    y="Return_pct",
+    color="Sens",
+    color_discrete_map={"Hausse": "green", "Baisse": "red"},
+    hover_data={"Start": True, "From": ":.2f", "To": ":.2f"},
+    labels={"Return_pct": "Variation (%)", "Timestamp": "Date"}
+)
+st.plotly_chart(fig, use_container_width=True)
+trace.lap("Graphique (Plotly)")
+
+st.markdown("""
+💡 **Lecture :**
+- une variation est mesurée entre deux clôtures successives (deux minutes cotées, deux barres
+horaires, journalières ou hebdomadaires) ;
+- les mouvements extrêmes se regroupent souvent dans les mêmes périodes : krachs,
+bull runs et phases de forte volatilité.
+""")
+
+# ---------------------------------------------------------
+# ⏱️ Instrumentation (panneau optionnel de la barre latérale)
+# ---------------------------------------------------------
+instrument_panel(trace)